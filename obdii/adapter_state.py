@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from re import compile
+from typing import Dict, Final, Optional, Pattern, Tuple
+
+from .command import Command
+from .mode import Mode
+from .response import Response
+
+
+SETTINGS: Final[Tuple[Tuple[str, Pattern[str], Tuple[str, ...]], ...]] = tuple(
+    (name, compile(pattern), clears)
+    for name, pattern, clears in (
+        ("echo", r"E([01])", ()),
+        ("linefeed", r"L([01])", ()),
+        ("headers", r"H([01])", ()),
+        ("spaces", r"S([01])", ()),
+        ("dlc", r"D([01])", ()),
+        ("memory", r"M([01])", ()),
+        ("responses", r"R([01])", ()),
+        ("long_messages", r"(AL|NL)", ()),
+        ("adaptive_timing", r"AT([012])", ()),
+        ("timeout", r"ST([0-9A-F]{2})", ()),
+        ("protocol", r"SP([1-9A-C])", ()),
+        ("header", r"SH([0-9A-F]{3}|[0-9A-F]{6}|[0-9A-F]{8})", ()),
+        (
+            "can_receive_address",
+            r"CRA([0-9A-F]{3}|[0-9A-F]{8})?|AR",
+            ("id_filter", "id_mask", "receive_address"),
+        ),
+        ("id_filter", r"CF([0-9A-F]{3}|[0-9A-F]{8})", ("can_receive_address",)),
+        ("id_mask", r"CM([0-9A-F]{3}|[0-9A-F]{8})", ("can_receive_address",)),
+        ("receive_address", r"(?:RA|SR)([0-9A-F]{2})", ()),
+        ("tester_address", r"TA([0-9A-F]{2})", ()),
+        ("confirmation", r"C([01])", ()),
+        ("can_auto_format", r"CAF([01])", ()),
+        ("can_extended_address", r"CEA([0-9A-F]{2})?", ()),
+        ("flow_control", r"CFC([01])", ()),
+        ("flow_control_mode", r"FCSM([0-2])", ()),
+        ("flow_control_header", r"FCSH([0-9A-F]{3}|[0-9A-F]{8})", ()),
+        ("flow_control_data", r"FCSD([0-9A-F]{2,10})", ()),
+        ("ifr", r"IFR([0-6])", ()),
+        ("ifr_source", r"IFR([HS])", ()),
+        ("iso_baudrate", r"IB(10|12|15|48|96)", ()),
+        ("wakeup", r"SW([0-9A-F]{2})", ()),
+    )
+)
+"""Mirrored settings: name, pattern of the AT command setting it (without AT and spaces), and settings it overrides."""
+
+FORGETS: Final[Dict[str, Pattern[str]]] = {
+    "protocol": compile(r"(?:SP|TP).*"),
+}
+"""Commands changing a setting to a value that cannot be mirrored, e.g. automatic protocol search."""
+
+RESETS: Final[Pattern[str]] = compile(r"Z|WS|D|LP")
+"""Commands restoring the adapter defaults (or waking up from low power with them)."""
+
+
+@lru_cache(maxsize=None)
+def _parse(query: bytes) -> Tuple[Optional[str], str, Tuple[str, ...]]:
+    """Return the setting changed by an AT query, its value and the settings it overrides."""
+    body = query.decode(errors="ignore").replace(" ", "").strip().upper()[2:]
+
+    if RESETS.fullmatch(body):
+        return "*", "", ()
+    for name, pattern, clears in SETTINGS:
+        match = pattern.fullmatch(body)
+        if match is not None:
+            return name, "".join(group or "" for group in match.groups()), clears
+    for name, pattern in FORGETS.items():
+        if pattern.fullmatch(body):
+            return name, "", (name,)
+    return None, "", ()
+
+
+class AdapterState:
+    """
+    Client side mirror of the adapter settings, used by :class:`~obdii.Connection` when provided.
+
+    Every AT command changing a setting (echo, headers, spaces, protocol, timeout, header, filters, adaptive timing...)
+    updates the mirror once the adapter acknowledged it, and is skipped without a round trip
+    when the adapter is already in the requested state. Resets (``AT Z``, ``AT WS``, ``AT D``) clear the mirror,
+    as does :meth:`~obdii.Connection.connect`.
+
+    Example
+    -------
+    .. code-block:: python
+
+        state = AdapterState()
+
+        with Connection("COM5", adapter_state=state) as conn:
+            conn.query(at_commands.HEADERS_ON)  # skipped, already set by the init sequence
+
+        >>> state.get("headers")
+        '1'
+    """
+
+    def __init__(self) -> None:
+        self.settings: Dict[str, str] = {}
+        """Known settings keyed by name, see :data:`SETTINGS`, values as sent (e.g. "1" or "7E0")."""
+        self.skipped = 0
+        """Number of redundant commands skipped."""
+
+    def __repr__(self) -> str:
+        return f"<AdapterState {len(self.settings)} settings skipped={self.skipped}>"
+
+    def get(self, name: str) -> Optional[str]:
+        """Return the mirrored value of a setting, None if unknown."""
+        return self.settings.get(name)
+
+    def clear(self) -> None:
+        """Forget every setting, the next commands are all sent."""
+        self.settings.clear()
+
+    def is_redundant(self, command: Command) -> bool:
+        """Whether the command would not change the adapter state, counted in :attr:`skipped` if so."""
+        if Mode.get_from(command.mode) is not Mode.AT:
+            return False
+
+        name, value, _ = _parse(command.build())
+        if name is None or name == "*" or self.settings.get(name) != value:
+            return False
+
+        self.skipped += 1
+        return True
+
+    def update(self, command: Command, response: Optional[Response]) -> None:
+        """
+        Update the mirror with a command sent to the adapter.
+
+        Parameters
+        ----------
+        command: :class:`~obdii.Command`
+            The command sent.
+        response: Optional[:class:`~obdii.Response`]
+            Its response, None if the query failed and the setting is now unknown.
+        """
+        if Mode.get_from(command.mode) is not Mode.AT:
+            return
+
+        name, value, clears = _parse(command.build())
+        if name is None:
+            return
+        if name == "*":
+            self.settings.clear()
+            return
+
+        for cleared in clears:
+            self.settings.pop(cleared, None)
+
+        if response is not None and b"OK" in response.raw:
+            if name not in clears:
+                self.settings[name] = value
+        else:
+            self.settings.pop(name, None)
@@ -0,0 +1,502 @@
+from __future__ import annotations
+
+import lzma
+import zlib
+
+from array import array
+from bisect import bisect_left, bisect_right
+from logging import getLogger
+from mmap import ACCESS_READ, mmap
+from os import PathLike, listdir, makedirs, path as os_path
+from struct import Struct
+from queue import Queue
+from threading import Lock, Thread
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+    Dict,
+    Final,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .columnar import Column, value_width
+from .command import Command
+from .mode import Mode
+from .response import Response
+
+if TYPE_CHECKING:
+    from .connection import Connection
+
+
+_log = getLogger(__name__)
+
+
+MAGIC: Final = b"OBDARC"
+VERSION: Final = 1
+EXTENSION: Final = ".obda"
+
+FILE_HEADER: Final = Struct(">6sBB")
+"""File header: magic, format version and number of values per row."""
+CHUNK_HEADER: Final = Struct(">qqIIBI")
+"""Chunk header: first and last timestamps (ns), rows, payload length, codec and CRC-32 of the payload."""
+
+CODECS: Final[Dict[str, int]] = {"none": 0, "zlib": 1, "lzma": 2}
+"""Chunk compression codecs, from the standard library."""
+
+_COMPRESS = {
+    0: lambda data: data,
+    1: lambda data: zlib.compress(data, 6),
+    2: lambda data: lzma.compress(data, preset=1),
+}
+_DECOMPRESS = {
+    0: lambda data: data,
+    1: zlib.decompress,
+    2: lzma.decompress,
+}
+
+
+class ChunkIndex(NamedTuple):
+    """Sparse time index entry, one per chunk."""
+
+    first: int
+    last: int
+    rows: int
+    offset: int
+    """Offset of the chunk payload in the file."""
+    length: int
+    codec: int
+    crc: int
+
+
+class SignalRange(NamedTuple):
+    """Rows of a command read from an archive."""
+
+    timestamps: array
+    """``int64`` timestamps in nanoseconds since the epoch."""
+    values: array
+    """``float64`` values, `width` per row."""
+    validity: bytearray
+    """1 for rows with a value, 0 for missing values."""
+    width: int
+
+
+def _scan(data: Union[bytes, mmap], size: int) -> Tuple[int, List[ChunkIndex]]:
+    """Return the width and the index of the complete chunks of an archive file."""
+    magic, version, width = FILE_HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not an archive file.")
+    if version > VERSION:
+        raise ValueError(f"Unsupported archive version {version}.")
+
+    index: List[ChunkIndex] = []
+    offset = FILE_HEADER.size
+    while offset + CHUNK_HEADER.size <= size:
+        first, last, rows, length, codec, crc = CHUNK_HEADER.unpack_from(data, offset)
+        start = offset + CHUNK_HEADER.size
+        if start + length > size or codec not in _DECOMPRESS:
+            break
+        index.append(ChunkIndex(first, last, rows, start, length, codec, crc))
+        offset = start + length
+
+    return width, index
+
+
+def _end_of(index: List[ChunkIndex]) -> int:
+    return index[-1].offset + index[-1].length if index else FILE_HEADER.size
+
+
+def encode_chunk(column: Column, codec: int) -> bytes:
+    """Serialize the rows of a column into a compressed chunk, header included."""
+    timestamps = array('q')
+    values = array('d')
+    validity = bytearray()
+    for chunk_timestamps, chunk_values, chunk_validity in column.chunks():
+        timestamps.frombytes(chunk_timestamps.tobytes())
+        values.frombytes(chunk_values.tobytes())
+        validity += chunk_validity
+
+    if timestamps.itemsize != 8 or values.itemsize != 8:
+        raise RuntimeError("Unsupported platform array sizes.")
+
+    payload = _COMPRESS[codec](
+        timestamps.tobytes() + values.tobytes() + bytes(validity)
+    )
+    header = CHUNK_HEADER.pack(
+        timestamps[0],
+        timestamps[-1],
+        len(timestamps),
+        len(payload),
+        codec,
+        zlib.crc32(payload),
+    )
+    return header + payload
+
+
+def decode_chunk(payload: bytes, entry: ChunkIndex, width: int) -> SignalRange:
+    """Decompress the payload of a chunk."""
+    if zlib.crc32(payload) != entry.crc:
+        raise ValueError(f"Corrupted chunk at offset {entry.offset}.")
+
+    data = _DECOMPRESS[entry.codec](payload)
+    rows = entry.rows
+    timestamps = array('q')
+    timestamps.frombytes(data[: 8 * rows])
+    values = array('d')
+    values.frombytes(data[8 * rows : 8 * rows * (1 + width)])
+    validity = bytearray(data[8 * rows * (1 + width) :])
+    return SignalRange(timestamps, values, validity, width)
+
+
+class ArchiveWriter:
+    """
+    Append decoded signals to an archive directory, one ``<COMMAND>.obda`` file per command.
+
+    Rows are buffered per command (see :attr:`~obdii.Command.label` for the file names) and handed
+    as one chunk every `chunk_rows` rows, or on :meth:`flush`, to a background thread compressing
+    and writing them, so the query loop never waits on storage. Each chunk is indexed by its time
+    span so :class:`ArchiveReader` only decompresses the chunks of the requested range.
+    Existing files are appended to, an incomplete last chunk (e.g. after a crash) is discarded first.
+
+    When `max_pending` chunks are waiting to be written new chunks are dropped, their rows
+    are counted in :attr:`dropped`. Write errors are logged and raised by the next :meth:`flush`,
+    the rows of a command its file cannot store (e.g. another number of values per row) are dropped.
+
+    Example
+    -------
+    .. code-block:: python
+
+        with ArchiveWriter("logs/archive", codec="zlib") as archive:
+            archive.attach(conn)
+
+            while True:
+                conn.query(commands.ENGINE_SPEED)
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, PathLike],
+        codec: str = "zlib",
+        chunk_rows: int = 4096,
+        max_pending: int = 64,
+    ) -> None:
+        """
+        Initialize the writer.
+
+        Parameters
+        ----------
+        directory: Union[:class:`str`, :class:`os.PathLike`]
+            Archive directory, created if needed.
+        codec: :class:`str`
+            Chunk compression, one of :data:`CODECS`.
+        chunk_rows: :class:`int`
+            Rows per chunk.
+        max_pending: :class:`int`
+            Maximum number of chunks waiting to be written.
+        """
+        if codec not in CODECS:
+            raise ValueError(
+                f"Unknown codec {codec!r}, expected one of {list(CODECS)}."
+            )
+
+        self.directory = directory
+        self.codec = codec
+        self.chunk_rows = chunk_rows
+        self.max_pending = max_pending
+
+        self.dropped = 0
+        """Number of rows dropped because the writer thread fell behind, or because writing them failed."""
+
+        self._lock = Lock()
+        self._buffers: Dict[Command, Column] = {}
+        self._rejected: Set[Command] = set()
+        self._opened: Set[str] = set()
+        self._pending: Queue[Optional[Tuple[Command, Column]]] = Queue()
+        self._writer: Optional[Thread] = None
+        self._error: Optional[Exception] = None
+        makedirs(directory, exist_ok=True)
+
+    def __repr__(self) -> str:
+        return f"<ArchiveWriter {self.directory} {self.codec}>"
+
+    def append(self, command: Command, timestamp: int, value: object) -> None:
+        """
+        Append a value of a command.
+
+        Parameters
+        ----------
+        command: :class:`~obdii.Command`
+            The command the value belongs to.
+        timestamp: :class:`int`
+            Time of the value in nanoseconds since the epoch, increasing per command.
+        value: :class:`object`
+            A number or a sequence of numbers, anything else is stored as missing.
+        """
+        with self._lock:
+            if command in self._rejected:
+                self.dropped += 1
+                return
+
+            column = self._buffers.get(command)
+            if column is None:
+                column = self._buffers[command] = self._new_buffer(
+                    command.label, value_width(command)
+                )
+            column.append(timestamp, value)
+
+            if len(column) >= self.chunk_rows:
+                if self._pending.qsize() >= self.max_pending:
+                    self.dropped += len(column)
+                    _log.warning(
+                        f"{self!r} is behind, dropping {len(column)} rows of {column.name}."
+                    )
+                else:
+                    self._submit(command, column)
+                self._buffers[command] = self._new_buffer(column.name, column.width)
+
+    def append_response(self, response: Response) -> None:
+        """Append the value of a response, AT command responses are ignored."""
+        command = response.context.command
+        if Mode.get_from(command.mode) in (Mode.AT, Mode.NONE):
+            return
+        self.append(command, int(response.timestamp * 1e9), response.value)
+
+    def attach(self, connection: Connection) -> None:
+        """Archive the value of every response parsed by a connection."""
+        connection.add_hook("on_parsed", self.append_response)
+
+    def detach(self, connection: Connection) -> None:
+        """Stop archiving the responses of a connection."""
+        connection.remove_hook("on_parsed", self.append_response)
+
+    def flush(self) -> None:
+        """
+        Write the buffered rows of every command and wait for the pending chunks, making them visible to readers.
+
+        Raises
+        ------
+        Exception
+            The first error raised while writing a chunk since the previous flush.
+        """
+        with self._lock:
+            for command, column in self._buffers.items():
+                if len(column):
+                    self._submit(command, column)
+                    self._buffers[command] = self._new_buffer(column.name, column.width)
+        self._pending.join()
+
+        with self._lock:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """Flush the buffered rows, then stop the writer thread."""
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                writer, self._writer = self._writer, None
+            if writer is not None:
+                self._pending.put(None)
+                writer.join()
+
+    def __enter__(self) -> ArchiveWriter:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _submit(self, command: Command, column: Column) -> None:
+        """Hand a chunk to the writer thread, starting it if needed, called with the lock held."""
+        if self._writer is None:
+            self._writer = Thread(
+                target=self._run, name="obdii-archivewriter", daemon=True
+            )
+            self._writer.start()
+        self._pending.put((command, column))
+
+    def _run(self) -> None:
+        """Writer loop, writes the pending chunks until the stop sentinel."""
+        while True:
+            item = self._pending.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            finally:
+                self._pending.task_done()
+
+    def _prepare(self, file: BinaryIO, file_path: str, width: int) -> None:
+        """Write the header of a new file, or check an existing one and drop its incomplete last chunk."""
+        file.seek(0, 2)
+        size = file.tell()
+        if size == 0:
+            file.write(FILE_HEADER.pack(MAGIC, VERSION, width))
+            return
+
+        # Scan the chunk headers through a read-only map, without loading the archive
+        with mmap(file.fileno(), 0, access=ACCESS_READ) as mapped:
+            stored, index = _scan(mapped, size)
+        if stored != width:
+            raise ValueError(
+                f"{file_path} stores {stored} values per row, got {width}."
+            )
+
+        end = _end_of(index)
+        if end != size:
+            _log.warning(f"Discarding an incomplete chunk at the end of {file_path}.")
+            file.truncate(end)
+
+    def _new_buffer(self, name: str, width: int) -> Column:
+        return Column(name, width, chunk_size=self.chunk_rows)
+
+    def _write(self, command: Command, column: Column) -> None:
+        """Write a chunk to its command's file, from the writer thread."""
+        file_path = os_path.join(self.directory, f"{column.name}{EXTENSION}")
+
+        try:
+            chunk = encode_chunk(column, CODECS[self.codec])
+            with open(file_path, "a+b") as file:
+                if column.name not in self._opened:
+                    try:
+                        self._prepare(file, file_path, column.width)
+                    except ValueError:
+                        # The file cannot store this command, its next rows are dropped as well
+                        with self._lock:
+                            self._rejected.add(command)
+                        raise
+                    self._opened.add(column.name)
+
+                file.write(chunk)
+                file.flush()
+        except Exception as e:
+            _log.exception(
+                f"{self!r} failed to write {len(column)} rows of {column.name}."
+            )
+            with self._lock:
+                self.dropped += len(column)
+                if self._error is None:
+                    self._error = e
+
+
+class ArchiveReader:
+    """
+    Read time ranges of an archive written by :class:`ArchiveWriter`.
+
+    Files are memory-mapped and only the chunks overlapping the requested range are decompressed.
+    Call :meth:`refresh` to see the chunks appended by a live writer since the reader was opened.
+
+    Example
+    -------
+    .. code-block:: python
+
+        with ArchiveReader("logs/archive") as archive:
+            rows = archive.read("ENGINE_SPEED", start=t0, end=t0 + 600 * 10**9)
+    """
+
+    def __init__(self, directory: Union[str, PathLike]) -> None:
+        self.directory = directory
+
+        self._files: Dict[str, Tuple[mmap, int, List[ChunkIndex]]] = {}
+        self.refresh()
+
+    def __repr__(self) -> str:
+        return f"<ArchiveReader {self.directory} {len(self._files)} commands>"
+
+    def refresh(self) -> None:
+        """Map the archive files again, picking up new commands and chunks."""
+        self.close()
+        for name in sorted(listdir(self.directory)):
+            if not name.endswith(EXTENSION):
+                continue
+            file_path = os_path.join(self.directory, name)
+            if os_path.getsize(file_path) < FILE_HEADER.size:
+                continue
+            with open(file_path, "rb") as file:
+                mapped = mmap(file.fileno(), 0, access=ACCESS_READ)
+            width, index = _scan(mapped, len(mapped))
+            self._files[name[: -len(EXTENSION)]] = (mapped, width, index)
+
+    def commands(self) -> List[str]:
+        """Return the labels of the archived commands."""
+        return list(self._files)
+
+    def index(self, command: Union[Command, str]) -> List[ChunkIndex]:
+        """Return the time index of a command's file."""
+        return list(self._entry(command)[2])
+
+    def span(self, command: Union[Command, str]) -> Optional[Tuple[int, int]]:
+        """Return the first and last timestamps of a command, None when empty."""
+        index = self._entry(command)[2]
+        if not index:
+            return None
+        return index[0].first, index[-1].last
+
+    def read(
+        self,
+        command: Union[Command, str],
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> SignalRange:
+        """
+        Read the rows of a command within a time range.
+
+        Parameters
+        ----------
+        command: Union[:class:`~obdii.Command`, :class:`str`]
+            The command or its label (see :attr:`~obdii.Command.label`).
+        start: Optional[:class:`int`]
+            First timestamp included, in nanoseconds since the epoch.
+        end: Optional[:class:`int`]
+            Last timestamp included, in nanoseconds since the epoch.
+        """
+        mapped, width, index = self._entry(command)
+        start = index[0].first if start is None and index else start
+        end = index[-1].last if end is None and index else end
+
+        result = SignalRange(array('q'), array('d'), bytearray(), width)
+        if not index or start is None or end is None:
+            return result
+
+        position = bisect_left([entry.last for entry in index], start)
+        for entry in index[position:]:
+            if entry.first > end:
+                break
+
+            chunk = decode_chunk(
+                mapped[entry.offset : entry.offset + entry.length], entry, width
+            )
+            low = bisect_left(chunk.timestamps, start)
+            high = bisect_right(chunk.timestamps, end)
+
+            result.timestamps.extend(chunk.timestamps[low:high])
+            result.values.extend(chunk.values[low * width : high * width])
+            result.validity.extend(chunk.validity[low:high])
+
+        return result
+
+    def close(self) -> None:
+        """Unmap every file."""
+        for mapped, _, _ in self._files.values():
+            mapped.close()
+        self._files.clear()
+
+    def __enter__(self) -> ArchiveReader:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _entry(
+        self, command: Union[Command, str]
+    ) -> Tuple[mmap, int, List[ChunkIndex]]:
+        name = command.label if isinstance(command, Command) else command
+        try:
+            return self._files[name]
+        except KeyError:
+            raise KeyError(f"Command '{name}' not found in the archive") from None
@@ -0,0 +1,23 @@
+from .micro import micro_cases
+from .runner import (
+    BenchCase,
+    BenchResult,
+    Comparison,
+    compare_results,
+    load_results,
+    run_case,
+    run_cases,
+    save_results,
+)
+
+__all__ = [
+    "BenchCase",
+    "BenchResult",
+    "Comparison",
+    "compare_results",
+    "load_results",
+    "micro_cases",
+    "run_case",
+    "run_cases",
+    "save_results",
+]
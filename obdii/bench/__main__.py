@@ -0,0 +1,188 @@
+from argparse import ArgumentParser, Namespace
+from dataclasses import asdict
+from fnmatch import fnmatch
+from json import dump
+from sys import argv as sys_argv, exit
+from typing import List, Optional
+
+from ..connection import Connection
+from ..protocol import Protocol
+
+from .connect import (
+    DEFAULT_MIX,
+    VARIANTS,
+    format_report,
+    parse_transport,
+    resolve_commands,
+    run_variants,
+)
+from .micro import micro_cases
+from .runner import (
+    BenchResult,
+    compare_results,
+    environment,
+    format_ns,
+    load_results,
+    run_cases,
+    save_results,
+)
+
+
+def _print_result(result: BenchResult) -> None:
+    print(
+        f"{result.name:<32} {format_ns(result.median_ns):>12} "
+        f"(min {format_ns(result.min_ns)}, {result.number} loops x {result.repeat})"
+    )
+
+
+def _compare(args: Namespace, results: List[BenchResult]) -> int:
+    comparisons = compare_results(load_results(args.compare), results)
+
+    regressions = 0
+    print(f"\nCompared to {args.compare}:")
+    for comparison in comparisons:
+        regressed = comparison.ratio > 1 + args.threshold
+        regressions += regressed
+        print(
+            f"{comparison.name:<32} {format_ns(comparison.baseline_ns):>12} -> "
+            f"{format_ns(comparison.current_ns):>12} ({comparison.ratio:6.2f}x)"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+
+    return 1 if regressions else 0
+
+
+def run_micro(args: Namespace) -> int:
+    cases = [case for case in micro_cases() if fnmatch(case.name, args.filter)]
+
+    results = run_cases(cases, args.repeat, args.min_time, on_result=_print_result)
+
+    if args.output:
+        save_results(results, args.output)
+    if args.compare:
+        return _compare(args, results)
+    return 0
+
+
+def run_connect(args: Namespace) -> int:
+    mix = resolve_commands(args.commands.split(','))
+    variants = [v for v in args.variants.split(',') if v] if args.variants else []
+
+    unknown = set(variants) - set(VARIANTS)
+    if unknown:
+        print(
+            f"Unknown variant(s): {', '.join(sorted(unknown))}, expected {', '.join(VARIANTS)}."
+        )
+        return 2
+
+    with Connection(
+        parse_transport(args.transport), protocol=Protocol(args.protocol)
+    ) as conn:
+        print(f"Connected to {conn.transport!r} using {conn.protocol.name}.")
+        reports = run_variants(conn, mix, variants, args.duration, args.queries)
+
+    for report in reports:
+        print()
+        print(format_report(report))
+
+    if args.output:
+        with open(args.output, 'w', encoding="utf-8") as file:
+            dump(
+                {
+                    "environment": environment(),
+                    "transport": args.transport,
+                    "reports": [
+                        {
+                            **asdict(report),
+                            "queries_per_second": report.queries_per_second,
+                        }
+                        for report in reports
+                    ],
+                },
+                file,
+                indent=2,
+            )
+    return 0
+
+
+def _add_common_arguments(parser: ArgumentParser) -> None:
+    parser.add_argument("-o", "--output", help="Save the results as JSON to this file.")
+    parser.add_argument(
+        "-c", "--compare", help="Compare against results saved in this JSON file."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative slowdown reported as a regression (default: 0.10).",
+    )
+
+
+def build_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="python -m obdii.bench",
+        description="Benchmarks of the obdii library.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    micro = subparsers.add_parser(
+        "micro", help="Parsing and command-building hot paths (default)."
+    )
+    micro.add_argument(
+        "-k", "--filter", default="*", help="Only run cases matching this glob."
+    )
+    micro.add_argument("--repeat", type=int, default=5, help="Timed repeats per case.")
+    micro.add_argument(
+        "--min-time", type=float, default=0.2, help="Minimum seconds per repeat."
+    )
+    _add_common_arguments(micro)
+    micro.set_defaults(run=run_micro)
+
+    connect = subparsers.add_parser(
+        "connect", help="Round-trip latency and throughput over a real transport."
+    )
+    connect.add_argument(
+        "transport",
+        help="Serial port (e.g. COM5, /dev/ttyUSB0), host:port, or sim for the simulated adapter.",
+    )
+    connect.add_argument(
+        "--commands",
+        default=",".join(DEFAULT_MIX),
+        help="Comma separated command names queried in round-robin.",
+    )
+    connect.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds per configuration."
+    )
+    connect.add_argument(
+        "--queries", type=int, default=None, help="Maximum queries per configuration."
+    )
+    connect.add_argument(
+        "--protocol", type=int, default=0, help="Protocol number, 0 for automatic."
+    )
+    connect.add_argument(
+        "--variants",
+        default="",
+        help=f"Comma separated settings to compare: {', '.join(VARIANTS)}.",
+    )
+    connect.add_argument(
+        "-o", "--output", help="Save the reports as JSON to this file."
+    )
+    connect.set_defaults(run=run_connect)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    arguments = list(sys_argv[1:] if argv is None else argv)
+
+    # `micro` is the default sub-command
+    if not arguments or arguments[0] not in ("micro", "connect", "-h", "--help"):
+        arguments.insert(0, "micro")
+
+    args = parser.parse_args(arguments)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    exit(main())
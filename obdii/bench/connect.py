@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from re import fullmatch
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..command import Command
+from ..connection import Connection
+from ..modes import ModeAT, commands
+from ..stats import StatsSnapshot
+from ..transports import TransportSimulated
+from ..transports.transport_base import TransportBase
+
+
+DEFAULT_MIX: Tuple[str, ...] = (
+    "ENGINE_SPEED",
+    "VEHICLE_SPEED",
+    "ENGINE_LOAD",
+    "ENGINE_COOLANT_TEMP",
+    "THROTTLE_POSITION",
+)
+"""Command names queried by default, in round-robin."""
+
+
+def _toggle_attribute(name: str) -> Tuple[Callable, Callable]:
+    def setup(conn: Connection) -> None:
+        setattr(conn, name, True)
+
+    def teardown(conn: Connection) -> None:
+        setattr(conn, name, False)
+
+    return setup, teardown
+
+
+def _toggle_commands(
+    on: Sequence[Command], off: Sequence[Command]
+) -> Tuple[Callable, Callable]:
+    def setup(conn: Connection) -> None:
+        for command in on:
+            conn.query(command)
+
+    def teardown(conn: Connection) -> None:
+        for command in off:
+            conn.query(command)
+
+    return setup, teardown
+
+
+VARIANTS: Dict[
+    str, Tuple[Callable[[Connection], None], Callable[[Connection], None]]
+] = {
+    "early_return": _toggle_attribute("early_return"),
+    "smart_query": _toggle_attribute("smart_query"),
+    "spaces_off": _toggle_commands([ModeAT.SPACES_OFF], [ModeAT.SPACES_ON]),
+    "header_target": _toggle_commands(
+        [ModeAT.SET_HEADER_11(*"7E0"), ModeAT.SET_CAN_ADDR("7E8")],
+        [ModeAT.RESET_CAN_ADDR(), ModeAT.SET_HEADER_11(*"7DF")],
+    ),
+}
+"""Settings that can be compared against the default configuration.
+
+- ``early_return``: append the expected response count to queries.
+- ``smart_query``: send the repeat command for consecutive identical queries, measured on a workload
+  repeating each command (see :data:`REPEATS`).
+- ``spaces_off``: disable spaces between response bytes.
+- ``header_target``: address the engine ECU (7E0/7E8) instead of broadcasting, 11 bit CAN only.
+"""
+
+
+REPEATS: Dict[str, int] = {
+    "smart_query": 4,
+}
+"""Consecutive queries of each command in the workload of a variant, other variants use the round-robin mix.
+
+The default configuration is measured on the same workload first, as the baseline of the variant.
+"""
+
+
+@dataclass
+class MixReport:
+    """Outcome of running a command mix over a connection."""
+
+    variant: str
+    queries: int
+    errors: int
+    elapsed: float
+    bytes_sent: int
+    bytes_received: int
+    stats: StatsSnapshot = field(repr=False)
+
+    @property
+    def queries_per_second(self) -> float:
+        return self.queries / self.elapsed if self.elapsed else 0.0
+
+
+def parse_transport(spec: str) -> Union[str, Tuple[str, int], TransportBase]:
+    """Parse a transport given on the command line, "sim" for the simulated adapter, "host:port" for sockets, otherwise a serial port."""
+    if spec == "sim":
+        return TransportSimulated()
+    match = fullmatch(r"(?P<host>.+):(?P<port>\d+)", spec)
+    if match:
+        return match.group("host"), int(match.group("port"))
+    return spec
+
+
+def resolve_commands(names: Sequence[str]) -> List[Command]:
+    """Resolve command names (e.g. "ENGINE_SPEED") to commands."""
+    return [commands[name.strip()] for name in names if name.strip()]
+
+
+def run_mix(
+    conn: Connection,
+    mix: Sequence[Command],
+    duration: float = 10.0,
+    max_queries: Optional[int] = None,
+    variant: str = "default",
+    repeat: int = 1,
+) -> MixReport:
+    """
+    Query the commands of a mix in round-robin for `duration` seconds or `max_queries` queries.
+
+    Parameters
+    ----------
+    conn: :class:`~obdii.Connection`
+        A connected connection, its statistics are reset.
+    mix: Sequence[:class:`~obdii.Command`]
+        Commands to query in round-robin.
+    duration: :class:`float`
+        Maximum duration in seconds.
+    max_queries: Optional[:class:`int`]
+        Maximum number of queries.
+    variant: :class:`str`
+        Label of the configuration being measured.
+    repeat: :class:`int`
+        Consecutive queries of each command before moving to the next one.
+    """
+    counters = {"sent": 0, "received": 0}
+
+    def on_send(query: bytes) -> None:
+        counters["sent"] += len(query)
+
+    def on_receive(raw: bytes, elapsed: float) -> None:
+        counters["received"] += len(raw)
+
+    conn.add_hook("on_send", on_send)
+    conn.add_hook("on_receive", on_receive)
+    conn.stats.reset()
+
+    queries = errors = 0
+    start = perf_counter()
+    try:
+        while perf_counter() - start < duration and (
+            max_queries is None or queries < max_queries
+        ):
+            command = mix[queries // repeat % len(mix)]
+            queries += 1
+            try:
+                conn.query(command)
+            except Exception:
+                errors += 1
+    finally:
+        elapsed = perf_counter() - start
+        conn.remove_hook("on_send", on_send)
+        conn.remove_hook("on_receive", on_receive)
+
+    return MixReport(
+        variant,
+        queries,
+        errors,
+        elapsed,
+        counters["sent"],
+        counters["received"],
+        conn.stats.snapshot(),
+    )
+
+
+def run_variants(
+    conn: Connection,
+    mix: Sequence[Command],
+    variants: Sequence[str] = (),
+    duration: float = 10.0,
+    max_queries: Optional[int] = None,
+) -> List[MixReport]:
+    """
+    Run the mix with the default configuration, then once per variant.
+
+    Variants with a repeated workload (see :data:`REPEATS`) are preceded by a run of the default
+    configuration on that workload, reported as ``default xN``.
+    """
+    reports = [run_mix(conn, mix, duration, max_queries)]
+    baselines = {1}
+
+    for name in variants:
+        repeat = REPEATS.get(name, 1)
+        if repeat not in baselines:
+            baselines.add(repeat)
+            reports.append(
+                run_mix(
+                    conn,
+                    mix,
+                    duration,
+                    max_queries,
+                    variant=f"default x{repeat}",
+                    repeat=repeat,
+                )
+            )
+
+        setup, teardown = VARIANTS[name]
+        setup(conn)
+        try:
+            reports.append(
+                run_mix(conn, mix, duration, max_queries, variant=name, repeat=repeat)
+            )
+        finally:
+            teardown(conn)
+
+    return reports
+
+
+def format_report(report: MixReport) -> str:
+    """Format a report as a human readable table."""
+    lines = [
+        (
+            f"[{report.variant}] {report.queries} queries in {report.elapsed:.2f} s "
+            f"({report.queries_per_second:.1f} q/s), {report.errors} errors, "
+            f"{report.bytes_sent} B sent, {report.bytes_received} B received"
+        ),
+        f"{'command':<28} {'count':>6} {'p50 ms':>8} {'p99 ms':>8} {'io ms':>8} {'parse ms':>9}",
+    ]
+
+    for name, group in report.stats.commands.items():
+        total = group.stages.get("total")
+        if total is None:
+            continue
+        io = sum(
+            group.stages[stage].mean
+            for stage in ("write", "wait", "transfer")
+            if stage in group.stages
+        )
+        parse = group.stages["parse"].mean if "parse" in group.stages else 0.0
+        lines.append(
+            f"{name:<28} {group.count:>6} {total.p50:>8.2f} {total.p99:>8.2f} {io:>8.2f} {parse:>9.3f}"
+        )
+
+    return "\n".join(lines)
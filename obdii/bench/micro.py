@@ -0,0 +1,127 @@
+from typing import List
+
+from ..command import Command, Template
+from ..errors import ResponseBaseError
+from ..mode import Mode
+from ..modes import commands
+from ..parsers.dtc import DTC
+from ..parsers.formula import Formula, MultiFormula
+from ..parsers.pids import SupportedPIDS
+from ..protocol import Protocol
+from ..protocols.protocol_can import ProtocolCAN
+from ..protocols.protocol_j1850 import ProtocolJ1850
+from ..protocols.protocol_kwp import ProtocolKWP
+from ..protocols.protocol_base import ProtocolBase
+from ..response import Context, ResponseBase
+
+from .runner import BenchCase
+
+
+PARSE_FIXTURES = [
+    # (name, handler, protocol, command, raw)
+    (
+        "can.single",
+        ProtocolCAN(),
+        Protocol.ISO_15765_4_CAN,
+        commands.ENGINE_SPEED,
+        b"7E8 04 41 0C 40 80\r>",
+    ),
+    (
+        "can.multi_frame",
+        ProtocolCAN(),
+        Protocol.ISO_15765_4_CAN,
+        commands.VIN,
+        b"7E8 10 14 49 02 01 57 56 57\r7E8 21 5A 5A 5A 31 4A 4D 33\r7E8 22 36 33 39 37 36 00 00\r>",
+    ),
+    (
+        "can.multi_ecu",
+        ProtocolCAN(),
+        Protocol.ISO_15765_4_CAN,
+        commands.ENGINE_SPEED,
+        b"7E8 04 41 0C 40 80\r7E2 04 41 0C 40 40\r7E9 04 41 0C 40 40\r>",
+    ),
+    (
+        "kwp.single",
+        ProtocolKWP(),
+        Protocol.ISO_14230_4_KWP,
+        commands.ENGINE_SPEED,
+        b"84 F1 11 41 0C 1F 44 36\r>",
+    ),
+    (
+        "kwp.multi_frame",
+        ProtocolKWP(),
+        Protocol.ISO_14230_4_KWP,
+        commands.VIN,
+        b"87 F1 11 49 02 01 00 00 00 31 06 \r87 F1 11 49 02 02 41 31 4A 43 D5 \r87 F1 11 49 02 03 35 34 34 34 A8\r87 F1 11 49 02 04 52 37 32 35 C8\r>",
+    ),
+    (
+        "kwp.multi_ecu",
+        ProtocolKWP(),
+        Protocol.ISO_14230_4_KWP,
+        commands.ENGINE_SPEED,
+        b"84 F1 11 41 0C 1F 44 36\r84 F1 12 41 0C 0F A0 83\r>",
+    ),
+    (
+        "j1850.single",
+        ProtocolJ1850(),
+        Protocol.SAE_J1850_PWM,
+        commands.ENGINE_SPEED,
+        b"48 6B 10 41 0C 0D 48 93\r>",
+    ),
+    (
+        "j1850.multi_frame",
+        ProtocolJ1850(),
+        Protocol.SAE_J1850_PWM,
+        commands.VIN,
+        b"48 6B 10 49 02 01 31 47 31 4A 43 49 \r48 6B 10 49 02 02 35 34 34 34 52 37 42 \r48 6B 10 49 02 03 32 35 33 36 37 D5 \r>",
+    ),
+    (
+        "j1850.multi_ecu",
+        ProtocolJ1850(),
+        Protocol.SAE_J1850_PWM,
+        commands.ENGINE_SPEED,
+        b"48 6B 10 41 0C 0D 48 93\r48 6B 18 41 0C 0F A0 26\r>",
+    ),
+]
+
+
+def _parse_case(
+    name: str, handler: ProtocolBase, protocol: Protocol, command: Command, raw: bytes
+) -> BenchCase:
+    response_base = ResponseBase(Context(command, protocol), raw)
+    return BenchCase(f"parse.{name}", lambda: handler.parse_response(response_base))
+
+
+def micro_cases() -> List[BenchCase]:
+    """Return the parsing and command-building hot path benchmarks."""
+    cases = [_parse_case(*fixture) for fixture in PARSE_FIXTURES]
+
+    formula = Formula("(256*A+B)/4")
+    multi_formula = MultiFormula("A-125", "B-125", "C-125", "D-125", "E-125")
+    supported_pids = SupportedPIDS(0x01)
+    template = Template("SH {xx}{yy}{zz}")
+    templated = Command(Mode.AT, template)
+
+    cases += [
+        BenchCase("formula.single", lambda: formula([0x40, 0x80])),
+        BenchCase("formula.multi", lambda: multi_formula([143, 125, 149, 128, 111])),
+        BenchCase(
+            "dtc.parse", lambda: DTC.parse([0x02, 0xC1, 0x58, 0x01, 0x96, 0, 0, 0])
+        ),
+        BenchCase("pids.supported", lambda: supported_pids([190, 31, 168, 19])),
+        BenchCase("template.substitute", lambda: template.substitute("7E", "0", "F1")),
+        BenchCase("command.format", lambda: templated("7E", "0", "F1")),
+        BenchCase("command.build", lambda: commands.ENGINE_SPEED.build()),
+        BenchCase(
+            "command.build_early_return", lambda: commands.ENGINE_SPEED.build(True)
+        ),
+        BenchCase(
+            "errors.detect_clean",
+            lambda: ResponseBaseError.detect(b"7E8 04 41 0C 40 80\r>"),
+        ),
+        BenchCase(
+            "errors.detect_error", lambda: ResponseBaseError.detect(b"NO DATA\r>")
+        ),
+    ]
+
+    return cases
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import platform
+
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from json import dump, load
+from os import PathLike
+from statistics import median
+from timeit import Timer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+
+@dataclass
+class BenchCase:
+    """A named zero-argument callable to benchmark."""
+
+    name: str
+    func: Callable[[], Any]
+
+
+@dataclass
+class BenchResult:
+    """Timing of a :class:`BenchCase`, in nanoseconds per call."""
+
+    name: str
+    median_ns: float
+    min_ns: float
+    number: int
+    repeat: int
+
+
+@dataclass
+class Comparison:
+    """Relative change of a benchmark between a baseline and a current run."""
+
+    name: str
+    baseline_ns: float
+    current_ns: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ns / self.baseline_ns if self.baseline_ns else float("inf")
+
+
+def run_case(case: BenchCase, repeat: int = 5, min_time: float = 0.2) -> BenchResult:
+    """
+    Time a case with :mod:`timeit`, calibrating the loop count to run at least `min_time` seconds per repeat.
+
+    Parameters
+    ----------
+    case: :class:`BenchCase`
+        The case to run.
+    repeat: :class:`int`
+        Number of timed repeats, the median and minimum are reported.
+    min_time: :class:`float`
+        Minimum duration in seconds of one repeat.
+    """
+    timer = Timer(case.func)
+
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    runs = [elapsed] + timer.repeat(repeat=max(repeat - 1, 0), number=number)
+    per_call = [run / number * 1e9 for run in runs]
+
+    return BenchResult(case.name, median(per_call), min(per_call), number, len(runs))
+
+
+def run_cases(
+    cases: Iterable[BenchCase],
+    repeat: int = 5,
+    min_time: float = 0.2,
+    on_result: Optional[Callable[[BenchResult], None]] = None,
+) -> List[BenchResult]:
+    """Run every case in order, calling `on_result` after each one."""
+    results = []
+    for case in cases:
+        result = run_case(case, repeat, min_time)
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+    return results
+
+
+def environment() -> Dict[str, str]:
+    """Describe the interpreter and machine a benchmark ran on."""
+    from .. import __version__
+
+    return {
+        "obdii": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def save_results(
+    results: Iterable[BenchResult], path: Union[str, PathLike], **extra: Any
+) -> None:
+    """Save results as JSON so later runs can be compared against them."""
+    document = {
+        "environment": environment(),
+        **extra,
+        "results": {result.name: asdict(result) for result in results},
+    }
+    with open(path, 'w', encoding="utf-8") as file:
+        dump(document, file, indent=2)
+
+
+def load_results(path: Union[str, PathLike]) -> Dict[str, BenchResult]:
+    """Load results saved by :func:`save_results`, keyed by case name."""
+    with open(path, encoding="utf-8") as file:
+        document = load(file)
+    return {name: BenchResult(**data) for name, data in document["results"].items()}
+
+
+def compare_results(
+    baseline: Dict[str, BenchResult], current: Iterable[BenchResult]
+) -> List[Comparison]:
+    """Compare the median of every case present in both runs."""
+    return [
+        Comparison(result.name, baseline[result.name].median_ns, result.median_ns)
+        for result in current
+        if result.name in baseline
+    ]
+
+
+def format_ns(value: float) -> str:
+    """Format a duration in nanoseconds with a readable unit."""
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if value >= scale:
+            return f"{value / scale:.2f} {unit}"
+    return f"{value:.0f} ns"
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from math import inf
+from threading import Lock
+from time import monotonic
+from typing import Dict, Final, Optional, Tuple
+
+from .command import Command
+from .modes import Mode01, Mode04, Mode09
+from .response import Response
+
+
+SESSION: Final = inf
+"""Time-to-live of data that does not change while connected, cached until invalidated."""
+
+DEFAULT_POLICIES: Final[Dict[Command, float]] = {
+    Mode01.SUPPORTED_PIDS_A: SESSION,
+    Mode01.SUPPORTED_PIDS_B: SESSION,
+    Mode01.SUPPORTED_PIDS_C: SESSION,
+    Mode01.SUPPORTED_PIDS_D: SESSION,
+    Mode01.SUPPORTED_PIDS_E: SESSION,
+    Mode01.SUPPORTED_PIDS_F: SESSION,
+    Mode01.SUPPORTED_PIDS_G: SESSION,
+    Mode01.OBD_STANDARDS: SESSION,
+    Mode01.FUEL_TYPE: SESSION,
+    Mode09.SUPPORTED_PIDS_9: SESSION,
+    Mode09.VIN_MESSAGE_COUNT: SESSION,
+    Mode09.VIN: SESSION,
+    Mode09.CALIBRATION_ID_MESSAGE_COUNT: SESSION,
+    Mode09.CALIBRATION_ID: SESSION,
+    Mode09.CVN_MESSAGE_COUNT: SESSION,
+    Mode09.CVN: SESSION,
+    Mode09.ECU_NAME_MESSAGE_COUNT: SESSION,
+    Mode09.ECU_NAME: SESSION,
+}
+"""Static vehicle information, cached for the whole session."""
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCache:
+    """
+    Per-command response cache with freshness policies, used by :class:`~obdii.Connection` when provided.
+
+    Each command has a time-to-live in seconds, :data:`SESSION` keeps a response until invalidated,
+    and 0 (the default for unlisted commands) disables caching.
+    Sending :attr:`~obdii.modes.Mode04.CLEAR_DTC` invalidates every response that is not session-wide,
+    connecting and closing a :class:`~obdii.Connection` invalidates every response.
+
+    Example
+    -------
+    .. code-block:: python
+
+        cache = ResponseCache({commands.ENGINE_COOLANT_TEMP: 5.0, commands.ENGINE_SPEED: 0.05})
+
+        with Connection("COM5", cache=cache) as conn:
+            conn.query(commands.VIN)
+            conn.query(commands.VIN)  # served from cache
+
+        >>> cache.stats()
+        CacheStats(hits=1, misses=1, size=1)
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[Command, float]] = None,
+        default_ttl: float = 0.0,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Parameters
+        ----------
+        policies: Optional[Dict[:class:`~obdii.Command`, :class:`float`]]
+            Time-to-live in seconds per command, merged over :data:`DEFAULT_POLICIES`.
+        default_ttl: :class:`float`
+            Time-to-live in seconds of commands without a policy.
+        """
+        self.policies: Dict[Command, float] = {**DEFAULT_POLICIES, **(policies or {})}
+        self.default_ttl = default_ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = Lock()
+        self._entries: Dict[Command, Tuple[float, Response]] = {}
+
+    def __repr__(self) -> str:
+        return f"<ResponseCache {len(self._entries)} entries>"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl(self, command: Command) -> float:
+        """Return the time-to-live in seconds of a command."""
+        return self.policies.get(command, self.default_ttl)
+
+    def get(self, command: Command) -> Optional[Response]:
+        """
+        Return a fresh cached response for the command, if any.
+
+        Parameters
+        ----------
+        command: :class:`~obdii.Command`
+            The command about to be sent.
+
+        Returns
+        -------
+        Optional[:class:`~obdii.Response`]
+            The cached response, or None on a miss or for non cacheable commands.
+        """
+        ttl = self.ttl(command)
+        if ttl <= 0:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(command)
+            if entry is not None and monotonic() - entry[0] <= ttl:
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+            return None
+
+    def put(self, command: Command, response: Response) -> None:
+        """
+        Store a response if its command is cacheable and the response carries data.
+
+        Parameters
+        ----------
+        command: :class:`~obdii.Command`
+            The command that was sent.
+        response: :class:`~obdii.Response`
+            The parsed response.
+        """
+        if command == Mode04.CLEAR_DTC:
+            self.invalidate(dynamic_only=True)
+            return
+
+        if self.ttl(command) <= 0:
+            return
+        if response.value is None and response.unparsed is None:
+            return
+
+        with self._lock:
+            self._entries[command] = (monotonic(), response)
+
+    def invalidate(
+        self, command: Optional[Command] = None, dynamic_only: bool = False
+    ) -> None:
+        """
+        Drop cached responses.
+
+        Parameters
+        ----------
+        command: Optional[:class:`~obdii.Command`]
+            Only drop this command's response, if omitted drop every response.
+        dynamic_only: :class:`bool`
+            Keep session-wide responses (e.g. VIN) when dropping every response.
+        """
+        with self._lock:
+            if command is not None:
+                self._entries.pop(command, None)
+            elif dynamic_only:
+                self._entries = {
+                    cmd: entry
+                    for cmd, entry in self._entries.items()
+                    if self.ttl(cmd) == SESSION
+                }
+            else:
+                self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the hit/miss statistics."""
+        with self._lock:
+            return CacheStats(self.hits, self.misses, len(self._entries))
+
+    def reset_stats(self) -> None:
+        """Reset the hit/miss counters."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
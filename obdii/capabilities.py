@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from json import dumps, loads
+from logging import getLogger
+from os import PathLike, replace
+from pathlib import Path
+from re import search
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Dict, Final, List, Optional, Tuple, Union
+
+from .command import Command
+from .errors import InvalidCommandError, ResponseBaseError
+from .modes import Mode01, ModeAT
+from .response import Response
+from .utils.bits import bytes_to_string, filter_bytes
+
+if TYPE_CHECKING:
+    from .connection import Connection
+
+
+_log = getLogger(__name__)
+
+
+Version = Tuple[int, int]
+
+EARLY_RETURN_VERSION: Final[Version] = (1, 3)
+"""First ELM327 version accepting the expected response count digit."""
+BAUDRATE_SWITCH_VERSION: Final[Version] = (1, 2)
+"""First ELM327 version supporting ``AT BRD``."""
+CLONE_VERSIONS: Final[Dict[Version, Version]] = {(1, 5): (1, 4)}
+"""Versions reported only by clones and the version they are copied from, ELM327 went from v1.4b to v2.0."""
+
+FEATURE_TESTS: Final[Dict[str, Tuple[Command, Version]]] = {
+    "CRA": (ModeAT.RESET_CAN_ADDR(), (1, 3)),
+    "IGN": (ModeAT.IGNITION_LEVEL, (1, 4)),
+    "C": (ModeAT.CONFIRMATION_ON, (2, 3)),
+}
+"""Harmless commands leaving the adapter in its default state, and the ELM327 version introducing them."""
+
+
+def parse_version(identity: str) -> Version:
+    """Return the version of an ``AT I`` identification (e.g. "ELM327 v1.4b"), (0, 0) if missing."""
+    match = search(r"v(\d+)\.(\d+)", identity)
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+@dataclass
+class Capabilities:
+    """
+    Capability profile of an adapter, see :func:`probe`.
+
+    Attributes
+    ----------
+    identity: :class:`str`
+        Identification returned by ``AT I``, e.g. "ELM327 v2.1".
+    description: :class:`str`
+        Device description returned by ``AT @1``.
+    stn: Optional[:class:`str`]
+        Identification returned by ``STI`` on STN chips, None on ELM327 adapters.
+    reported_version: Tuple[:class:`int`, :class:`int`]
+        Version claimed by the identification.
+    version: Tuple[:class:`int`, :class:`int`]
+        Version the adapter actually behaves as, lower than the reported one on clones.
+    clone: :class:`bool`
+        Whether the adapter claims features it does not support.
+    unsupported: List[:class:`str`]
+        Names of the :data:`FEATURE_TESTS` answered with ``?``.
+    early_return: Optional[:class:`bool`]
+        Whether the expected response count digit works, None until tested with a vehicle answering.
+    confirmation_off: :class:`bool`
+        Whether ``AT C0`` is supported, v2.3 and later.
+    baudrate_switch: :class:`bool`
+        Whether ``AT BRD`` can be trusted to raise the serial link speed.
+    """
+
+    identity: str
+    description: str = ""
+    stn: Optional[str] = None
+    reported_version: Version = (0, 0)
+    version: Version = (0, 0)
+    clone: bool = False
+    unsupported: List[str] = field(default_factory=list)
+    early_return: Optional[bool] = None
+    confirmation_off: bool = False
+    baudrate_switch: bool = False
+
+    @property
+    def key(self) -> str:
+        """Identity of the adapter model, used as the key of the :class:`CapabilityStore`."""
+        return "|".join((self.identity, self.description, self.stn or ""))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Capabilities:
+        data = dict(data)
+        for name in ("reported_version", "version"):
+            data[name] = tuple(data.get(name, (0, 0)))
+        return cls(**data)
+
+
+class CapabilityStore:
+    """
+    JSON file of capability profiles keyed by adapter identity, so known adapters are not probed again.
+
+    Example
+    -------
+    .. code-block:: python
+
+        store = CapabilityStore("~/.cache/obdii/adapters.json")
+
+        with Connection("COM5", capability_store=store) as conn:
+            print(conn.capabilities)
+    """
+
+    def __init__(self, path: Union[str, PathLike]) -> None:
+        """
+        Initialize the store, the file is created on the first :meth:`put`.
+
+        Parameters
+        ----------
+        path: Union[:class:`str`, :class:`os.PathLike`]
+            Path of the JSON file.
+        """
+        self.path = Path(path).expanduser()
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f"<CapabilityStore {self.path}>"
+
+    def get(self, key: str) -> Optional[Capabilities]:
+        """Return the profile of an adapter identity, None if unknown."""
+        data = self._load().get(key)
+        return Capabilities.from_dict(data) if data is not None else None
+
+    def put(self, capabilities: Capabilities) -> None:
+        """Save the profile of an adapter, replacing the previous one."""
+        with self._lock:
+            profiles = self._load()
+            profiles[capabilities.key] = capabilities.to_dict()
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_name(self.path.name + ".tmp")
+            temporary.write_text(dumps(profiles, indent=2, sort_keys=True))
+            replace(temporary, self.path)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            _log.warning(f"Ignoring unreadable capability store {self.path}: {e}")
+            return {}
+
+
+def _text(response: Response) -> str:
+    """Return the text of an AT response, also when no protocol handler is set."""
+    if isinstance(response.value, str):
+        return response.value
+    return bytes_to_string(filter_bytes(response.raw, b'>'))
+
+
+def _identify(connection: Connection) -> Capabilities:
+    identity = _text(connection.query(ModeAT.VERSION_ID))
+    description = _text(connection.query(ModeAT.DESCRIPTION))
+
+    try:
+        stn: Optional[str] = _text(connection.query(ModeAT.STN_ID)).strip()
+    except InvalidCommandError:
+        stn = None
+    if not stn or "?" in stn:
+        stn = None
+
+    version = parse_version(identity)
+    return Capabilities(identity, description, stn, version, version)
+
+
+def _test_features(connection: Connection, capabilities: Capabilities) -> None:
+    reported = capabilities.reported_version
+    passed: List[Version] = []
+
+    for name, (command, introduced) in FEATURE_TESTS.items():
+        if _text(connection.query(command)).strip() == "?":
+            capabilities.unsupported.append(name)
+        else:
+            passed.append(introduced)
+
+    failed = [FEATURE_TESTS[name][1] for name in capabilities.unsupported]
+    missing = [introduced for introduced in failed if introduced <= reported]
+
+    if capabilities.stn is None:
+        capabilities.clone = reported in CLONE_VERSIONS or bool(missing)
+
+    version = CLONE_VERSIONS.get(reported, reported)
+    if missing:
+        below = [v for v in passed if v < min(missing)]
+        version = min(version, max(below, default=(1, 0)))
+    capabilities.version = version
+
+    capabilities.confirmation_off = (
+        "C" not in capabilities.unsupported and version >= FEATURE_TESTS["C"][1]
+    )
+    capabilities.baudrate_switch = (
+        not capabilities.clone and version >= BAUDRATE_SWITCH_VERSION
+    )
+
+
+def _test_early_return(
+    connection: Connection, command: Command = Mode01.SUPPORTED_PIDS_A
+) -> Optional[bool]:
+    """Query a command with the response count digit, None when the vehicle did not answer."""
+    previous = connection.early_return
+    connection.early_return = True
+    try:
+        response = connection.query(command)
+    except InvalidCommandError:
+        return False
+    except ResponseBaseError as e:
+        _log.info(f"Early return test inconclusive: {e}")
+        return None
+    finally:
+        connection.early_return = previous
+    return bool(response.messages)
+
+
+def probe(
+    connection: Connection, store: Optional[CapabilityStore] = None
+) -> Capabilities:
+    """
+    Identify the adapter and test the features it really supports.
+
+    The identification (``AT I``, ``AT @1`` and ``STI``) is always queried, the feature tests only run
+    for adapters missing from the `store`. Clones are detected by version strings no genuine ELM327 reports
+    and by features missing from the version they claim, their actual version is derived from the features passed.
+    The early return test needs a vehicle answering, it is run again until it is conclusive.
+
+    Parameters
+    ----------
+    connection: :class:`~obdii.Connection`
+        A connected connection, with its protocol set.
+    store: Optional[:class:`CapabilityStore`]
+        Profiles of known adapters, updated with the probed profile.
+
+    Returns
+    -------
+    :class:`Capabilities`
+        The adapter profile.
+    """
+    capabilities = _identify(connection)
+    cached = store.get(capabilities.key) if store is not None else None
+
+    if cached is not None:
+        _log.info(f"Using cached capabilities of {capabilities.identity}.")
+        capabilities = cached
+        if capabilities.early_return is not None:
+            return capabilities
+    else:
+        _test_features(connection, capabilities)
+
+    if capabilities.stn is not None or capabilities.version >= EARLY_RETURN_VERSION:
+        capabilities.early_return = _test_early_return(connection)
+    else:
+        capabilities.early_return = False
+
+    if store is not None:
+        store.put(capabilities)
+    return capabilities
+
+
+def apply(connection: Connection, capabilities: Capabilities) -> None:
+    """Enable the fastest options the adapter safely supports."""
+    connection.early_return = bool(capabilities.early_return)
+    if capabilities.confirmation_off:
+        connection.query(ModeAT.CONFIRMATION_OFF)
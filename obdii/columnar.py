@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+from array import array
+from numbers import Real
+from os import PathLike, path as os_path
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .command import Command
+from .mode import Mode
+from .response import Response
+
+if TYPE_CHECKING:
+    from .connection import Connection
+
+
+def _require(module: str, extra: str) -> Any:
+    try:
+        return __import__(module)
+    except ImportError:
+        raise ImportError(
+            f"{module} is required for this export, install it with: pip install py-obdii[{extra}]"
+        ) from None
+
+
+def value_width(command: Command) -> int:
+    """Return the number of numeric components of a command's value, e.g. 2 for voltage and trim."""
+    for attribute in (command.units, command.min_values, command.max_values):
+        if isinstance(attribute, (list, tuple)):
+            return len(attribute)
+    return 1
+
+
+class _Chunk:
+    """Fixed capacity block of rows, its arrays are never resized so exported views stay valid."""
+
+    __slots__ = ("timestamps", "values", "validity", "length")
+
+    def __init__(self, capacity: int, width: int) -> None:
+        self.timestamps = array('q', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity * width))
+        self.validity = bytearray(capacity)
+        self.length = 0
+
+
+class Column:
+    """
+    Array-backed time series of the values of one command.
+
+    Rows are stored in fixed size chunks of ``int64`` nanosecond timestamps, ``float64`` values
+    (``width`` per row) and a validity byte, 0 when the response had no numeric value.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        width: int = 1,
+        units: Any = None,
+        chunk_size: int = 4096,
+    ) -> None:
+        self.name = name
+        self.width = width
+        self.units = units
+        self.chunk_size = chunk_size
+
+        self._chunks: List[_Chunk] = []
+        self._length = 0
+
+    def __repr__(self) -> str:
+        return f"<Column {self.name} {self._length} rows>"
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def nbytes(self) -> int:
+        """Memory allocated by the column's chunks."""
+        return len(self._chunks) * self.chunk_size * (17 + 8 * (self.width - 1))
+
+    def append(self, timestamp: int, value: Any) -> None:
+        """
+        Append a row.
+
+        Parameters
+        ----------
+        timestamp: :class:`int`
+            Time of the value in nanoseconds since the epoch.
+        value: Any
+            A number, or a sequence of `width` numbers, anything else is stored as missing.
+        """
+        if not self._chunks or self._chunks[-1].length == self.chunk_size:
+            self._chunks.append(_Chunk(self.chunk_size, self.width))
+
+        chunk = self._chunks[-1]
+        row = chunk.length
+        chunk.timestamps[row] = timestamp
+
+        components: Optional[Tuple[Any, ...]]
+        if self.width == 1:
+            components = (value,)
+        elif isinstance(value, (list, tuple)) and len(value) == self.width:
+            components = tuple(value)
+        else:
+            components = None
+
+        valid = components is not None and all(isinstance(c, Real) for c in components)
+        if valid:
+            start = row * self.width
+            for offset, component in enumerate(components):  # type: ignore[arg-type]
+                chunk.values[start + offset] = float(component)
+        chunk.validity[row] = valid
+
+        chunk.length += 1
+        self._length += 1
+
+    def chunks(self) -> Iterator[Tuple[memoryview, memoryview, memoryview]]:
+        """Yield zero-copy (timestamps, values, validity) views of the filled part of each chunk."""
+        for chunk in self._chunks:
+            n = chunk.length
+            yield (
+                memoryview(chunk.timestamps)[:n],
+                memoryview(chunk.values)[: n * self.width],
+                memoryview(chunk.validity)[:n],
+            )
+
+    def to_numpy(self) -> Tuple[Any, Any, Any]:
+        """
+        Export the column as NumPy arrays, requires ``numpy``.
+
+        Views share the column memory when the column fits in one chunk, otherwise chunks are concatenated once.
+
+        Returns
+        -------
+        Tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`]
+            ``int64`` timestamps, ``float64`` values (shape ``(n,)`` or ``(n, width)``), boolean validity mask.
+        """
+        np = _require("numpy", "numpy")
+
+        parts = [
+            (
+                np.frombuffer(timestamps, dtype=np.int64),
+                np.frombuffer(values, dtype=np.float64),
+                np.frombuffer(validity, dtype=np.bool_),
+            )
+            for timestamps, values, validity in self.chunks()
+        ]
+
+        if not parts:
+            timestamps = np.empty(0, dtype=np.int64)
+            values = np.empty(0, dtype=np.float64)
+            validity = np.empty(0, dtype=np.bool_)
+        elif len(parts) == 1:
+            timestamps, values, validity = parts[0]
+        else:
+            timestamps, values, validity = (np.concatenate(p) for p in zip(*parts))
+
+        if self.width > 1:
+            values = values.reshape(-1, self.width)
+        return timestamps, values, validity
+
+    def to_arrow(self) -> Any:
+        """
+        Export the column as a :class:`pyarrow.Table`, requires ``pyarrow``.
+
+        Invalid rows are nulls, multi-valued commands get one column per component.
+        """
+        pa = _require("pyarrow", "arrow")
+        timestamps, values, validity = self.to_numpy()
+
+        mask = ~validity
+        columns = {"timestamp": pa.array(timestamps, type=pa.timestamp("ns", tz="UTC"))}
+        if self.width == 1:
+            columns[self.name] = pa.array(values, mask=mask)
+        else:
+            for index in range(self.width):
+                columns[f"{self.name}_{index}"] = pa.array(values[:, index], mask=mask)
+
+        return pa.table(columns)
+
+
+class ColumnStore:
+    """
+    Columnar in-memory store of response values, one :class:`Column` per command.
+
+    Memory stays proportional to the number of rows (17 bytes per scalar row) instead of
+    keeping every :class:`~obdii.Response`, and exports to NumPy or Arrow are immediate.
+
+    Example
+    -------
+    .. code-block:: python
+
+        store = ColumnStore()
+        store.attach(conn)
+
+        for _ in range(1000):
+            conn.query(commands.ENGINE_SPEED)
+
+        timestamps, rpm, valid = store["ENGINE_SPEED"].to_numpy()
+    """
+
+    def __init__(self, chunk_size: int = 4096) -> None:
+        """
+        Initialize the store.
+
+        Parameters
+        ----------
+        chunk_size: :class:`int`
+            Rows per chunk, columns grow one chunk at a time.
+        """
+        self.chunk_size = chunk_size
+
+        self._lock = Lock()
+        self._columns: Dict[Command, Column] = {}
+
+    def __repr__(self) -> str:
+        return f"<ColumnStore {len(self._columns)} columns>"
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def __contains__(self, command: Union[Command, str]) -> bool:
+        if isinstance(command, Command):
+            return command in self._columns
+        return command in self.columns()
+
+    def __getitem__(self, command: Union[Command, str]) -> Column:
+        """Return the column of a command, or of a command label (see :attr:`~obdii.Command.label`)."""
+        if isinstance(command, Command):
+            return self._columns[command]
+        return self.columns()[command]
+
+    def columns(self) -> Dict[str, Column]:
+        """Return the columns keyed by command label (see :attr:`~obdii.Command.label`)."""
+        with self._lock:
+            return {column.name: column for column in self._columns.values()}
+
+    @property
+    def nbytes(self) -> int:
+        """Memory allocated by every column."""
+        return sum(column.nbytes for column in self.columns().values())
+
+    def append(self, response: Response) -> None:
+        """Append the value of a response to its command's column, AT command responses are ignored."""
+        command = response.context.command
+        if Mode.get_from(command.mode) in (Mode.AT, Mode.NONE):
+            return
+        timestamp = int(response.timestamp * 1e9)
+
+        with self._lock:
+            column = self._columns.get(command)
+            if column is None:
+                column = self._columns[command] = Column(
+                    command.label,
+                    value_width(command),
+                    command.units,
+                    self.chunk_size,
+                )
+            column.append(timestamp, response.value)
+
+    def attach(self, connection: Connection) -> None:
+        """Append the value of every response parsed by a connection."""
+        connection.add_hook("on_parsed", self.append)
+
+    def detach(self, connection: Connection) -> None:
+        """Stop appending the responses of a connection."""
+        connection.remove_hook("on_parsed", self.append)
+
+    def to_numpy(self) -> Dict[str, Tuple[Any, Any, Any]]:
+        """Export every column with :meth:`Column.to_numpy`, keyed by command label."""
+        return {name: column.to_numpy() for name, column in self.columns().items()}
+
+    def write_parquet(self, directory: Union[str, PathLike]) -> List[str]:
+        """
+        Write one Parquet file per command into a directory, requires ``pyarrow``.
+
+        Returns
+        -------
+        List[:class:`str`]
+            Paths of the written files.
+        """
+        _require("pyarrow", "arrow")
+        from pyarrow import parquet
+
+        paths = []
+        for name, column in self.columns().items():
+            destination = os_path.join(directory, f"{name}.parquet")
+            parquet.write_table(column.to_arrow(), destination)
+            paths.append(destination)
+        return paths
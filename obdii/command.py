@@ -194,6 +194,13 @@ class Command(Generic[T]):
     def __hash__(self) -> int:
         return hash((self.mode, self.pid))
 
+    @property
+    def label(self) -> str:
+        """Name of the command, or its query without spaces (e.g. ``"010C"``) for unnamed commands."""
+        if self.name != "Unnamed":
+            return self.name
+        return self.build().decode().replace(" ", "").strip()
+
     def __call__(self, *args, **kwargs) -> Command[T]:
         """
         Formats the command with the provided positional or keyword arguments.
@@ -223,22 +230,24 @@ class Command(Generic[T]):
             value = value.value
         return f"{value:02X}" if isinstance(value, int) else value
 
-    def _return_digit(self, early_return: bool) -> str:
+    def _return_digit(self, early_return: bool, responses: Optional[int] = None) -> str:
         """Return hex digit for expected response lines (early-return ELM327 DSL, page 34)."""
-        if not (
-            early_return
-            and self.expected_bytes
-            and isinstance(self.expected_bytes, int)
-            and Mode.get_from(self.mode) != Mode.AT
-        ):
+        if not early_return or Mode.get_from(self.mode) == Mode.AT:
             return ''
 
-        data_bytes = 7
-        n_lines = (self.expected_bytes + (data_bytes - 1)) // data_bytes
+        if responses is not None:
+            n_lines = responses
+        elif self.expected_bytes and isinstance(self.expected_bytes, int):
+            data_bytes = 7
+            n_lines = (self.expected_bytes + (data_bytes - 1)) // data_bytes
+        else:
+            return ''
 
         return f"{n_lines:X}" if 0 < n_lines < 16 else ''
 
-    def build(self, early_return: bool = False) -> bytes:
+    def build(
+        self, early_return: bool = False, responses: Optional[int] = None
+    ) -> bytes:
         """
         Builds the query to be sent to the ELM327 device as a byte string.
         (The ELM327 is case-insensitive, ignores spaces and all control characters.)
@@ -249,6 +258,9 @@ class Command(Generic[T]):
             Whether to include the early return digit in the command.
             If set to `True`, appends a hex digit representing the expected number of responses in the query.
             Defaults to `False`.
+        responses: Optional[:class:`int`]
+            Number of response lines to wait for with `early_return`, e.g. learned from the vehicle,
+            derived from `expected_bytes` when omitted.
 
         Returns
         -------
@@ -265,7 +277,7 @@ class Command(Generic[T]):
 
         mode = self._format_to_hex(self.mode)
         pid = self._format_to_hex(self.pid)
-        return_digit = self._return_digit(early_return)
+        return_digit = self._return_digit(early_return, responses)
 
         payload = f"{mode} {pid} {return_digit}".strip()
         query = f"{payload}\r"
@@ -1,16 +1,38 @@
 from __future__ import annotations
 
-from logging import Formatter, Handler, getLogger
+from concurrent.futures import Future
+from functools import partial
+from logging import DEBUG, Formatter, Handler, getLogger
+from queue import Queue
 from re import IGNORECASE, search as research
+from threading import Lock, Thread, current_thread
+from time import perf_counter_ns, time
 from types import TracebackType
-from typing import Callable, List, Optional, Tuple, Type, Union
-
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Final,
+    FrozenSet,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from .adapter_state import AdapterState
 from .basetypes import MISSING, T
+from .cache import ResponseCache
+from .capabilities import Capabilities, CapabilityStore, apply, probe as probe_adapter
 from .command import Command
+from .mode import Mode
 from .modes import ModeAT
+from .profiles import ProfileStore, VehicleProfile, discover, identify_adapter, match
 from .protocol import Protocol
 from .protocols.protocol_base import ProtocolBase
 from .response import Context, Response, ResponseBase
+from .stats import InitStep, QueryStats, QueryTiming
 from .transports.transport_base import TransportBase
 from .transports import TransportSerial, TransportSocket
 from .utils.bits import bytes_to_string, filter_bytes
@@ -20,6 +42,19 @@ from .utils.helper import debug_raw, setup_logging
 _log = getLogger(__name__)
 
 
+HOOKS: Final[Tuple[str, ...]] = ("on_send", "on_receive", "on_parsed", "on_error")
+"""Names of the events a :class:`Connection` hook can be registered for.
+
+- ``on_send(query: bytes)``: before the query is written to the transport.
+- ``on_receive(raw: bytes, elapsed: float)``: raw response read, `elapsed` seconds after the query was sent.
+- ``on_parsed(response: Response)``: response parsed by the protocol handler.
+- ``on_error(exc: Exception)``: the query failed, before the exception is raised to the caller.
+"""
+
+UNSHARED_MODES: Final[FrozenSet[Mode]] = frozenset({Mode.NONE, Mode.AT, Mode.CLEAR_DTC})
+"""Modes whose commands change the adapter or the vehicle, every request is sent even when an identical one is in flight."""
+
+
 class Connection:
     def __init__(
         self,
@@ -28,7 +63,16 @@ class Connection:
         auto_connect: bool = True,
         smart_query: bool = False,
         early_return: bool = False,
+        thread_safe: bool = False,
         *,
+        compact: bool = False,
+        headers: bool = True,
+        fast_init: bool = False,
+        probe: bool = False,
+        capability_store: Optional[CapabilityStore] = None,
+        profile_store: Optional[ProfileStore] = None,
+        cache: Optional[ResponseCache] = None,
+        adapter_state: Optional[AdapterState] = None,
         log_handler: Optional[Handler] = MISSING,
         log_formatter: Formatter = MISSING,
         log_level: int = MISSING,
@@ -52,6 +96,31 @@ class Connection:
             If True, send repeat command when the same command is issued again.
         early_return: :class:`bool`
             If set to true, the ELM327 will return immediately after sending the specified number of responses specified in the command (expected_bytes). Works only with ELM327 v1.3 and later.
+        thread_safe: :class:`bool`
+            If True, queries from any thread are serialized through a single internal worker, identical commands requested concurrently share the same in-flight :class:`Response`.
+        compact: :class:`bool`
+            If True, configure the adapter to send the fewest bytes per response: no spaces (``AT S0``), no linefeeds (``AT L0``) and no echo.
+            About a third fewer bytes are read per response, which directly raises the query rate of slow serial or wireless links.
+        headers: :class:`bool`
+            If False, the adapter does not print response headers (``AT H0``), saving more bytes on single-ECU vehicles.
+            Responses cannot be attributed to an ECU anymore, their messages are keyed by :data:`~obdii.protocols.protocol_base.HEADERLESS_ECU`.
+        fast_init: :class:`bool`
+            If True, restore the adapter defaults with ``AT D`` when it responds instead of a full ``AT Z`` hardware reset,
+            falling back to ``AT WS`` then ``AT Z``. Reconnections to a powered adapter take milliseconds instead of a second or more.
+        probe: :class:`bool`
+            If True, probe the adapter capabilities once connected and enable the fastest options it safely supports,
+            such as ``early_return``, which is disabled on adapters that do not support it. See :func:`~obdii.capabilities.probe`.
+        capability_store: Optional[:class:`~obdii.capabilities.CapabilityStore`]
+            Profiles of known adapters, skipping the feature tests of adapters already probed. Implies `probe`.
+        profile_store: Optional[:class:`~obdii.profiles.ProfileStore`]
+            Profiles of known vehicles. A known vehicle is recognized by its ``01 00`` answer and VIN on its stored protocol,
+            skipping the protocol search and the supported PIDs discovery, unknown vehicles are discovered and saved.
+            Learned response counts are used by `early_return`, latencies are saved when the connection is closed.
+        cache: Optional[:class:`~obdii.cache.ResponseCache`]
+            Serve fresh responses from this cache instead of querying the vehicle, according to its per-command policies.
+            Emptied on every connection and when the connection is closed, the next vehicle may be another one.
+        adapter_state: Optional[:class:`~obdii.adapter_state.AdapterState`]
+            Mirror of the adapter settings, AT commands which would not change them are skipped without a round trip.
 
         log_handler: :class:`logging.Handler`
             Custom log handler for the logger.
@@ -70,19 +139,45 @@ class Connection:
         self.protocol = protocol
         self.smart_query = smart_query
         self.early_return = early_return
+        self.thread_safe = thread_safe
+        self.compact = compact
+        self.headers = headers
+        self.capability_store = capability_store
+        self.capabilities: Optional[Capabilities] = None
+        self.profile_store = profile_store
+        self.profile: Optional[VehicleProfile] = None
+        self.warm_start = False
+        self.cache = cache
+        self.adapter_state = adapter_state
+        self.stats = QueryStats()
 
         self.protocol_handler = ProtocolBase.get_handler(Protocol.UNKNOWN)
         self.supported_protocols: List[Protocol] = []
         self.last_command: Optional[Command] = None
 
+        self._lock = Lock()
+        self._requests: Queue[Optional[Tuple[Command, Future]]] = Queue()
+        self._in_flight: Dict[Command, Future] = {}
+        self._worker: Optional[Thread] = None
+
+        self._hooks: Dict[str, List[Callable[..., Any]]] = {name: [] for name in HOOKS}
+
         self.init_sequence: List[Union[Command, Callable[[], None]]] = [
-            ModeAT.RESET,
+            self._fast_reset if fast_init else ModeAT.RESET,
             ModeAT.ECHO_OFF,
-            ModeAT.HEADERS_ON,
-            ModeAT.SPACES_ON,
-            self._auto_protocol,
+            ModeAT.HEADERS_ON if headers else ModeAT.HEADERS_OFF,
+            *(
+                [ModeAT.SPACES_OFF, ModeAT.LINEFEED_OFF]
+                if compact
+                else [ModeAT.SPACES_ON]
+            ),
+            self._load_profile if profile_store is not None else self._auto_protocol,
         ]
+        if probe or capability_store is not None:
+            self.init_sequence.append(self._probe_capabilities)
         self.init_completed = False
+        self.init_steps: List[InitStep] = []
+        """Duration of each step of the last initialization."""
 
         self.protocol_preferences = [
             Protocol.ISO_15765_4_CAN,
@@ -141,6 +236,10 @@ class Connection:
         _log.info(f"Attempting to connect to {repr(self.transport)}.")
         try:
             self.transport.connect(**kwargs)
+            if self.cache is not None:
+                self.cache.invalidate()
+            if self.adapter_state is not None:
+                self.adapter_state.clear()
             self._initialize_connection()
             self.init_completed = True
             _log.info(f"Successfully connected to {repr(self.transport)}.")
@@ -151,15 +250,60 @@ class Connection:
 
     def _initialize_connection(self) -> None:
         """Initializes the connection using the init sequence."""
+        self.init_steps = []
         for command in self.init_sequence:
             if isinstance(command, Command):
-                self.query(command)
+                name = command.name
+                step = partial(self.query, command)
             elif callable(command):
-                command()
+                name = getattr(command, "__name__", repr(command)).lstrip('_')
+                step = command
             else:
                 _log.error(f"Invalid type in init_sequence: {type(command)}")
                 raise TypeError(f"Invalid command type: {type(command)}")
 
+            start = perf_counter_ns()
+            try:
+                step()
+            except Exception:
+                self.init_steps.append(InitStep(name, perf_counter_ns() - start, False))
+                raise
+            self.init_steps.append(InitStep(name, perf_counter_ns() - start))
+
+        _log.debug(
+            "Initialization: "
+            + ", ".join(f"{s.name} {s.duration / 1e6:.1f} ms" for s in self.init_steps)
+        )
+
+    def _fast_reset(self) -> None:
+        """Restores the adapter defaults, with the fastest reset the adapter answers."""
+        # The probe also flushes a pending state (e.g. monitoring) before AT D
+        if self._reset_step("probe", ModeAT.ECHO_OFF, b"OK") and self._reset_step(
+            "RESET_DEFAULTS", ModeAT.RESET_DEFAULTS, b"OK"
+        ):
+            return
+        if self._reset_step("RESET_SOFT", ModeAT.RESET_SOFT, b"v"):
+            return
+
+        start = perf_counter_ns()
+        self.query(ModeAT.RESET)
+        self.init_steps.append(InitStep("RESET", perf_counter_ns() - start))
+
+    def _reset_step(self, name: str, command: Command, expected: bytes) -> bool:
+        """Sends a reset step, records its duration and returns whether the adapter answered as expected."""
+        start = perf_counter_ns()
+        try:
+            raw = self.query(command).raw
+            ok = expected in raw and b'?' not in raw
+        except Exception as e:
+            _log.debug(f"Reset step {name} failed: {e}")
+            ok = False
+
+        self.init_steps.append(InitStep(name, perf_counter_ns() - start, ok))
+        if not ok:
+            _log.info(f"Reset step {name} failed, trying a slower one.")
+        return ok
+
     def is_connected(self) -> bool:
         """
         Checks if the transport connection is open.
@@ -196,11 +340,61 @@ class Connection:
                 protocol_number = -1
 
         self.protocol = Protocol(protocol_number)
-        self.protocol_handler = ProtocolBase.get_handler(self.protocol)
+        self.protocol_handler = ProtocolBase.get_handler(self.protocol, self.headers)
         if protocol not in unwanted_protocols and protocol != self.protocol:
             _log.warning(f"Requested protocol {protocol.name} cannot be used.")
         _log.info(f"Protocol set to {self.protocol.name}.")
 
+    def _load_profile(self) -> None:
+        """Sets the protocol of the stored vehicle profile, or discovers the vehicle when it is unknown."""
+        store = self.profile_store
+        assert store is not None
+
+        requested = self.protocol
+        adapter = identify_adapter(self)
+        self.warm_start = False
+
+        # Only the most likely protocol is tried, failing on legacy protocols takes seconds
+        candidate = next(
+            (
+                p
+                for p in store.profiles(adapter)
+                if requested in (Protocol.AUTO, p.protocol)
+            ),
+            None,
+        )
+        if candidate is not None:
+            self._auto_protocol(candidate.protocol)
+            profile = match(self, store, adapter)
+            if profile is not None:
+                self.profile = profile
+                self.warm_start = True
+                _log.info(f"Warm start with the profile of {profile.key}.")
+                return
+
+        self._auto_protocol(requested)
+        self.profile = discover(self, adapter)
+        _log.info(f"Discovered the profile of {self.profile.key}.")
+        self.save_profile()
+
+    def save_profile(self) -> None:
+        """
+        Saves the vehicle profile to the :attr:`profile_store`, with the latencies measured so far.
+
+        Called when the vehicle is discovered and when the connection is closed.
+        """
+        if self.profile is None or self.profile_store is None:
+            return
+        self.profile.record(self.stats.snapshot())
+        self.profile.last_seen = time()
+        self.profile_store.put(self.profile)
+
+    def _probe_capabilities(self) -> None:
+        """Probes the adapter capabilities and enables the options it supports."""
+        self.capabilities = probe_adapter(self, self.capability_store)
+        apply(self, self.capabilities)
+        _log.info(f"Adapter capabilities: {self.capabilities}.")
+
     def _set_protocol_to(self, protocol: Protocol) -> int:
         """Attempts to set the protocol to the specified value, return the protocol number if successful."""
         self.query(ModeAT.SET_PROTOCOL(protocol.value))
@@ -241,6 +435,12 @@ class Connection:
         """
         Send a command and wait for the response.
 
+        When a :attr:`cache` is set and holds a fresh response for the command, it is returned without querying the vehicle.
+
+        When :attr:`thread_safe` is enabled the command is handed over to the internal worker,
+        if the same data request is already queued or being sent, its response is shared instead of issuing a new one.
+        Commands of the :data:`UNSHARED_MODES` (AT commands, clearing DTCs) are always sent.
+
         Parameters
         ----------
         command: :class:`Command`
@@ -251,6 +451,80 @@ class Connection:
         :class:`Response`
             Parsed response from the adapter.
         """
+        if self.cache is not None:
+            cached = self.cache.get(command)
+            if cached is not None:
+                return cached
+
+        if self.thread_safe and current_thread() is not self._worker:
+            return self._submit(command).result()
+        return self._query(command)
+
+    def _submit(self, command: Command[T]) -> Future:
+        """Queue a command for the worker, or join the identical data request already in flight."""
+        shared = Mode.get_from(command.mode) not in UNSHARED_MODES
+        with self._lock:
+            future = self._in_flight.get(command) if shared else None
+            if future is not None:
+                return future
+
+            future = Future()
+            if shared:
+                self._in_flight[command] = future
+
+            if self._worker is None or not self._worker.is_alive():
+                self._requests = Queue()
+                self._worker = Thread(
+                    target=self._process_requests,
+                    args=(self._requests,),
+                    name="obdii-query",
+                    daemon=True,
+                )
+                self._worker.start()
+
+            self._requests.put((command, future))
+        return future
+
+    def _process_requests(
+        self, requests: Queue[Optional[Tuple[Command, Future]]]
+    ) -> None:
+        """Worker loop, sends the commands of its own queue one at a time until its stop sentinel is received."""
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+
+            command, future = request
+            try:
+                response = self._query(command)
+            except BaseException as e:
+                self._release(command, future)
+                future.set_exception(e)
+            else:
+                self._release(command, future)
+                future.set_result(response)
+
+    def _release(self, command: Command, future: Future) -> None:
+        """Forget an in-flight request so later identical commands are sent again."""
+        with self._lock:
+            if self._in_flight.get(command) is future:
+                del self._in_flight[command]
+
+    def _stop_worker(self) -> None:
+        """Stop the worker once every queued request has been answered."""
+        with self._lock:
+            worker, requests = self._worker, self._requests
+            self._worker = None
+
+        if worker is None or not worker.is_alive():
+            return
+
+        requests.put(None)
+        if worker is not current_thread():
+            worker.join()
+
+    def _query(self, command: Command[T]) -> Response[T]:
+        """Build, send and wait for a command on the calling thread."""
         effective = command
         send_repeat = False
 
@@ -259,21 +533,54 @@ class Connection:
                 effective = self.last_command
             send_repeat = effective == self.last_command
 
+        if self.adapter_state is not None and self.adapter_state.is_redundant(
+            effective
+        ):
+            return Response(Context(effective, self.protocol), b'OK', value="OK")
+
         if send_repeat:
             query = ModeAT.REPEAT.build()
+        elif self.early_return and self.profile is not None:
+            query = effective.build(True, self.profile.responses(effective))
         else:
             query = effective.build(self.early_return)
 
         context = Context(effective, self.protocol)
+        timing = QueryTiming(effective, self.protocol, perf_counter_ns())
 
-        _log.debug(f">>> Send: {query}")
-
-        self.transport.write_bytes(query)
-        self.last_command = effective
+        if _log.isEnabledFor(DEBUG):
+            _log.debug(f">>> Send: {query}")
+        if self._hooks["on_send"]:
+            self._dispatch_hook("on_send", query)
 
-        return self.wait_for_response(context)
+        try:
+            self.transport.write_bytes(query)
+            timing.write_done = perf_counter_ns()
+            self.last_command = effective
 
-    def wait_for_response(self, context: Context[T]) -> Response[T]:
+            response = self.wait_for_response(context, timing)
+        except Exception as e:
+            timing.error = type(e).__name__
+            if self.adapter_state is not None:
+                self.adapter_state.update(effective, None)
+            if self._hooks["on_error"]:
+                self._dispatch_hook("on_error", e)
+            raise
+        finally:
+            self.stats.record(timing)
+
+        if self.adapter_state is not None:
+            self.adapter_state.update(effective, response)
+        if self.cache is not None:
+            self.cache.put(effective, response)
+        if self.profile is not None:
+            self.profile.learn(effective, response)
+
+        return response
+
+    def wait_for_response(
+        self, context: Context[T], timing: Optional[QueryTiming] = None
+    ) -> Response[T]:
         """
         Wait for a raw response from the transport and parses it using the protocol handler.
 
@@ -281,29 +588,113 @@ class Connection:
         ----------
         context: :class:`Context`
             Context to use for parsing.
+        timing: Optional[:class:`~obdii.stats.QueryTiming`]
+            Timing of the query, completed with the read and parse stages.
 
         Returns
         -------
         :class:`Response`
             Parsed response or raw fallback response.
         """
+        start = timing.write_start if timing is not None else perf_counter_ns()
         raw = self.transport.read_bytes()
+        received = perf_counter_ns()
+
+        if timing is not None:
+            timing.prompt = received
+            timing.first_byte = self.transport.first_byte_ns
 
         response_base = ResponseBase(context, raw)
 
-        _log.debug(f"<<< Read:\n{debug_raw(raw)}")
+        if _log.isEnabledFor(DEBUG):
+            _log.debug(f"<<< Read:\n{debug_raw(raw)}")
+        if self._hooks["on_receive"]:
+            self._dispatch_hook("on_receive", raw, (received - start) / 1e9)
 
         try:
-            return self.protocol_handler.parse_response(response_base)
+            response = self.protocol_handler.parse_response(response_base)
         except NotImplementedError:
             if self.init_completed:
                 _log.warning(f"Unsupported Protocol used: {self.protocol.name}")
-            return Response(**vars(response_base))
+            response = Response(**vars(response_base))
+        finally:
+            if timing is not None:
+                timing.parsed = perf_counter_ns()
+
+        if self._hooks["on_parsed"]:
+            self._dispatch_hook("on_parsed", response)
+
+        return response
+
+    def add_hook(self, name: str, func: Callable[..., Any]) -> None:
+        """
+        Register a callback for a query event, see :data:`HOOKS`.
+
+        Hooks run synchronously on the thread sending the query, they should be fast.
+        Exceptions raised by a hook are logged and do not interrupt the query.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            Event name, one of :data:`HOOKS`.
+        func: Callable[..., Any]
+            Callback receiving the event arguments.
+        """
+        if name not in self._hooks:
+            raise ValueError(f"Unknown hook: {name}, expected one of {HOOKS}.")
+        self._hooks[name].append(func)
+
+    def remove_hook(self, name: str, func: Callable[..., Any]) -> None:
+        """
+        Unregister a callback previously added with :meth:`add_hook`.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            Event name, one of :data:`HOOKS`.
+        func: Callable[..., Any]
+            The registered callback.
+        """
+        if name not in self._hooks:
+            raise ValueError(f"Unknown hook: {name}, expected one of {HOOKS}.")
+        try:
+            self._hooks[name].remove(func)
+        except ValueError:
+            pass
+
+    def hook(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Decorator registering a callback for the event named after the function.
+
+        Example
+        -------
+        .. code-block:: python
+
+            @conn.hook
+            def on_receive(raw: bytes, elapsed: float) -> None:
+                print(f"{len(raw)} bytes in {elapsed * 1000:.1f} ms")
+        """
+        self.add_hook(func.__name__, func)
+        return func
+
+    def _dispatch_hook(self, name: str, *args: Any) -> None:
+        for func in self._hooks[name]:
+            try:
+                func(*args)
+            except Exception:
+                _log.exception(f"Error in {name} hook {func!r}")
 
     def close(self) -> None:
         """
         Closes the transport connection.
         """
+        self._stop_worker()
+        try:
+            self.save_profile()
+        except OSError as e:
+            _log.warning(f"Failed to save the vehicle profile: {e}")
+        if self.cache is not None:
+            self.cache.invalidate()
         self.transport.close()
         _log.info("Connection closed.")
 
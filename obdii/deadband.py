@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from numbers import Real
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from .basetypes import MISSING
+from .command import Command
+from .mode import Mode
+from .response import Response
+
+if TYPE_CHECKING:
+    from .connection import Connection
+
+
+class Deadband(NamedTuple):
+    """Change below which a numeric value is considered unchanged."""
+
+    absolute: float = 0.0
+    """Minimum absolute change."""
+    relative: float = 0.0
+    """Minimum change relative to the last emitted value, e.g. 0.01 for 1%."""
+
+
+def changed(previous: Any, current: Any, deadband: Deadband) -> bool:
+    """
+    Tell whether a value changed beyond a deadband since the previous emitted value.
+
+    Numbers are compared with the deadband, sequences (e.g. :class:`~obdii.parsers.formula.MultiFormula` lists
+    or :class:`~obdii.parsers.pids.EnumeratedPIDS` pairs) element by element, anything else by equality.
+    """
+    if isinstance(previous, bool) or isinstance(current, bool):
+        return previous != current
+
+    if isinstance(previous, Real) and isinstance(current, Real):
+        threshold = max(deadband.absolute, deadband.relative * abs(float(previous)))
+        if threshold == 0:
+            return previous != current
+        return abs(float(current) - float(previous)) >= threshold
+
+    if isinstance(previous, (list, tuple)) and isinstance(current, (list, tuple)):
+        return len(previous) != len(current) or any(
+            changed(p, c, deadband) for p, c in zip(previous, current)
+        )
+
+    return previous != current
+
+
+def ecu_values(response: Response) -> Dict[Optional[bytes], Any]:
+    """
+    Return the value of each ECU's message of a response, keyed by ECU.
+
+    :attr:`~obdii.Response.value` is resolved from the first message only, the messages of the other ECUs
+    are resolved with the command's resolver. Responses without messages map None to their value.
+    """
+    if not response.messages:
+        return {None: response.value}
+
+    resolver = response.context.command.resolver
+    values: Dict[Optional[bytes], Any] = {}
+    for index, (ecu, message) in enumerate(response.messages.items()):
+        if index == 0 or not resolver:
+            values[ecu] = response.value
+        else:
+            try:
+                values[ecu] = resolver(message)
+            except Exception:
+                values[ecu] = None
+    return values
+
+
+class DeadbandFilter:
+    """
+    Pipeline stage forwarding a response only when its value changed.
+
+    The value of each ECU's message is compared with the last value forwarded for the same command and ECU,
+    a response is forwarded when the value of any of its ECUs moved beyond the command's :class:`Deadband`,
+    or when `heartbeat` seconds passed since that ECU was last forwarded, so consumers still see stable signals.
+    AT command responses are always forwarded.
+
+    Example
+    -------
+    .. code-block:: python
+
+        sink = SinkSQLite("obd_data.db")
+        deadband = DeadbandFilter(
+            sink.put,
+            policies={commands.ENGINE_SPEED: Deadband(absolute=25), commands.MAF_AIR_FLOW_RATE: Deadband(relative=0.02)},
+            heartbeat=30.0,
+        )
+        deadband.attach(conn)
+    """
+
+    def __init__(
+        self,
+        *targets: Callable[[Response], Any],
+        policies: Optional[Dict[Command, Deadband]] = None,
+        default: Optional[Deadband] = None,
+        heartbeat: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize the filter.
+
+        Parameters
+        ----------
+        *targets: Callable[[:class:`~obdii.Response`], Any]
+            Called with every forwarded response, e.g. a sink's ``put``.
+        policies: Optional[Dict[:class:`~obdii.Command`, :class:`Deadband`]]
+            Deadband of specific commands.
+        default: Optional[:class:`Deadband`]
+            Deadband of the other commands, forwards any change by default.
+        heartbeat: Optional[:class:`float`]
+            Forward an unchanged value again after this many seconds, never by default.
+        """
+        self.targets = list(targets)
+        self.policies = dict(policies or {})
+        self.default = default or Deadband()
+        self.heartbeat = heartbeat
+
+        self.forwarded = 0
+        """Number of forwarded responses."""
+        self.suppressed = 0
+        """Number of responses dropped as unchanged."""
+
+        self._lock = Lock()
+        self._last: Dict[Tuple[Any, Any, Optional[bytes]], Tuple[Any, float]] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"<DeadbandFilter forwarded={self.forwarded} suppressed={self.suppressed}>"
+        )
+
+    def policy(self, command: Command) -> Deadband:
+        """Return the deadband of a command."""
+        return self.policies.get(command, self.default)
+
+    def accept(self, response: Response) -> bool:
+        """Tell whether a response should be forwarded, and remember the value of each of its ECUs if so."""
+        command = response.context.command
+        if Mode.get_from(command.mode) in (Mode.AT, Mode.NONE):
+            return True
+
+        values = {
+            (command.mode, command.pid, ecu): value
+            for ecu, value in ecu_values(response).items()
+        }
+        policy = self.policy(command)
+
+        with self._lock:
+            accepted = False
+            for key, value in values.items():
+                previous, emitted_at = self._last.get(key, (MISSING, 0.0))
+                if (
+                    previous is MISSING
+                    or (
+                        self.heartbeat is not None
+                        and response.timestamp - emitted_at >= self.heartbeat
+                    )
+                    or changed(previous, value, policy)
+                ):
+                    accepted = True
+                    break
+
+            if accepted:
+                for key, value in values.items():
+                    self._last[key] = (value, response.timestamp)
+                self.forwarded += 1
+            else:
+                self.suppressed += 1
+        return accepted
+
+    def put(self, response: Response) -> bool:
+        """
+        Forward a response to the targets if it passes the filter.
+
+        Returns
+        -------
+        :class:`bool`
+            Whether the response was forwarded.
+        """
+        if not self.accept(response):
+            return False
+        for target in self.targets:
+            target(response)
+        return True
+
+    def reset(self) -> None:
+        """Forget the last values, the next response of every command is forwarded."""
+        with self._lock:
+            self._last.clear()
+
+    def attach(self, connection: Connection) -> None:
+        """Filter every response parsed by a connection."""
+        connection.add_hook("on_parsed", self.put)
+
+    def detach(self, connection: Connection) -> None:
+        """Stop filtering the responses of a connection."""
+        connection.remove_hook("on_parsed", self.put)
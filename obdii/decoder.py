@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from logging import getLogger
+from os import PathLike, cpu_count
+from re import IGNORECASE, fullmatch, search as research
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Final,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .command import Command
+from .modes import commands
+from .protocol import Protocol
+from .protocols.protocol_base import ProtocolBase
+from .response import Context, ResponseBase
+from .transports.transport_recorder import DIRECTION_READ, DIRECTION_WRITE, iter_records
+from .utils.bits import bytes_to_string, filter_bytes
+
+
+_log = getLogger(__name__)
+
+
+CommandRef = Union[str, Tuple[int, Optional[int]], Command]
+"""A command given by name (e.g. "ENGINE_SPEED"), by (mode, pid), or as a :class:`~obdii.Command`.
+
+Names and (mode, pid) pairs are resolved in the worker processes, custom commands are pickled.
+"""
+
+
+class DecodeResult(NamedTuple):
+    """Decoded value of a raw response."""
+
+    command: str
+    value: Any
+    unparsed: Optional[List[int]]
+    messages: Optional[Dict[bytes, List[int]]]
+    error: Optional[str] = None
+    """Name of the error raised while decoding, if any."""
+    timestamp: Optional[int] = None
+    """Timestamp of the query when decoded from a recording."""
+
+
+HEADER_SETTINGS: Final[Dict[str, bool]] = {
+    "ATH0": False,
+    "ATH1": True,
+    "ATD": False,
+    "ATZ": False,
+    "ATWS": False,
+}
+"""Headers setting of the adapter after each of these AT commands, resets restore the default (off)."""
+
+
+_Item = Tuple[int, CommandRef, bytes, Optional[int], bool]
+
+
+def to_ref(command: CommandRef) -> CommandRef:
+    """Return a cheap to pickle reference to a command, its name when it is a built-in command."""
+    if isinstance(command, Command) and command in commands:
+        return command.name
+    return command
+
+
+@lru_cache(maxsize=None)
+def _resolve_cached(ref: Union[str, Tuple[int, Optional[int]]]) -> Command:
+    if isinstance(ref, str):
+        return commands[ref]
+
+    mode, pid = ref
+    group = commands[mode]
+    if pid is None:
+        return next(command for command in group if command.pid == '')
+    return group[pid]
+
+
+def resolve_ref(ref: CommandRef) -> Command:
+    """Resolve a command reference to its :class:`~obdii.Command`."""
+    if isinstance(ref, Command):
+        return ref
+    return _resolve_cached(ref)
+
+
+@lru_cache(maxsize=None)
+def _handler(protocol: Protocol, headers: bool) -> ProtocolBase:
+    return ProtocolBase.get_handler(protocol, headers)
+
+
+def decode_one(
+    protocol: Union[Protocol, int],
+    command: CommandRef,
+    raw: bytes,
+    timestamp: Optional[int] = None,
+    headers: bool = True,
+) -> DecodeResult:
+    """
+    Decode a single raw response with the protocol handler and the command resolver.
+
+    Parameters
+    ----------
+    protocol: Union[:class:`~obdii.Protocol`, :class:`int`]
+        Protocol the response was received with.
+    command: :data:`CommandRef`
+        The command that was sent.
+    raw: :class:`bytes`
+        The raw response, as read from the adapter.
+    timestamp: Optional[:class:`int`]
+        Carried over to the result.
+    headers: :class:`bool`
+        Whether the adapter printed response headers (``AT H1``).
+    """
+    resolved = resolve_ref(command)
+    context = Context(resolved, Protocol(protocol))
+
+    try:
+        response = _handler(context.protocol, headers).parse_response(
+            ResponseBase(context, raw)
+        )
+    except Exception as e:
+        return DecodeResult(
+            resolved.name, None, None, None, type(e).__name__, timestamp
+        )
+
+    return DecodeResult(
+        resolved.name,
+        response.value,
+        response.unparsed,
+        response.messages,
+        None,
+        timestamp,
+    )
+
+
+def _decode_chunk(chunk: List[_Item]) -> List[DecodeResult]:
+    return [decode_one(*item) for item in chunk]
+
+
+def _chunks(items: Iterable[_Item], size: int) -> Iterator[List[_Item]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def decode(
+    items: Iterable[Tuple[Any, ...]],
+    workers: Optional[int] = None,
+    chunk_size: int = 512,
+) -> Iterator[DecodeResult]:
+    """
+    Decode many raw responses across a process pool, results are yielded in input order.
+
+    Items are sent to the workers in chunks, and at most two chunks per worker are in flight,
+    so arbitrarily long inputs (e.g. :func:`recording_items`) are streamed.
+
+    Parameters
+    ----------
+    items: Iterable[Tuple[Union[:class:`~obdii.Protocol`, :class:`int`], :data:`CommandRef`, :class:`bytes`]]
+        (protocol, command, raw) tuples, optionally followed by a timestamp
+        and by whether the response has headers (True by default).
+    workers: Optional[:class:`int`]
+        Number of worker processes, defaults to the number of CPUs, 1 decodes in the calling process.
+    chunk_size: :class:`int`
+        Number of items per chunk handed to a worker.
+
+    Example
+    -------
+    .. code-block:: python
+
+        items = [(Protocol.ISO_15765_4_CAN, "ENGINE_SPEED", b"7E8 04 41 0C 1A F8\\r\\r>")] * 100_000
+
+        for result in decode(items):
+            print(result.value)
+    """
+    normalized = (
+        (
+            Protocol(item[0]).value,
+            to_ref(item[1]),
+            item[2],
+            item[3] if len(item) > 3 else None,
+            item[4] if len(item) > 4 else True,
+        )
+        for item in items
+    )
+
+    if workers == 1:
+        for chunk in _chunks(normalized, chunk_size):
+            yield from _decode_chunk(chunk)
+        return
+
+    workers = workers or cpu_count() or 1
+    window = 2 * workers
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+
+        for chunk in _chunks(normalized, chunk_size):
+            pending.append(executor.submit(_decode_chunk, chunk))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+
+def command_ref_from_query(query: bytes) -> Optional[CommandRef]:
+    """Return the (mode, pid) reference of an OBD query, None for AT or unknown queries."""
+    text = bytes_to_string(filter_bytes(query, b' ', b'\r', b'\n')).upper()
+    if not fullmatch(r"[0-9A-F]{2,}", text):
+        return None
+
+    mode = int(text[:2], 16)
+    pid = int(text[2:4], 16) if len(text) >= 4 else None
+
+    try:
+        resolve_ref((mode, pid))
+    except (KeyError, StopIteration, TypeError):
+        return None
+    return (mode, pid)
+
+
+def recording_items(
+    path: Union[str, PathLike],
+    protocol: Protocol = Protocol.UNKNOWN,
+    headers: bool = True,
+) -> Iterator[_Item]:
+    """
+    Extract the (protocol, command, raw, timestamp, headers) items of the OBD exchanges of a recording.
+
+    The protocol is followed from the ``AT DPN`` responses of the recording, and the headers setting from
+    the ``AT H0`` / ``AT H1`` commands (resets turn them off, the adapter default), AT exchanges are skipped.
+
+    Parameters
+    ----------
+    path: Union[:class:`str`, :class:`os.PathLike`]
+        Recording written by :class:`~obdii.transports.TransportRecorder`.
+    protocol: :class:`~obdii.Protocol`
+        Protocol assumed until an ``AT DPN`` response is found.
+    headers: :class:`bool`
+        Whether responses have headers until an ``AT H`` command or a reset is found.
+    """
+    current = protocol
+    query: Optional[bytes] = None
+    last_ref: Optional[CommandRef] = None
+    timestamp = 0
+
+    for record in iter_records(path):
+        if record.direction == DIRECTION_WRITE:
+            query, timestamp = record.data, record.timestamp
+            continue
+        if record.direction != DIRECTION_READ or query is None:
+            continue
+
+        key = bytes_to_string(filter_bytes(query, b' ', b'\r', b'\n')).upper()
+        query = None
+
+        if key == "ATDPN":
+            line = bytes_to_string(filter_bytes(record.data, b'\r', b'>')).strip()
+            match = research(r"([0-9A-F])$", line, IGNORECASE)
+            if match:
+                current = Protocol(int(match.group(1), 16))
+            continue
+
+        if key in HEADER_SETTINGS:
+            if b"?" not in record.data:
+                headers = HEADER_SETTINGS[key]
+            continue
+
+        ref = last_ref if key == "" else command_ref_from_query(key.encode())
+        if ref is None:
+            continue
+
+        last_ref = ref
+        yield (current.value, ref, record.data, timestamp, headers)
+
+
+def decode_recording(
+    path: Union[str, PathLike],
+    protocol: Protocol = Protocol.UNKNOWN,
+    workers: Optional[int] = None,
+    chunk_size: int = 512,
+    headers: bool = True,
+) -> Iterator[DecodeResult]:
+    """Decode every OBD response of a recording, see :func:`recording_items` and :func:`decode`."""
+    return decode(recording_items(path, protocol, headers), workers, chunk_size)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from logging import getLogger
+from os import PathLike
+from pathlib import Path
+from threading import Lock
+from time import monotonic, time
+from typing import TYPE_CHECKING, Deque, Iterator, List, Optional, Union
+
+from .errors import MissingDataError, ResponseBaseError, ResponseError
+from .mode import Mode
+from .response import Response
+
+if TYPE_CHECKING:
+    from .connection import Connection
+
+
+_log = getLogger(__name__)
+
+
+OUTCOME_OK = "OK"
+"""The response was parsed and resolved."""
+OUTCOME_NO_MESSAGE = "NO_MESSAGE"
+"""No message could be reassembled from the raw response."""
+OUTCOME_UNRESOLVED = "UNRESOLVED"
+"""A message was reassembled but the command's resolver did not produce a value."""
+
+
+class Exchange:
+    """A single query and its raw response, as kept by :class:`FlightRecorder`."""
+
+    __slots__ = ("timestamp", "query", "raw", "outcome")
+
+    def __init__(
+        self,
+        timestamp: float,
+        query: bytes,
+        raw: Optional[bytes] = None,
+        outcome: Optional[str] = None,
+    ) -> None:
+        self.timestamp = timestamp
+        self.query = query
+        self.raw = raw
+        self.outcome = outcome
+
+    def __repr__(self) -> str:
+        return f"<Exchange {self.query!r} {self.outcome}>"
+
+    def __str__(self) -> str:
+        moment = datetime.fromtimestamp(self.timestamp).isoformat(
+            timespec="milliseconds"
+        )
+        return f"{moment} {self.outcome} >>> {self.query!r} <<< {self.raw!r}"
+
+
+def parse_outcome(response: Response) -> str:
+    """Classify a parsed response for the flight recorder."""
+    command = response.context.command
+    if Mode.get_from(command.mode) in (Mode.AT, Mode.NONE):
+        return OUTCOME_OK
+    if not response.messages:
+        return OUTCOME_NO_MESSAGE
+    if command.resolver and response.value is None:
+        return OUTCOME_UNRESOLVED
+    return OUTCOME_OK
+
+
+class FlightRecorder:
+    """
+    Fixed-size ring buffer of the last raw exchanges of a :class:`~obdii.Connection`.
+
+    Keeps post-mortem context without DEBUG logging every exchange,
+    the buffer can be dumped on demand, or automatically when a :class:`~obdii.errors.ResponseError` or a parse failure occurs.
+    ``NO DATA`` answers, routine when polling unsupported PIDs, are recorded without triggering a dump.
+    Automatic dumps are written to timestamped files next to `dump_path`, at most one every `dump_interval` seconds,
+    so the dump of the first fault is kept.
+
+    Example
+    -------
+    .. code-block:: python
+
+        recorder = FlightRecorder(capacity=200, dump_path="obdii-crash.log")
+        recorder.attach(conn)
+
+        ...
+
+        recorder.dump("obdii-exchanges.log")
+    """
+
+    def __init__(
+        self,
+        capacity: int = 256,
+        dump_path: Optional[Union[str, PathLike]] = None,
+        dump_on_error: bool = True,
+        dump_interval: float = 60.0,
+    ) -> None:
+        """
+        Initialize the recorder.
+
+        Parameters
+        ----------
+        capacity: :class:`int`
+            Number of exchanges kept, older exchanges are discarded.
+        dump_path: Optional[Union[:class:`str`, :class:`os.PathLike`]]
+            Default file written by :meth:`dump`, required for automatic dumps,
+            which are written next to it with a timestamp suffix (e.g. ``obdii-crash-20250101-120000-000000.log``).
+        dump_on_error: :class:`bool`
+            Dump automatically when a response error or a parse failure occurs.
+        dump_interval: :class:`float`
+            Minimum number of seconds between two automatic dumps.
+        """
+        self.capacity = capacity
+        self.dump_path = dump_path
+        self.dump_on_error = dump_on_error
+        self.dump_interval = dump_interval
+
+        self._lock = Lock()
+        self._exchanges: Deque[Exchange] = deque(maxlen=capacity)
+        self._pending: Optional[Exchange] = None
+        self._last_dump: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return f"<FlightRecorder {len(self)}/{self.capacity}>"
+
+    def __len__(self) -> int:
+        return len(self._exchanges)
+
+    def __iter__(self) -> Iterator[Exchange]:
+        return iter(self.exchanges())
+
+    def exchanges(self) -> List[Exchange]:
+        """Return the recorded exchanges, oldest first."""
+        with self._lock:
+            return list(self._exchanges)
+
+    def clear(self) -> None:
+        """Forget every recorded exchange."""
+        with self._lock:
+            self._exchanges.clear()
+            self._pending = None
+
+    def attach(self, connection: Connection) -> None:
+        """Start recording the exchanges of a connection."""
+        connection.add_hook("on_send", self.on_send)
+        connection.add_hook("on_receive", self.on_receive)
+        connection.add_hook("on_parsed", self.on_parsed)
+        connection.add_hook("on_error", self.on_error)
+
+    def detach(self, connection: Connection) -> None:
+        """Stop recording the exchanges of a connection."""
+        connection.remove_hook("on_send", self.on_send)
+        connection.remove_hook("on_receive", self.on_receive)
+        connection.remove_hook("on_parsed", self.on_parsed)
+        connection.remove_hook("on_error", self.on_error)
+
+    def on_send(self, query: bytes) -> None:
+        with self._lock:
+            self._pending = Exchange(time(), query)
+            self._exchanges.append(self._pending)
+
+    def on_receive(self, raw: bytes, elapsed: float) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.raw = raw
+
+    def on_parsed(self, response: Response) -> None:
+        outcome = parse_outcome(response)
+        failed = outcome != OUTCOME_OK and not isinstance(
+            ResponseBaseError.detect(response.raw), MissingDataError
+        )
+        self._complete(outcome, failed)
+
+    def on_error(self, exc: Exception) -> None:
+        failed = isinstance(exc, ResponseError) and not isinstance(
+            exc, MissingDataError
+        )
+        self._complete(type(exc).__name__, failed)
+
+    def _complete(self, outcome: str, failed: bool) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.outcome = outcome
+                self._pending = None
+
+        if failed and self.dump_on_error and self.dump_path is not None:
+            now = monotonic()
+            with self._lock:
+                if (
+                    self._last_dump is not None
+                    and now - self._last_dump < self.dump_interval
+                ):
+                    return
+                self._last_dump = now
+
+            path = Path(self.dump_path)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            self.dump(path.with_name(f"{path.stem}-{stamp}{path.suffix}"))
+
+    def dump(self, path: Optional[Union[str, PathLike]] = None) -> None:
+        """
+        Write the recorded exchanges to a text file, one exchange per line, oldest first.
+
+        Parameters
+        ----------
+        path: Optional[Union[:class:`str`, :class:`os.PathLike`]]
+            Destination file, defaults to :attr:`dump_path`.
+        """
+        destination = path if path is not None else self.dump_path
+        if destination is None:
+            raise ValueError("No dump path given.")
+
+        lines = [f"{exchange}\n" for exchange in self.exchanges()]
+        with open(destination, 'w', encoding="utf-8") as file:
+            file.writelines(lines)
+
+        _log.info(f"Dumped {len(lines)} exchanges to {destination}.")
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from types import TracebackType
+from typing import TYPE_CHECKING, Dict, Final, Iterable, List, Optional, Type, Union
+
+from .command import Command
+from .modes import Mode09, ModeAT
+from .protocol import Protocol
+from .protocols.protocol_can import CAN_PROTOCOLS
+from .response import Response
+from .targeting import EcuAddress
+
+if TYPE_CHECKING:
+    from .connection import Connection
+
+
+BULK_COMMANDS: Final[List[Command]] = [
+    Mode09.VIN,
+    Mode09.CALIBRATION_ID,
+    Mode09.CVN,
+    Mode09.ECU_NAME,
+]
+"""Vehicle information read with long multi-frame responses."""
+
+CLEAR_TO_SEND: Final = 0x30
+"""ISO-TP flow control frame type and flag: continue to send."""
+
+
+def flow_control_data(block_size: int = 0, separation_time: int = 0) -> str:
+    """
+    Return the ``AT FC SD`` data of a continue-to-send ISO-TP flow control frame.
+
+    Parameters
+    ----------
+    block_size: :class:`int`
+        Consecutive frames the ECU may send before waiting for another flow control frame, 0 for no limit.
+    separation_time: :class:`int`
+        Minimum time between consecutive frames (STmin), 0x00-0x7F in milliseconds, 0xF1-0xF9 in hundreds of microseconds.
+    """
+    if not 0 <= block_size <= 0xFF:
+        raise ValueError(f"Invalid block size: {block_size}.")
+    if not (0 <= separation_time <= 0x7F or 0xF1 <= separation_time <= 0xF9):
+        raise ValueError(f"Invalid separation time: {separation_time:#04x}.")
+    return f"{CLEAR_TO_SEND:02X} {block_size:02X} {separation_time:02X}"
+
+
+DEFAULT_FLOW_CONTROL_DATA: Final = flow_control_data()
+"""Data of the automatic flow control frames: no block size limit and no separation time."""
+
+
+class FlowControl:
+    """
+    Context manager setting user defined ISO-TP flow control for bulk multi-frame reads.
+
+    Inside the block the adapter answers every first frame with a flow control frame carrying
+    the given block size and separation time. Without `header`, the flow control frames keep
+    their automatic header (``AT FC SM 2``), so every ECU answering a functional request receives one,
+    and nothing is sent at all with the defaults (block size 0, STmin 0) the adapter already uses.
+    With a `header`, every flow control frame is sent to it (``AT FC SM 1``).
+    Automatic flow control (``AT FC SM 0``) is restored on exit.
+
+    Example
+    -------
+    .. code-block:: python
+
+        with FlowControl(conn):
+            vin = conn.query(commands.VIN)
+            calibration_id = conn.query(commands.CALIBRATION_ID)
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        header: Union[str, EcuAddress, None] = None,
+        block_size: int = 0,
+        separation_time: int = 0,
+    ) -> None:
+        """
+        Initialize the flow control settings.
+
+        Parameters
+        ----------
+        connection: :class:`~obdii.Connection`
+            The connection to configure.
+        header: Union[:class:`str`, :class:`~obdii.targeting.EcuAddress`, None]
+            Fixed header of the flow control frames, the ECU request header, automatic when omitted.
+        block_size: :class:`int`
+            See :func:`flow_control_data`.
+        separation_time: :class:`int`
+            See :func:`flow_control_data`.
+        """
+        self.connection = connection
+        self.header = header.request if isinstance(header, EcuAddress) else header
+        self.data = flow_control_data(block_size, separation_time)
+        self._active = False
+
+    def __repr__(self) -> str:
+        return f"<FlowControl {self.header or 'default'} {self.data}>"
+
+    def commands(self) -> List[Command]:
+        """
+        Return the commands enabling user defined flow control, header and data must be set before the mode.
+
+        Empty without header with the default data, the automatic flow control frames are identical.
+        """
+        protocol = self.connection.protocol
+        if protocol not in CAN_PROTOCOLS:
+            raise ValueError(
+                f"Flow control requires a CAN protocol, got {Protocol(protocol).name}."
+            )
+
+        if self.header is None:
+            if self.data == DEFAULT_FLOW_CONTROL_DATA:
+                return []
+            return [
+                ModeAT.FLOW_CONTROL_ON,
+                ModeAT.SET_FLOW_CONTROL_DATA(self.data),
+                ModeAT.SET_FLOW_CONTROL_MODE(2),
+            ]
+
+        set_header = (
+            ModeAT.SET_FLOW_CONTROL_HEADER_LONG
+            if len(self.header) == 8
+            else ModeAT.SET_FLOW_CONTROL_HEADER
+        )
+        return [
+            ModeAT.FLOW_CONTROL_ON,
+            set_header(self.header),
+            ModeAT.SET_FLOW_CONTROL_DATA(self.data),
+            ModeAT.SET_FLOW_CONTROL_MODE(1),
+        ]
+
+    def __enter__(self) -> FlowControl:
+        commands = self.commands()
+        self._active = bool(commands)
+        for command in commands:
+            self.connection.query(command)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if self._active:
+            self._active = False
+            self.connection.query(ModeAT.SET_FLOW_CONTROL_MODE(0))
+
+
+def read_bulk(
+    connection: Connection,
+    commands: Iterable[Command] = BULK_COMMANDS,
+    **kwargs,
+) -> Dict[str, Response]:
+    """
+    Read multi-frame commands with :class:`FlowControl` enabled once for all of them.
+
+    Parameters
+    ----------
+    connection: :class:`~obdii.Connection`
+        The connection to query.
+    commands: Iterable[:class:`~obdii.Command`]
+        The commands to read, :data:`BULK_COMMANDS` by default.
+    **kwargs:
+        Flow control settings, see :class:`FlowControl`.
+
+    Returns
+    -------
+    Dict[:class:`str`, :class:`~obdii.Response`]
+        Responses keyed by command name.
+    """
+    with FlowControl(connection, **kwargs):
+        return {command.name: connection.query(command) for command in commands}
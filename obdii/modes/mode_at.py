@@ -299,4 +299,8 @@ class ModeAT(GroupCommands, registry_id=M):
     MONITOR_PGN_LONG = C(t("MP {hhhhhh}"))
     """Monitor for J1939 PGN hhhhhh"""
     MONITOR_PGN_LONG_N = C(t("MP {hhhhhh} {n}"))
-    """Monitor for J1939 PGN hhhhhh, fetching n messages before stopping"""
\ No newline at end of file
+    """Monitor for J1939 PGN hhhhhh, fetching n messages before stopping"""
+
+    # STN Commands | STN11xx/STN2xxx chips, not part of the ELM327 command set
+    STN_ID = Command(Mode.NONE, "STI")
+    """Display the STN chip identification and firmware version, answered with ``?`` by ELM327 adapters"""
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+from heapq import heappop, heappush
+from logging import getLogger
+from numbers import Real
+from time import monotonic, sleep
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Final,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from .basetypes import MISSING
+from .command import Command
+from .errors import ResponseBaseError
+from .modes import Mode01
+from .response import Response
+
+if TYPE_CHECKING:
+    from .connection import Connection
+
+
+_log = getLogger(__name__)
+
+
+class RateBounds(NamedTuple):
+    """Query rate limits of a command, in queries per second."""
+
+    min_rate: float = 0.2
+    max_rate: float = 10.0
+
+
+DEFAULT_BOUNDS: Final[Dict[Command, RateBounds]] = {
+    Mode01.ENGINE_SPEED: RateBounds(2.0, 50.0),
+    Mode01.VEHICLE_SPEED: RateBounds(1.0, 50.0),
+    Mode01.THROTTLE_POSITION: RateBounds(1.0, 50.0),
+    Mode01.ENGINE_LOAD: RateBounds(1.0, 20.0),
+    Mode01.ENGINE_COOLANT_TEMP: RateBounds(0.05, 1.0),
+    Mode01.ENGINE_OIL_TEMP: RateBounds(0.05, 1.0),
+    Mode01.INTAKE_AIR_TEMP: RateBounds(0.05, 1.0),
+    Mode01.AMBIENT_AIR_TEMP: RateBounds(0.02, 0.5),
+    Mode01.BAROMETRIC_PRESSURE: RateBounds(0.02, 0.5),
+    Mode01.FUEL_LEVEL: RateBounds(0.02, 0.5),
+}
+"""Rate bounds of common fast and slow signals."""
+
+
+class _Signal:
+    """Adaptive scheduling state of one polled command."""
+
+    __slots__ = (
+        "command",
+        "bounds",
+        "thresholds",
+        "rate",
+        "activity",
+        "value",
+        "polled_at",
+    )
+
+    def __init__(
+        self, command: Command, bounds: RateBounds, thresholds: List[float]
+    ) -> None:
+        self.command = command
+        self.bounds = bounds
+        self.thresholds = thresholds
+        self.rate = bounds.max_rate
+        self.activity = bounds.max_rate
+        self.value: Any = MISSING
+        self.polled_at = 0.0
+
+    def change(self, value: Any) -> float:
+        """Return the change since the last value, in thresholds."""
+        previous = self.value
+        if previous is MISSING or previous is None or value is None:
+            return 0.0 if previous is value else 1.0
+
+        if isinstance(previous, (list, tuple)) and isinstance(value, (list, tuple)):
+            if len(previous) != len(value):
+                return 1.0
+            pairs = list(zip(previous, value))
+        else:
+            pairs = [(previous, value)]
+
+        change = 0.0
+        for index, (before, after) in enumerate(pairs):
+            if (
+                isinstance(before, Real)
+                and isinstance(after, Real)
+                and not isinstance(after, bool)
+            ):
+                threshold = self.thresholds[min(index, len(self.thresholds) - 1)]
+                change = max(change, abs(float(after) - float(before)) / threshold)
+            elif before != after:
+                change = max(change, 1.0)
+        return change
+
+
+def _as_list(values: Any) -> List[Any]:
+    if values is None or values is MISSING:
+        return []
+    return list(values) if isinstance(values, (list, tuple)) else [values]
+
+
+class AdaptivePoller:
+    """
+    Polling loop adapting the query rate of each command to how fast its value moves.
+
+    A command is queried about once per significant change of its value (its threshold,
+    `resolution` of its value range by default), within its :class:`RateBounds`:
+    stable signals such as coolant temperature fall back to their minimum rate,
+    and rise again as soon as they start moving. Commands are sent earliest deadline first,
+    so the bus time freed by slow signals goes to the fast ones, up to their maximum rate.
+
+    Example
+    -------
+    .. code-block:: python
+
+        poller = AdaptivePoller(
+            conn,
+            [commands.ENGINE_SPEED, commands.VEHICLE_SPEED, commands.ENGINE_COOLANT_TEMP, commands.FUEL_LEVEL],
+        )
+
+        for response in poller.run(duration=60):
+            print(response.context.command.name, response.value)
+
+        >>> poller.rates()
+        {'ENGINE_SPEED': 50.0, 'VEHICLE_SPEED': 12.5, 'ENGINE_COOLANT_TEMP': 0.05, 'FUEL_LEVEL': 0.02}
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        commands: Iterable[Command],
+        bounds: Optional[Dict[Command, RateBounds]] = None,
+        default: Optional[RateBounds] = None,
+        resolution: float = 0.005,
+        thresholds: Optional[Dict[Command, float]] = None,
+        smoothing: float = 0.2,
+    ) -> None:
+        """
+        Initialize the poller.
+
+        Parameters
+        ----------
+        connection: :class:`~obdii.Connection`
+            The connection to query.
+        commands: Iterable[:class:`~obdii.Command`]
+            The commands to poll.
+        bounds: Optional[Dict[:class:`~obdii.Command`, :class:`RateBounds`]]
+            Rate bounds of specific commands, merged over :data:`DEFAULT_BOUNDS`.
+        default: Optional[:class:`RateBounds`]
+            Rate bounds of the other commands, :class:`RateBounds` defaults when omitted.
+        resolution: :class:`float`
+            Significant change as a fraction of the command's value range, e.g. 0.005 for 0.5%.
+        thresholds: Optional[Dict[:class:`~obdii.Command`, :class:`float`]]
+            Significant change of specific commands, in their units.
+        smoothing: :class:`float`
+            Weight of the latest sample when the activity of a signal decreases, increases are followed at once.
+        """
+        self.connection = connection
+        self.bounds = {**DEFAULT_BOUNDS, **(bounds or {})}
+        self.default = default or RateBounds()
+        self.resolution = resolution
+        self.smoothing = smoothing
+
+        self._signals: Dict[Command, _Signal] = {}
+        self._schedule: List[Tuple[float, int, _Signal]] = []
+        self._sequence = 0
+        self._running = False
+
+        now = monotonic()
+        for command in commands:
+            signal = _Signal(
+                command,
+                self.bounds.get(command, self.default),
+                self._thresholds(command, (thresholds or {}).get(command)),
+            )
+            self._signals[command] = signal
+            self._push(now, signal)
+
+    def __repr__(self) -> str:
+        return f"<AdaptivePoller {len(self._signals)} commands>"
+
+    def rates(self) -> Dict[str, float]:
+        """Return the current query rate of every command, in queries per second."""
+        return {signal.command.name: signal.rate for signal in self._signals.values()}
+
+    def rate(self, command: Command) -> float:
+        """Return the current query rate of a command."""
+        return self._signals[command].rate
+
+    def step(self, wait: bool = True) -> Optional[Response]:
+        """
+        Query the command whose deadline is the earliest.
+
+        Parameters
+        ----------
+        wait: :class:`bool`
+            Sleep until the deadline, otherwise the command is queried ahead of time.
+
+        Returns
+        -------
+        Optional[:class:`~obdii.Response`]
+            The response, None when the query failed.
+        """
+        due, _, signal = heappop(self._schedule)
+        try:
+            if wait:
+                delay = due - monotonic()
+                if delay > 0:
+                    sleep(delay)
+
+            try:
+                response = self.connection.query(signal.command)
+            except ResponseBaseError as e:
+                _log.warning(f"Polling {signal.command.name} failed: {e}")
+                signal.rate = signal.activity = signal.bounds.min_rate
+                return None
+
+            self._update(signal, response.value, monotonic())
+            return response
+        finally:
+            # Scheduled again whatever happened, other errors (e.g. a lost transport) propagate to the caller
+            self._push(monotonic() + 1 / signal.rate, signal)
+
+    def run(
+        self,
+        duration: Optional[float] = None,
+        count: Optional[int] = None,
+    ) -> Iterator[Response]:
+        """
+        Poll until :meth:`stop` is called, `duration` seconds passed, or `count` queries were sent.
+
+        Yields
+        ------
+        :class:`~obdii.Response`
+            Every successful response.
+        """
+        deadline = monotonic() + duration if duration is not None else None
+        sent = 0
+        self._running = True
+
+        while self._running and self._schedule:
+            if deadline is not None and self._schedule[0][0] > deadline:
+                break
+            if count is not None and sent >= count:
+                break
+
+            response = self.step()
+            sent += 1
+            if response is not None:
+                yield response
+
+        self._running = False
+
+    def stop(self) -> None:
+        """Stop :meth:`run` after the current query."""
+        self._running = False
+
+    def _thresholds(self, command: Command, threshold: Optional[float]) -> List[float]:
+        """Return the significant change of each component of a command's value."""
+        if threshold is not None:
+            return [threshold]
+
+        minimums = _as_list(command.min_values)
+        maximums = _as_list(command.max_values)
+        spans = [
+            (high - low) * self.resolution
+            for low, high in zip(minimums, maximums)
+            if isinstance(low, Real) and isinstance(high, Real) and high > low
+        ]
+        return spans or [1.0]
+
+    def _update(self, signal: _Signal, value: Any, now: float) -> None:
+        """Update the activity and rate of a signal from its latest value."""
+        if signal.value is not MISSING:
+            elapsed = max(now - signal.polled_at, 1e-6)
+            instant = signal.change(value) / elapsed
+            if instant >= signal.activity:
+                signal.activity = instant
+            else:
+                signal.activity += self.smoothing * (instant - signal.activity)
+
+        signal.value = value
+        signal.polled_at = now
+        low, high = signal.bounds
+        signal.rate = min(high, max(low, signal.activity))
+
+    def _push(self, due: float, signal: _Signal) -> None:
+        self._sequence += 1
+        heappush(self._schedule, (due, self._sequence, signal))
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from json import dumps, loads
+from logging import getLogger
+from os import PathLike, replace
+from pathlib import Path
+from re import compile
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Dict, Final, List, Optional, Pattern, Union
+
+from .capabilities import _text
+from .command import Command
+from .errors import ResponseBaseError
+from .mode import Mode
+from .modes import Mode01, Mode09, ModeAT
+from .protocol import Protocol
+from .protocols.protocol_base import HEADERLESS_ECU, ProtocolBase
+from .protocols.protocol_can import CAN_PROTOCOLS
+from .response import Response
+from .stats import StatsSnapshot
+from .targeting import EcuAddress
+
+if TYPE_CHECKING:
+    from .connection import Connection
+
+
+_log = getLogger(__name__)
+
+
+DISCOVERY_COMMANDS: Final[Dict[int, List[Command]]] = {
+    0x01: [
+        Mode01.SUPPORTED_PIDS_A,
+        Mode01.SUPPORTED_PIDS_B,
+        Mode01.SUPPORTED_PIDS_C,
+        Mode01.SUPPORTED_PIDS_D,
+        Mode01.SUPPORTED_PIDS_E,
+        Mode01.SUPPORTED_PIDS_F,
+        Mode01.SUPPORTED_PIDS_G,
+    ],
+    0x09: [Mode09.SUPPORTED_PIDS_9],
+}
+"""Supported PIDs commands of each mode, each one queried only when the previous bitmap announces it."""
+
+HEADERLESS_LENGTH: Final[Pattern[bytes]] = compile(rb"[0-9A-Fa-f]{3}")
+"""Length line printed before the segments of a headerless multi-frame CAN response."""
+
+FINGERPRINT_COMMAND: Final[Command] = Mode01.SUPPORTED_PIDS_A
+"""Command identifying a vehicle by the ECUs answering it and their bitmaps, the first query of a warm start."""
+
+
+@lru_cache(maxsize=None)
+def query_key(command: Command) -> str:
+    """Return the key of a command in a profile, its query without spaces and early return digit (e.g. "010C")."""
+    return command.build().decode().replace(" ", "").strip()
+
+
+def count_frames(raw: bytes) -> int:
+    """
+    Return the number of frames of a raw response, as counted by the early return digit.
+
+    Without headers, multi-frame CAN responses start with a line holding the message length (e.g. "014"),
+    it is not a frame.
+    """
+    return sum(
+        1
+        for line in ProtocolBase.to_lines(raw)
+        if not HEADERLESS_LENGTH.fullmatch(line.replace(b" ", b"").strip())
+    )
+
+
+def fingerprint(response: Response) -> str:
+    """Return the fingerprint of the ECUs answering a :data:`FINGERPRINT_COMMAND`, e.g. "7E8:BE1FA813,7E9:00080000"."""
+    return ",".join(
+        f"{ecu.decode()}:{bytes(data).hex().upper()}"
+        for ecu, data in sorted((response.messages or {}).items())
+    )
+
+
+@dataclass
+class VehicleProfile:
+    """
+    Everything learned about a vehicle, reused by the next connections, see :class:`ProfileStore`.
+
+    Attributes
+    ----------
+    fingerprint: :class:`str`
+        ECUs answering the :data:`FINGERPRINT_COMMAND` and their bitmaps, see :func:`fingerprint`.
+    protocol: :class:`~obdii.Protocol`
+        Protocol of the vehicle.
+    adapter: :class:`str`
+        Identification of the adapter it was discovered with (``AT I`` and ``AT @2``).
+    vin: Optional[:class:`str`]
+        Vehicle identification number, None if the vehicle does not report it.
+    ecus: List[:class:`~obdii.targeting.EcuAddress`]
+        Physical addresses of the ECUs, empty on non-CAN protocols and without headers.
+    supported_pids: Dict[:class:`int`, List[:class:`int`]]
+        PIDs supported by any ECU, keyed by mode.
+    response_counts: Dict[:class:`str`, :class:`int`]
+        Highest number of response frames observed per query (see :func:`query_key`),
+        used as the early return count instead of the one derived from the expected bytes.
+    latencies: Dict[:class:`str`, :class:`float`]
+        Median round trip of each command in milliseconds, keyed by :attr:`~obdii.Command.label`.
+    last_seen: :class:`float`
+        Time of the last connection, in seconds since the epoch.
+    """
+
+    fingerprint: str
+    protocol: Protocol
+    adapter: str = ""
+    vin: Optional[str] = None
+    ecus: List[EcuAddress] = field(default_factory=list)
+    supported_pids: Dict[int, List[int]] = field(default_factory=dict)
+    response_counts: Dict[str, int] = field(default_factory=dict)
+    latencies: Dict[str, float] = field(default_factory=dict)
+    last_seen: float = 0.0
+
+    @property
+    def key(self) -> str:
+        """Key of the profile in the :class:`ProfileStore`, the VIN, or the adapter and fingerprint without it."""
+        return self.vin or "|".join((self.adapter, self.fingerprint))
+
+    def is_supported(self, command: Command) -> bool:
+        """Whether an ECU announced support of a Mode 01 or 09 command, commands of other modes are assumed supported."""
+        number = command.mode.value if isinstance(command.mode, Mode) else command.mode
+        if number not in self.supported_pids or not isinstance(command.pid, int):
+            return True
+        return command.pid % 0x20 == 0 or command.pid in self.supported_pids[number]
+
+    def responses(self, command: Command) -> Optional[int]:
+        """Return the learned number of response frames of a command, None if unknown."""
+        return self.response_counts.get(query_key(command))
+
+    def learn(self, command: Command, response: Response) -> None:
+        """Record the number of frames of a response, AT commands and empty responses are ignored."""
+        if Mode.get_from(command.mode) is Mode.AT or not response.messages:
+            return
+
+        key = query_key(command)
+        frames = count_frames(response.raw)
+        if frames > self.response_counts.get(key, 0):
+            self.response_counts[key] = frames
+
+    def record(self, snapshot: StatsSnapshot) -> None:
+        """Update the latencies with the query statistics of a session."""
+        for name, stats in snapshot.commands.items():
+            total = stats.stages.get("total")
+            if total is not None:
+                self.latencies[name] = round(total.p50, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint,
+            "protocol": self.protocol.value,
+            "adapter": self.adapter,
+            "vin": self.vin,
+            "ecus": [list(ecu) for ecu in self.ecus],
+            "supported_pids": {
+                f"{mode:02X}": pids for mode, pids in self.supported_pids.items()
+            },
+            "response_counts": dict(self.response_counts),
+            "latencies": dict(self.latencies),
+            "last_seen": self.last_seen,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> VehicleProfile:
+        data = dict(data)
+        data["protocol"] = Protocol(data["protocol"])
+        data["ecus"] = [EcuAddress(*ecu) for ecu in data.get("ecus", [])]
+        data["supported_pids"] = {
+            int(mode, 16): pids for mode, pids in data.get("supported_pids", {}).items()
+        }
+        return cls(**data)
+
+
+class ProfileStore:
+    """
+    JSON file of vehicle profiles, so known vehicles are not discovered again.
+
+    Example
+    -------
+    .. code-block:: python
+
+        store = ProfileStore("~/.cache/obdii/vehicles.json")
+
+        with Connection("COM5", profile_store=store) as conn:
+            print(conn.warm_start, conn.profile.vin)
+    """
+
+    def __init__(self, path: Union[str, PathLike]) -> None:
+        """
+        Initialize the store, the file is created on the first :meth:`put`.
+
+        Parameters
+        ----------
+        path: Union[:class:`str`, :class:`os.PathLike`]
+            Path of the JSON file.
+        """
+        self.path = Path(path).expanduser()
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f"<ProfileStore {self.path}>"
+
+    def get(self, key: str) -> Optional[VehicleProfile]:
+        """Return the profile of a VIN, or of an adapter and fingerprint, None if unknown."""
+        data = self._load().get(key)
+        return VehicleProfile.from_dict(data) if data is not None else None
+
+    def profiles(self, adapter: Optional[str] = None) -> List[VehicleProfile]:
+        """Return every profile, the ones discovered with the `adapter` first, then the most recently seen first."""
+        profiles = [VehicleProfile.from_dict(data) for data in self._load().values()]
+        profiles.sort(key=lambda p: (p.adapter != adapter, -p.last_seen))
+        return profiles
+
+    def put(self, profile: VehicleProfile) -> None:
+        """Save the profile of a vehicle, replacing the previous one."""
+        with self._lock:
+            profiles = self._load()
+            profiles[profile.key] = profile.to_dict()
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_name(self.path.name + ".tmp")
+            temporary.write_text(dumps(profiles, indent=2, sort_keys=True))
+            replace(temporary, self.path)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            _log.warning(f"Ignoring unreadable profile store {self.path}: {e}")
+            return {}
+
+
+def identify_adapter(connection: Connection) -> str:
+    """Return the identification of the adapter, ``AT I`` followed by the ``AT @2`` device identifier when programmed."""
+    identity = _text(connection.query(ModeAT.VERSION_ID)).strip()
+    try:
+        device = _text(connection.query(ModeAT.DEVICE_ID)).strip()
+    except ResponseBaseError:
+        device = ""
+    if not device or "?" in device:
+        return identity
+    return f"{identity}|{device}"
+
+
+def _query(connection: Connection, command: Command) -> Optional[Response]:
+    """Query a discovery command without early return, so every ECU answers, None when the vehicle does not answer it."""
+    previous = connection.early_return
+    connection.early_return = False
+    try:
+        response = connection.query(command)
+    except ResponseBaseError as e:
+        _log.debug(f"Discovery of {command.name} failed: {e}")
+        return None
+    finally:
+        connection.early_return = previous
+    return response if response.messages else None
+
+
+def _vin(response: Optional[Response]) -> Optional[str]:
+    if response is None:
+        return None
+
+    data = next(iter(response.messages.values()))  # type: ignore[union-attr]
+    # Skip the number of data items and padding
+    vin = "".join(chr(byte) for byte in data if 0x20 < byte < 0x7F)
+    return vin[-17:] or None
+
+
+def match(
+    connection: Connection, store: ProfileStore, adapter: str
+) -> Optional[VehicleProfile]:
+    """
+    Identify the vehicle with the :data:`FINGERPRINT_COMMAND` and its VIN, the protocol must already be set.
+
+    Vehicles of the same model share the fingerprint, so when a matching profile has a VIN
+    the VIN is read and only the profile of the same VIN is accepted.
+
+    Returns
+    -------
+    Optional[:class:`VehicleProfile`]
+        The profile of the vehicle, None if it is unknown.
+    """
+    response = _query(connection, FINGERPRINT_COMMAND)
+    if response is None:
+        return None
+
+    found = fingerprint(response)
+    candidates = [
+        profile
+        for profile in store.profiles(adapter)
+        if profile.protocol == connection.protocol and profile.fingerprint == found
+    ]
+    vin_response: Optional[Response] = None
+    if any(profile.vin for profile in candidates):
+        vin_response = _query(connection, Mode09.VIN)
+        vin = _vin(vin_response)
+        candidates = [profile for profile in candidates if profile.vin == vin]
+    if not candidates:
+        return None
+
+    matched = candidates[0]
+    matched.learn(FINGERPRINT_COMMAND, response)
+    if vin_response is not None:
+        matched.learn(Mode09.VIN, vin_response)
+    return matched
+
+
+def discover(connection: Connection, adapter: str) -> VehicleProfile:
+    """
+    Discover the ECUs, supported PIDs and VIN of the vehicle, the protocol must already be set.
+
+    Parameters
+    ----------
+    connection: :class:`~obdii.Connection`
+        A connected connection.
+    adapter: :class:`str`
+        Identification of the adapter, see :func:`identify_adapter`.
+
+    Returns
+    -------
+    :class:`VehicleProfile`
+        The profile of the vehicle, not saved.
+    """
+    profile = VehicleProfile("", connection.protocol, adapter)
+
+    for mode, commands in DISCOVERY_COMMANDS.items():
+        supported: List[int] = []
+        for command in commands:
+            response = _query(connection, command)
+            if response is None:
+                break
+            profile.learn(command, response)
+            if command is FINGERPRINT_COMMAND:
+                profile.fingerprint = fingerprint(response)
+                if connection.protocol in CAN_PROTOCOLS:
+                    profile.ecus = [
+                        EcuAddress.from_response(ecu)
+                        for ecu in sorted(response.messages)  # type: ignore[arg-type]
+                        if ecu != HEADERLESS_ECU
+                    ]
+            supported.extend(response.value or [])  # type: ignore[arg-type]
+            if int(command.pid) + 0x20 not in supported:  # type: ignore[arg-type]
+                break
+        if supported:
+            profile.supported_pids[mode] = sorted(set(supported))
+
+    if Mode09.VIN.pid in profile.supported_pids.get(0x09, []):
+        response = _query(connection, Mode09.VIN)
+        if response is not None:
+            profile.learn(Mode09.VIN, response)
+        profile.vin = _vin(response)
+
+    return profile
@@ -1,17 +1,33 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Type, List
+from typing import Any, Dict, Final, Optional, Type, List
 
+from ..command import Command
+from ..mode import Mode
 from ..protocol import Protocol
 from ..response import ResponseBase, Response
 
 
+HEADERLESS_ECU: Final = b""
+"""Key of the messages parsed with headers off (``AT H0``), the responding ECU is unknown."""
+
+
 class ProtocolBase(ABC):
     _registry: Dict[Protocol, Type[ProtocolBase]] = {}
     _protocol_attributes: Dict[Protocol, Dict] = {}
 
-    def __init__(self) -> None: ...
+    def __init__(self, headers: bool = True) -> None:
+        """
+        Initialize the protocol handler.
+
+        Parameters
+        ----------
+        headers: :class:`bool`
+            Whether the adapter prints the headers of the responses (``AT H1``).
+            Without headers, every line is attributed to :data:`HEADERLESS_ECU`, so only single-ECU responses can be parsed.
+        """
+        self.headers = headers
 
     def __init_subclass__(
         cls, protocols: Optional[Dict[Protocol, Dict[str, Any]]] = None, **kwargs
@@ -28,10 +44,10 @@ class ProtocolBase(ABC):
             cls._protocol_attributes[protocol] = attr
 
     @classmethod
-    def get_handler(cls, protocol: Protocol) -> ProtocolBase:
+    def get_handler(cls, protocol: Protocol, headers: bool = True) -> ProtocolBase:
         """Retrieve the appropriate protocol class or fallback to ProtocolUnknown."""
         handler_cls = cls._registry.get(protocol, ProtocolUnknown)
-        return handler_cls()
+        return handler_cls(headers)
 
     @classmethod
     def get_protocol_attributes(cls, protocol: Protocol) -> Dict[str, Any]:
@@ -43,6 +59,22 @@ class ProtocolBase(ABC):
             line for line in raw.splitlines() if line.strip() and line.strip() != b'>'
         ]
 
+    @staticmethod
+    def to_values(line: bytes) -> Optional[List[int]]:
+        """Convert a line of hexadecimal characters without spaces to byte values, None if it is not valid."""
+        if len(line) % 2 != 0:
+            return None
+        try:
+            return [int(line[i : i + 2], 16) for i in range(0, len(line), 2)]
+        except ValueError:
+            return None
+
+    @staticmethod
+    def response_mode(command: Command) -> Optional[int]:
+        """Return the first byte of a positive response to the command, None if it is unknown."""
+        mode = command.mode.value if isinstance(command.mode, Mode) else command.mode
+        return mode + 0x40 if isinstance(mode, int) else None
+
     @abstractmethod
     def parse_response(self, response_base: ResponseBase) -> Response: ...
 
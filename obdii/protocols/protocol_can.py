@@ -9,7 +9,7 @@ from ..protocol import Protocol
 from ..response import ResponseBase, Response
 from ..utils.bits import filter_bytes
 
-from .protocol_base import ProtocolBase
+from .protocol_base import HEADERLESS_ECU, ProtocolBase
 
 
 _log = getLogger(__name__)
@@ -77,7 +77,7 @@ class ProtocolCAN(ProtocolBase, protocols=CAN_PROTOCOLS):
     - [0x0C] USER2 CAN (11 bit ID, 50 Kbaud)
 
     Required configuration:
-    - HEADER_ON
+    - HEADER_ON, or HEADER_OFF with CAN_AUTO_FORMAT_ON for single-ECU vehicles
     """
 
     @staticmethod
@@ -179,6 +179,81 @@ class ProtocolCAN(ProtocolBase, protocols=CAN_PROTOCOLS):
 
         return frames
 
+    @staticmethod
+    def to_headerless_frames(lines: List[bytes], command: Command) -> List[CANFrame]:
+        """
+        Parse a list of raw ELM327 lines printed with headers off into CANFrame objects.
+
+        With automatic formatting the adapter hides the PCI bytes, a single frame is printed as its payload,
+        a multi-frame message as its length followed by numbered segments.
+
+        .. code-block:: none
+
+            41 0C 40 80
+
+            014
+            0: 49 02 01 57 56 57
+            1: 5A 5A 5A 31 4A 4D 33
+            2: 36 33 39 37 36 00 00
+
+        Lines which do not start with the positive response mode of the command (e.g. an echo) are ignored.
+        """
+        frames: List[CANFrame] = []
+        response_mode = ProtocolBase.response_mode(command)
+
+        for raw_line in lines:
+            line = filter_bytes(raw_line, b' ')
+
+            if len(line) == 3:
+                try:
+                    dlc = int(line, 16)
+                except ValueError:
+                    continue
+                frames.append(
+                    CANFrame(
+                        ecu=HEADERLESS_ECU, kind=FrameKind.FIRST, dlc=dlc, payload=[]
+                    )
+                )
+                continue
+
+            index, separator, data = line.partition(b':')
+            byte_vals = ProtocolBase.to_values(data if separator else line)
+            if not byte_vals:
+                _log.warning(f"Invalid headerless line: {line!r}")
+                continue
+
+            if separator:
+                if not frames or frames[-1].kind == FrameKind.SINGLE:
+                    _log.warning(f"Segment without length in line: {line!r}")
+                    continue
+                first = frames[-1] if frames[-1].kind == FrameKind.FIRST else None
+                if first is not None and not first.payload:
+                    first.payload = byte_vals
+                else:
+                    # Segment numbers wrap after F, keep the printed order instead
+                    frames.append(
+                        CANFrame(
+                            ecu=HEADERLESS_ECU,
+                            kind=FrameKind.CONSECUTIVE,
+                            sn=frames[-1].sn + 1,
+                            payload=byte_vals,
+                        )
+                    )
+                continue
+
+            if response_mode is not None and byte_vals[0] != response_mode:
+                continue
+            frames.append(
+                CANFrame(
+                    ecu=HEADERLESS_ECU,
+                    kind=FrameKind.SINGLE,
+                    dlc=len(byte_vals),
+                    payload=byte_vals,
+                )
+            )
+
+        return frames
+
     @staticmethod
     def to_message(frames: List[CANFrame], command: Command) -> Optional[List[int]]:
         strip = 2 if command.pid != '' else 1
@@ -210,6 +285,9 @@ class ProtocolCAN(ProtocolBase, protocols=CAN_PROTOCOLS):
         for cf in consecutives:
             message.extend(cf.payload)
 
+        if not first.ecu:
+            message = message[:dlc]
+
         if len(message) != dlc:
             _log.warning(f"Incomplete message: expected {dlc}, got {len(message)}")
             return None
@@ -237,10 +315,11 @@ class ProtocolCAN(ProtocolBase, protocols=CAN_PROTOCOLS):
             _log.warning("Empty response.")
             return Response(**vars(response_base), value=None)
 
-        attr = self.get_protocol_attributes(context.protocol)
-        header_len = attr["header_length"]
-
-        frames = self.to_frames(lines, header_len)
+        if self.headers:
+            attr = self.get_protocol_attributes(context.protocol)
+            frames = self.to_frames(lines, attr["header_length"])
+        else:
+            frames = self.to_headerless_frames(lines, context.command)
         if not frames:
             _log.warning("No valid frames parsed.")
             return Response(**vars(response_base), value=None)
@@ -8,7 +8,7 @@ from ..protocol import Protocol
 from ..response import ResponseBase, Response
 from ..utils.bits import filter_bytes
 
-from .protocol_base import ProtocolBase
+from .protocol_base import HEADERLESS_ECU, ProtocolBase
 
 
 _log = getLogger(__name__)
@@ -132,6 +132,29 @@ class ProtocolJ1850(ProtocolBase, protocols=J1850_PROTOCOLS):
 
         return frames
 
+    @staticmethod
+    def to_headerless_frames(lines: List[bytes], command: Command) -> List[J1850Frame]:
+        """
+        Parse a list of raw ELM327 lines printed with headers off into J1850Frame objects.
+
+        Each line is a payload without header nor checksum, lines which do not start
+        with the positive response mode of the command (e.g. an echo) are ignored.
+        """
+        frames: List[J1850Frame] = []
+        response_mode = ProtocolBase.response_mode(command)
+
+        for raw_line in lines:
+            line = filter_bytes(raw_line, b' ')
+            byte_vals = ProtocolBase.to_values(line)
+            if not byte_vals:
+                _log.warning(f"Invalid headerless line: {line!r}")
+                continue
+            if response_mode is not None and byte_vals[0] != response_mode:
+                continue
+            frames.append(J1850Frame(HEADERLESS_ECU, byte_vals))
+
+        return frames
+
     @staticmethod
     def to_message(frames: List[J1850Frame], command: Command) -> Optional[List[int]]:
         strip = 2 if command.pid != '' else 1
@@ -181,7 +204,10 @@ class ProtocolJ1850(ProtocolBase, protocols=J1850_PROTOCOLS):
             _log.warning("Empty response.")
             return Response(**vars(response_base), value=None)
 
-        frames = self.to_frames(lines)
+        if self.headers:
+            frames = self.to_frames(lines)
+        else:
+            frames = self.to_headerless_frames(lines, context.command)
         if not frames:
             _log.warning("No valid frames parsed.")
             return Response(**vars(response_base), value=None)
@@ -8,7 +8,7 @@ from ..protocol import Protocol
 from ..response import ResponseBase, Response
 from ..utils.bits import filter_bytes
 
-from .protocol_base import ProtocolBase
+from .protocol_base import HEADERLESS_ECU, ProtocolBase
 
 
 _log = getLogger(__name__)
@@ -48,7 +48,7 @@ class ProtocolKWP(ProtocolBase, protocols=KWP_PROTOCOLS):
     - [0x05] ISO 14230-4 KWP (fast init, 10.4 Kbaud)
 
     Required configuration:
-    - HEADER_ON
+    - HEADER_ON, or HEADER_OFF for single-ECU vehicles
     """
 
     @staticmethod
@@ -142,6 +142,29 @@ class ProtocolKWP(ProtocolBase, protocols=KWP_PROTOCOLS):
 
         return frames
 
+    @staticmethod
+    def to_headerless_frames(lines: List[bytes], command: Command) -> List[KWPFrame]:
+        """
+        Parse a list of raw ELM327 lines printed with headers off into KWPFrame objects.
+
+        Each line is a payload without header nor checksum, lines which do not start
+        with the positive response mode of the command (e.g. an echo) are ignored.
+        """
+        frames: List[KWPFrame] = []
+        response_mode = ProtocolBase.response_mode(command)
+
+        for raw_line in lines:
+            line = filter_bytes(raw_line, b' ')
+            byte_vals = ProtocolBase.to_values(line)
+            if not byte_vals:
+                _log.warning(f"Invalid headerless line: {line!r}")
+                continue
+            if response_mode is not None and byte_vals[0] != response_mode:
+                continue
+            frames.append(KWPFrame(HEADERLESS_ECU, byte_vals))
+
+        return frames
+
     @staticmethod
     def to_message(frames: List[KWPFrame], command: Command) -> Optional[List[int]]:
         strip = 2 if command.pid != '' else 1
@@ -191,7 +214,10 @@ class ProtocolKWP(ProtocolBase, protocols=KWP_PROTOCOLS):
             _log.warning("Empty response.")
             return Response(**vars(response_base), value=None)
 
-        frames = self.to_frames(lines, context.protocol)
+        if self.headers:
+            frames = self.to_frames(lines, context.protocol)
+        else:
+            frames = self.to_headerless_frames(lines, context.command)
         if not frames:
             _log.warning("No valid frames parsed.")
             return Response(**vars(response_base), value=None)
@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import socket as _socket
+
+from argparse import ArgumentParser
+from concurrent.futures import Future
+from itertools import count
+from logging import getLogger
+from queue import PriorityQueue
+from re import compile
+from socketserver import BaseRequestHandler, BaseServer, TCPServer, ThreadingMixIn
+from threading import Lock, Thread
+from time import monotonic
+from types import TracebackType
+from typing import Any, Dict, Final, FrozenSet, Optional, Pattern, Tuple, Type, Union
+
+from .connection import UNSHARED_MODES, Connection
+from .transports.transport_mux import REQUEST_HEADER, RESPONSE_HEADER, recv_exact
+
+
+_log = getLogger(__name__)
+
+
+FORWARDED_AT: Final[FrozenSet[bytes]] = frozenset(
+    {
+        b"I",
+        b"@1",
+        b"@2",
+        b"DP",
+        b"DPN",
+        b"RV",
+        b"IGN",
+        b"CS",
+        b"KW",
+        b"PPS",
+        b"RD",
+        b"IA",
+    }
+)
+"""Read-only AT commands forwarded to the adapter, every other AT command is acknowledged locally or rejected."""
+
+REJECTED_AT: Final[Pattern[bytes]] = compile(
+    rb"SH.*|CRA.*|AR|CF.*|CM.*|CEA.*|FC.*|CAF.*|SP.*|TP.*|SR.*|RA.*|TA.*"
+)
+"""AT commands changing the addressing, filters, flow control or protocol of the shared adapter.
+
+Applying them for one client would change the responses of every client, ignoring them would make the client
+parse broadcast responses as if they were addressed to one ECU, so they are answered with ``?``.
+"""
+
+FORMAT_AT: Final[Pattern[bytes]] = compile(rb"([HSL])([01])")
+"""Header, space and linefeed settings, they shape the responses every client parses.
+
+They are acknowledged when they match the settings of the server's connection and answered with ``?`` otherwise.
+"""
+
+LOCAL_REPLY: Final = b"OK\r\r>"
+"""Reply to the AT commands acknowledged without reaching the adapter."""
+REJECTED_REPLY: Final = b"?\r\r>"
+"""Reply to the :data:`REJECTED_AT` commands, as the adapter answers unsupported commands."""
+
+
+UNSHARED_QUERIES: Final[Tuple[bytes, ...]] = tuple(
+    f"{mode.value:02X}".encode()
+    for mode in UNSHARED_MODES
+    if isinstance(mode.value, int)
+)
+"""Normalized prefixes of the queries changing the vehicle (clearing DTCs), always sent for every client."""
+
+
+def normalize_query(query: bytes) -> bytes:
+    """Normalize a query (case, spaces and terminator) so identical requests share a key."""
+    return query.upper().replace(b' ', b'').strip()
+
+
+class _ClientHandler(BaseRequestHandler):
+    server: Any
+
+    def handle(self) -> None:
+        mux: AdapterServer = self.server.mux
+        last_query = b''
+
+        while True:
+            try:
+                header = recv_exact(self.request, REQUEST_HEADER.size)
+                priority, length = REQUEST_HEADER.unpack(header)
+                query = recv_exact(self.request, length)
+            except (RuntimeError, OSError):
+                break
+
+            # Each client has its own notion of the last command sent (REPEAT)
+            if query.strip():
+                last_query = query
+            else:
+                query = last_query
+
+            try:
+                raw = mux.request(query, priority)
+            except Exception as e:
+                _log.error(f"Dropping client {self.client_address!r}: {e}")
+                break
+
+            self.request.sendall(RESPONSE_HEADER.pack(len(raw)) + raw)
+
+
+class _ThreadingTCPServer(ThreadingMixIn, TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(_socket, "AF_UNIX"):
+    from socketserver import UnixStreamServer
+
+    class _ThreadingUnixServer(ThreadingMixIn, UnixStreamServer):
+        daemon_threads = True
+
+
+class AdapterServer:
+    def __init__(
+        self,
+        connection: Connection,
+        address: Union[str, Tuple[str, int]],
+        staleness: float = 0.0,
+    ) -> None:
+        """
+        Share a single adapter :class:`~obdii.Connection` with many local clients.
+
+        Clients connect using :class:`~obdii.transports.transport_mux.TransportMux`.
+        Queries are sent to the adapter one at a time, highest priority first,
+        identical queries are coalesced while in flight and answered from the last response while fresh,
+        except the :data:`UNSHARED_QUERIES` which are always sent.
+
+        Configuration AT commands sent by clients (e.g. during their init sequence) are acknowledged without reaching the adapter,
+        all clients share the adapter configuration of the server's connection.
+        Header, filter, flow control and protocol settings (see :data:`REJECTED_AT`) are answered with ``?`` instead,
+        as are the :data:`FORMAT_AT` settings that differ from the server's connection.
+
+        Parameters
+        ----------
+        connection: :class:`~obdii.Connection`
+            An initialized connection, the server must be its only user.
+        address: Union[:class:`str`, Tuple[:class:`str`, :class:`int`]]
+            Path of a Unix socket, or a (host, port) tuple for TCP.
+        staleness: :class:`float`
+            Maximum age in seconds of a previous response that may be served to an identical query, 0 disables it.
+        """
+        self.connection = connection
+        self.staleness = staleness
+
+        # Linefeeds are left to the adapter default (on) unless the connection is compact
+        self._format: Dict[bytes, bytes] = {
+            b"H": b"1" if connection.headers else b"0",
+            b"S": b"0" if connection.compact else b"1",
+            b"L": b"0" if connection.compact else b"1",
+        }
+
+        self.hits = 0
+        self.requests = 0
+
+        self._lock = Lock()
+        self._queue: PriorityQueue[
+            Tuple[int, int, Optional[bytes], Optional[bytes], Optional[Future]]
+        ] = PriorityQueue()
+        self._sequence = count()
+        self._in_flight: Dict[bytes, Future] = {}
+        self._recent: Dict[bytes, Tuple[float, bytes]] = {}
+
+        self._server = self._create_server(address)
+        self._server.mux = self  # type: ignore[attr-defined]
+
+        self._dispatcher: Optional[Thread] = None
+        self._serve_thread: Optional[Thread] = None
+
+    def __repr__(self) -> str:
+        return f"<AdapterServer {self.server_address!r} {self.connection.transport!r}>"
+
+    @staticmethod
+    def _create_server(address: Union[str, Tuple[str, int]]) -> BaseServer:
+        if isinstance(address, tuple):
+            return _ThreadingTCPServer(address, _ClientHandler)
+        if not hasattr(_socket, "AF_UNIX"):
+            raise ValueError("Unix sockets are not supported on this platform.")
+        return _ThreadingUnixServer(address, _ClientHandler)
+
+    @property
+    def server_address(self) -> Any:
+        """The bound address, useful when binding to port 0."""
+        return self._server.server_address
+
+    def request(self, query: bytes, priority: int = 0) -> bytes:
+        """
+        Send a raw query through the shared adapter and return its raw response.
+
+        Parameters
+        ----------
+        query: :class:`bytes`
+            Query as built by :meth:`~obdii.Command.build`.
+        priority: :class:`int`
+            Priority of the query (0-255), higher values are served first.
+
+        Returns
+        -------
+        :class:`bytes`
+            Raw response from the adapter, terminated by the prompt.
+        """
+        key = normalize_query(query)
+
+        if key.startswith(b"AT") and key[2:] not in FORWARDED_AT:
+            if REJECTED_AT.fullmatch(key[2:]):
+                return REJECTED_REPLY
+            setting = FORMAT_AT.fullmatch(key[2:])
+            if setting and self._format[setting.group(1)] != setting.group(2):
+                return REJECTED_REPLY
+            return LOCAL_REPLY
+
+        if key.startswith(UNSHARED_QUERIES):
+            future: Future = Future()
+            with self._lock:
+                self.requests += 1
+                self._start_dispatcher()
+                self._queue.put((-priority, next(self._sequence), query, None, future))
+            return future.result()
+
+        with self._lock:
+            self.requests += 1
+
+            recent = self._recent.get(key)
+            if recent and monotonic() - recent[0] <= self.staleness:
+                self.hits += 1
+                return recent[1]
+
+            future = self._in_flight.get(key)
+            if future is None:
+                future = Future()
+                self._in_flight[key] = future
+                self._start_dispatcher()
+                self._queue.put((-priority, next(self._sequence), query, key, future))
+            else:
+                self.hits += 1
+
+        return future.result()
+
+    def _start_dispatcher(self) -> None:
+        """Start the thread sending the queued queries unless it runs, called with the lock held."""
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = Thread(
+                target=self._dispatch, name="obdii-server-dispatch", daemon=True
+            )
+            self._dispatcher.start()
+
+    def _dispatch(self) -> None:
+        transport = self.connection.transport
+
+        while True:
+            _, _, query, key, future = self._queue.get()
+            if query is None or future is None:
+                break
+
+            try:
+                transport.write_bytes(query)
+                raw = transport.read_bytes()
+            except Exception as e:
+                if key is not None:
+                    with self._lock:
+                        del self._in_flight[key]
+                future.set_exception(e)
+                continue
+
+            if key is not None:
+                with self._lock:
+                    del self._in_flight[key]
+                    if self.staleness > 0:
+                        now = monotonic()
+                        self._recent = {
+                            other: recent
+                            for other, recent in self._recent.items()
+                            if now - recent[0] <= self.staleness
+                        }
+                        self._recent[key] = (now, raw)
+            future.set_result(raw)
+
+    def start(self) -> None:
+        """Start serving clients in a background thread."""
+        self._serve_thread = Thread(
+            target=self.serve_forever, name="obdii-server", daemon=True
+        )
+        self._serve_thread.start()
+
+    def serve_forever(self) -> None:
+        """Serve clients until :meth:`shutdown` is called."""
+        with self._lock:
+            self._start_dispatcher()
+        _log.info(f"Serving {self.connection.transport!r} on {self.server_address!r}.")
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        """Stop serving clients, pending queries are answered first."""
+        if self._serve_thread is not None:
+            self._server.shutdown()
+            self._serve_thread.join()
+            self._serve_thread = None
+        self._server.server_close()
+
+        with self._lock:
+            dispatcher, self._dispatcher = self._dispatcher, None
+        if dispatcher is not None and dispatcher.is_alive():
+            self._queue.put((0x100, next(self._sequence), None, None, None))
+            dispatcher.join()
+
+    def __enter__(self) -> AdapterServer:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.shutdown()
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        prog="python -m obdii.server",
+        description="Share one OBDII adapter with many local clients.",
+    )
+    parser.add_argument(
+        "port", help="Serial port of the adapter, e.g. COM5 or /dev/ttyUSB0."
+    )
+    parser.add_argument("--unix", help="Path of the Unix socket to listen on.")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host to listen on.")
+    parser.add_argument("--tcp", type=int, default=35001, help="TCP port to listen on.")
+    parser.add_argument(
+        "--staleness",
+        type=float,
+        default=0.0,
+        help="Seconds a response may be reused for identical queries.",
+    )
+    args = parser.parse_args()
+
+    address: Union[str, Tuple[str, int]] = args.unix or (args.host, args.tcp)
+
+    with Connection(args.port) as conn:
+        server = AdapterServer(conn, address, staleness=args.staleness)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+from .sink_file import SinkFile
+from .sink_sqlite import SinkSQLite
+
+__all__ = [
+    "SinkFile",
+    "SinkSQLite",
+]
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from logging import getLogger
+from queue import Empty, Full, Queue
+from threading import Lock, Thread, current_thread
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from ..basetypes import MISSING
+from ..mode import Mode
+from ..response import Response
+
+if TYPE_CHECKING:
+    from ..connection import Connection
+
+
+_log = getLogger(__name__)
+
+
+class SinkBase(ABC):
+    """
+    Base class of the response sinks.
+
+    Responses are handed over through a bounded queue and written in batches by a background thread,
+    so the query loop never waits on storage. When the queue is full new responses are dropped
+    and counted in :attr:`dropped` instead of blocking the caller.
+    Once the sink is closed, new responses are dropped as well until it is started again.
+
+    Subclasses implement :meth:`open`, :meth:`write_batch`, :meth:`flush` and :meth:`release`,
+    all of them are only called from the writer thread.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 10_000,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        **kwargs,
+    ) -> None:
+        """
+        Initialize the sink.
+
+        Parameters
+        ----------
+        max_queue: :class:`int`
+            Maximum number of responses waiting to be written.
+        batch_size: :class:`int`
+            Maximum number of responses written at once.
+        flush_interval: :class:`float`
+            Maximum time in seconds between two flushes to storage.
+        """
+        self.config: Dict[str, Any] = {
+            "max_queue": max_queue,
+            "batch_size": batch_size,
+            "flush_interval": flush_interval,
+            **kwargs,
+        }
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.dropped = 0
+        """Number of responses dropped because the queue was full, or because writing them failed."""
+        self.written = 0
+        """Number of responses written."""
+
+        self._queue: Queue[Optional[Response]] = Queue(max_queue)
+        self._writer: Optional[Thread] = None
+        self._closed = False
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} queued={self.queued} dropped={self.dropped} written={self.written}>"
+
+    @property
+    def queued(self) -> int:
+        """Number of responses waiting to be written."""
+        return self._queue.qsize()
+
+    @property
+    def running(self) -> bool:
+        """Whether the writer thread is started."""
+        return self._writer is not None
+
+    @abstractmethod
+    def open(self) -> None:
+        """Open the storage, called when the writer thread starts."""
+
+    @abstractmethod
+    def write_batch(self, batch: List[Response]) -> None:
+        """Write a batch of responses."""
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Flush the written responses to storage."""
+
+    @abstractmethod
+    def release(self) -> None:
+        """Close the storage, called when the writer thread stops."""
+
+    def start(self) -> None:
+        """Start the writer thread, called by :meth:`put` when needed."""
+        with self._lock:
+            self._closed = False
+            if self._writer is not None:
+                return
+            self._writer = Thread(
+                target=self._run,
+                name=f"obdii-{self.__class__.__name__.lower()}",
+                daemon=True,
+            )
+            self._writer.start()
+
+    def put(self, response: Response) -> bool:
+        """
+        Queue a response, without blocking, AT command responses are ignored.
+
+        Returns
+        -------
+        :class:`bool`
+            False when the response was dropped because the queue is full or the sink is closed.
+        """
+        if Mode.get_from(response.context.command.mode) in (Mode.AT, Mode.NONE):
+            return True
+        if self._closed:
+            self._drop(1)
+            return False
+        if self._writer is None:
+            self.start()
+
+        try:
+            self._queue.put_nowait(response)
+        except Full:
+            self._drop(1)
+            return False
+        return True
+
+    def attach(self, connection: Connection) -> None:
+        """Queue every response parsed by a connection."""
+        connection.add_hook("on_parsed", self.put)
+
+    def detach(self, connection: Connection) -> None:
+        """Stop queueing the responses of a connection."""
+        connection.remove_hook("on_parsed", self.put)
+
+    def close(self) -> None:
+        """Write the queued responses, then stop the writer thread, :meth:`start` opens the sink again."""
+        with self._lock:
+            self._closed = True
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+
+    def __enter__(self) -> SinkBase:
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        """Writer loop, drains the queue in batches until the close sentinel."""
+        try:
+            self.open()
+            last_flush = monotonic()
+            running = True
+            while running:
+                timeout = max(0.0, last_flush + self.flush_interval - monotonic())
+                batch: List[Response] = []
+                try:
+                    response = self._queue.get(timeout=timeout)
+                except Empty:
+                    response = MISSING
+
+                while response is not MISSING:
+                    if response is None:
+                        running = False
+                        break
+                    batch.append(response)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        response = self._queue.get_nowait()
+                    except Empty:
+                        break
+
+                if batch:
+                    self._write(batch)
+
+                if not running or monotonic() - last_flush >= self.flush_interval:
+                    self._flush()
+                    last_flush = monotonic()
+        except Exception:
+            _log.exception(
+                f"{self!r} writer stopped, the next response starts it again."
+            )
+        finally:
+            try:
+                self.release()
+            finally:
+                # Unless the sink was closed meanwhile, let put() start a new writer
+                with self._lock:
+                    if self._writer is current_thread():
+                        self._writer = None
+
+    def _write(self, batch: List[Response]) -> None:
+        try:
+            self.write_batch(batch)
+        except Exception:
+            self._drop(len(batch))
+            _log.exception(
+                f"{self!r} failed to write a batch of {len(batch)} responses."
+            )
+        else:
+            self.written += len(batch)
+
+    def _drop(self, count: int) -> None:
+        with self._lock:
+            self.dropped += count
+
+    def _flush(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            _log.exception(f"{self!r} failed to flush.")
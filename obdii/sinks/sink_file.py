@@ -0,0 +1,184 @@
+from csv import writer as csv_writer
+from datetime import datetime
+from enum import Enum
+from json import dumps
+from logging import getLogger
+from os import PathLike, fspath, fsync as os_fsync, path as os_path, rename
+from time import monotonic
+from typing import Any, Dict, Final, List, Optional, TextIO, Union
+
+from ..response import Response
+from .sink_base import SinkBase
+
+
+_log = getLogger(__name__)
+
+
+FORMATS: Final = ("csv", "ndjson")
+"""Supported output formats."""
+FIELDS: Final = ("timestamp", "command", "value", "units")
+"""Fields written for every response, in order."""
+
+
+def serialize_value(value: Any) -> Any:
+    """Convert a response value to JSON compatible types, unknown objects are written as strings."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, (list, tuple)):
+        return [serialize_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): serialize_value(item) for key, item in value.items()}
+    return str(value)
+
+
+def response_row(response: Response) -> Dict[str, Any]:
+    """Return the :data:`FIELDS` of a response."""
+    return {
+        "timestamp": response.timestamp,
+        "command": response.context.command.name,
+        "value": serialize_value(response.value),
+        "units": serialize_value(response.units) if response.units else None,
+    }
+
+
+class SinkFile(SinkBase):
+    """
+    Write responses to a CSV or NDJSON file from a background thread, one row per response.
+
+    The file is rotated when it reaches `max_bytes` or is older than `max_age` seconds:
+    it is renamed with the time of the rotation and a new file is started at `path`.
+
+    Example
+    -------
+    .. code-block:: python
+
+        with SinkFile("obd_data.csv", max_bytes=50_000_000) as sink:
+            sink.attach(conn)
+
+            while True:
+                conn.query(commands.ENGINE_SPEED)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, PathLike],
+        format: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        fsync: bool = False,
+        **kwargs,
+    ) -> None:
+        """
+        Initialize the sink.
+
+        Parameters
+        ----------
+        path: Union[:class:`str`, :class:`os.PathLike`]
+            Output file, appended to when it already exists.
+        format: Optional[:class:`str`]
+            One of :data:`FORMATS`, guessed from the file extension by default.
+        max_bytes: Optional[:class:`int`]
+            Rotate the file once it reaches this size.
+        max_age: Optional[:class:`float`]
+            Rotate the file once it was written to for this many seconds.
+        fsync: :class:`bool`
+            Also ask the OS to commit the file to disk on every flush.
+        **kwargs:
+            Queue and batching options, see :class:`~obdii.sinks.sink_base.SinkBase`.
+        """
+        path = fspath(path)
+        if format is None:
+            format = "ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv"
+        if format not in FORMATS:
+            raise ValueError(
+                f"Unknown format {format!r}, expected one of {list(FORMATS)}."
+            )
+
+        super().__init__(**kwargs)
+        self.config.update(
+            {
+                "path": path,
+                "format": format,
+                "max_bytes": max_bytes,
+                "max_age": max_age,
+                "fsync": fsync,
+            }
+        )
+
+        self.path = path
+        self.format = format
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.fsync = fsync
+
+        self.rotated: List[str] = []
+        """Paths of the rotated files, oldest first."""
+
+        self._file: Optional[TextIO] = None
+        self._opened_at = 0.0
+
+    def open(self) -> None:
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        self._opened_at = monotonic()
+        if self.format == "csv" and self._file.tell() == 0:
+            csv_writer(self._file).writerow(FIELDS)
+
+    def write_batch(self, batch: List[Response]) -> None:
+        if self._should_rotate():
+            self._rotate()
+
+        assert self._file is not None
+        rows = [response_row(response) for response in batch]
+        if self.format == "csv":
+            csv_writer(self._file).writerows(
+                [
+                    row[name]
+                    if not isinstance(row[name], (list, dict))
+                    else dumps(row[name])
+                    for name in FIELDS
+                ]
+                for row in rows
+            )
+        else:
+            self._file.write("".join(dumps(row) + "\n" for row in rows))
+
+    def flush(self) -> None:
+        if self._file is None:
+            return
+        self._file.flush()
+        if self.fsync:
+            os_fsync(self._file.fileno())
+
+    def release(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _should_rotate(self) -> bool:
+        assert self._file is not None
+        if self.max_bytes is not None and self._file.tell() >= self.max_bytes:
+            return True
+        return (
+            self.max_age is not None and monotonic() - self._opened_at >= self.max_age
+        )
+
+    def _rotate(self) -> None:
+        """Rename the current file with the rotation time and start a new one."""
+        self.flush()
+        self.release()
+
+        stem, extension = os_path.splitext(self.path)
+        moment = datetime.now().strftime("%Y%m%dT%H%M%S")
+        destination = f"{stem}.{moment}{extension}"
+        counter = 1
+        while os_path.exists(destination):
+            destination = f"{stem}.{moment}-{counter}{extension}"
+            counter += 1
+
+        rename(self.path, destination)
+        self.rotated.append(destination)
+        _log.debug(f"Rotated {self.path} to {destination}.")
+
+        self.open()
@@ -0,0 +1,249 @@
+import sqlite3
+
+from json import dumps
+from logging import getLogger
+from numbers import Real
+from os import PathLike, fspath
+from time import time
+from typing import Any, Dict, Final, List, Optional, Tuple, Union
+
+from ..response import Response
+from ..utils.bits import bytes_to_string
+from .sink_base import SinkBase
+from .sink_file import serialize_value
+
+
+_log = getLogger(__name__)
+
+
+SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS commands (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    units TEXT
+);
+CREATE TABLE IF NOT EXISTS ecus (
+    id INTEGER PRIMARY KEY,
+    header TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    command_id INTEGER NOT NULL REFERENCES commands (id),
+    ecu_id INTEGER REFERENCES ecus (id),
+    timestamp REAL NOT NULL,
+    value REAL,
+    value_text TEXT,
+    raw BLOB
+);
+CREATE INDEX IF NOT EXISTS samples_command_timestamp ON samples (command_id, timestamp);
+"""
+"""Database schema, samples reference their session, command and responding ECU."""
+
+INSERT_SAMPLE: Final = (
+    "INSERT INTO samples (session_id, command_id, ecu_id, timestamp, value, value_text, raw)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+_Row = Tuple[
+    int, int, Optional[int], float, Optional[float], Optional[str], Optional[bytes]
+]
+
+
+def split_value(value: Any) -> Tuple[Optional[float], Optional[str]]:
+    """Return the (value, value_text) columns of a value, numbers go to `value`, anything else is JSON in `value_text`."""
+    if value is None:
+        return None, None
+    if isinstance(value, Real) and not isinstance(value, bool):
+        return float(value), None
+    return None, dumps(serialize_value(value))
+
+
+class SinkSQLite(SinkBase):
+    """
+    Write responses to an SQLite database in WAL mode from a background thread.
+
+    Every response becomes one ``samples`` row per responding ECU, in the normalized schema of :data:`SCHEMA`,
+    each row keeps the raw response of the adapter. Commands are stored by :attr:`~obdii.Command.label`.
+    Rows are inserted with a single prepared statement and committed together, when `transaction_rows`
+    rows are pending or every `flush_interval` seconds, so the database is not synced on every response.
+
+    Example
+    -------
+    .. code-block:: python
+
+        with SinkSQLite("obd_data.db", label="test drive") as sink:
+            sink.attach(conn)
+
+            while True:
+                conn.query(commands.ENGINE_SPEED)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, PathLike],
+        label: Optional[str] = None,
+        transaction_rows: int = 5000,
+        **kwargs,
+    ) -> None:
+        """
+        Initialize the sink.
+
+        Parameters
+        ----------
+        path: Union[:class:`str`, :class:`os.PathLike`]
+            Database file, created with :data:`SCHEMA` if needed.
+        label: Optional[:class:`str`]
+            Description of the session stored with the samples.
+        transaction_rows: :class:`int`
+            Commit once this many rows are pending, without waiting for the flush interval.
+        **kwargs:
+            Queue and batching options, see :class:`~obdii.sinks.sink_base.SinkBase`.
+        """
+        super().__init__(**kwargs)
+        self.config.update(
+            {
+                "path": path,
+                "label": label,
+                "transaction_rows": transaction_rows,
+            }
+        )
+
+        self.path = fspath(path)
+        self.label = label
+        self.transaction_rows = transaction_rows
+
+        self.session_id: Optional[int] = None
+        """Id of the current session, set once the writer thread started."""
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._command_ids: Dict[str, int] = {}
+        self._ecu_ids: Dict[str, int] = {}
+        self._pending = 0
+
+    def open(self) -> None:
+        self._db = sqlite3.connect(self.path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+        cursor = self._db.execute(
+            "INSERT INTO sessions (started, label) VALUES (?, ?)", (time(), self.label)
+        )
+        self.session_id = cursor.lastrowid
+        self._command_ids.clear()
+        self._ecu_ids.clear()
+        self._pending = 0
+
+    def write_batch(self, batch: List[Response]) -> None:
+        assert self._db is not None
+        rows = [row for response in batch for row in self._rows(response)]
+
+        if not self._db.in_transaction:
+            self._db.execute("BEGIN")
+
+        # A failed batch is dropped, its inserted rows must not be committed with the next ones
+        self._db.execute("SAVEPOINT batch")
+        try:
+            self._db.executemany(INSERT_SAMPLE, rows)
+        except Exception:
+            self._db.execute("ROLLBACK TO batch")
+            raise
+        finally:
+            self._db.execute("RELEASE batch")
+        self._pending += len(rows)
+
+        if self._pending >= self.transaction_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._db is not None and self._db.in_transaction:
+            self._db.execute("COMMIT")
+        self._pending = 0
+
+    def release(self) -> None:
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+            self._db = None
+
+    def _rows(self, response: Response) -> List[_Row]:
+        """Return the sample rows of a response, one per responding ECU."""
+        assert self.session_id is not None
+        command = response.context.command
+        command_id = self._command_id(command.label, command.units)
+
+        if not response.messages:
+            value, value_text = split_value(response.value)
+            return [
+                (
+                    self.session_id,
+                    command_id,
+                    None,
+                    response.timestamp,
+                    value,
+                    value_text,
+                    response.raw,
+                )
+            ]
+
+        rows: List[_Row] = []
+        for index, (header, message) in enumerate(response.messages.items()):
+            if index == 0 or not command.resolver:
+                resolved = response.value
+            else:
+                try:
+                    resolved = command.resolver(message)
+                except Exception:
+                    resolved = None
+            value, value_text = split_value(resolved)
+            rows.append(
+                (
+                    self.session_id,
+                    command_id,
+                    self._ecu_id(bytes_to_string(header)),
+                    response.timestamp,
+                    value,
+                    value_text,
+                    response.raw,
+                )
+            )
+        return rows
+
+    def _command_id(self, name: str, units: Any) -> int:
+        command_id = self._command_ids.get(name)
+        if command_id is None:
+            command_id = self._command_ids[name] = self._lookup(
+                "commands",
+                "name",
+                name,
+                units=dumps(serialize_value(units)) if units else None,
+            )
+        return command_id
+
+    def _ecu_id(self, header: str) -> int:
+        ecu_id = self._ecu_ids.get(header)
+        if ecu_id is None:
+            ecu_id = self._ecu_ids[header] = self._lookup("ecus", "header", header)
+        return ecu_id
+
+    def _lookup(self, table: str, key: str, value: str, **columns: Any) -> int:
+        """Return the id of a row of a lookup table, inserting it if needed."""
+        assert self._db is not None
+        row = self._db.execute(
+            f"SELECT id FROM {table} WHERE {key} = ?", (value,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+
+        names = ", ".join((key, *columns))
+        placeholders = ", ".join("?" * (1 + len(columns)))
+        cursor = self._db.execute(
+            f"INSERT INTO {table} ({names}) VALUES ({placeholders})",
+            (value, *columns.values()),
+        )
+        return cursor.lastrowid  # type: ignore[return-value]
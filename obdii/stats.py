@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Deque, Dict, Final, List, Optional, Tuple
+
+from .command import Command
+from .protocol import Protocol
+
+
+STAGES: Final[Tuple[str, ...]] = ("write", "wait", "transfer", "parse", "total")
+"""Names of the measured query stages.
+
+- ``write``: writing the query to the transport.
+- ``wait``: from the end of the write to the first response byte (adapter and vehicle latency).
+- ``transfer``: from the first response byte to the prompt (link throughput).
+- ``parse``: protocol parsing and value resolution.
+- ``total``: the whole round trip.
+
+``wait`` and ``transfer`` are only available when the transport reports its first byte time,
+otherwise their sum is reported as ``wait``.
+"""
+
+
+@dataclass
+class QueryTiming:
+    """Timestamps (:func:`time.perf_counter_ns`) of each stage of a single query."""
+
+    command: Command
+    protocol: Protocol
+    write_start: int
+    write_done: Optional[int] = None
+    first_byte: Optional[int] = None
+    prompt: Optional[int] = None
+    parsed: Optional[int] = None
+    error: Optional[str] = None
+
+    def durations(self) -> Dict[str, int]:
+        """Return the duration in nanoseconds of every completed stage."""
+        durations: Dict[str, int] = {}
+
+        if self.write_done is not None:
+            durations["write"] = self.write_done - self.write_start
+
+            if self.prompt is not None:
+                if self.first_byte is not None:
+                    durations["wait"] = self.first_byte - self.write_done
+                    durations["transfer"] = self.prompt - self.first_byte
+                else:
+                    durations["wait"] = self.prompt - self.write_done
+
+                if self.parsed is not None:
+                    durations["parse"] = self.parsed - self.prompt
+
+        end = self.parsed or self.prompt or self.write_done
+        if end is not None:
+            durations["total"] = end - self.write_start
+
+        return durations
+
+
+@dataclass
+class InitStep:
+    """Duration of one step of the connection initialization, see :attr:`~obdii.Connection.init_steps`."""
+
+    name: str
+    duration: int
+    """Duration in nanoseconds."""
+    ok: bool = True
+    """Whether the step succeeded, failed reset attempts are followed by a slower one."""
+
+
+@dataclass
+class LatencySummary:
+    """Latency distribution of one stage, in milliseconds."""
+
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+    @classmethod
+    def from_samples(cls, samples: List[int]) -> LatencySummary:
+        ordered = sorted(samples)
+        n = len(ordered)
+
+        def percentile(p: float) -> float:
+            return ordered[min(n - 1, int(p * n))] / 1e6
+
+        return cls(
+            count=n,
+            mean=sum(ordered) / n / 1e6,
+            p50=percentile(0.50),
+            p95=percentile(0.95),
+            p99=percentile(0.99),
+            max=ordered[-1] / 1e6,
+        )
+
+
+@dataclass
+class GroupStats:
+    """Aggregated statistics of a group of queries (one command or one protocol)."""
+
+    count: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+    stages: Dict[str, LatencySummary] = field(default_factory=dict)
+
+
+@dataclass
+class StatsSnapshot:
+    """Point in time copy of :class:`QueryStats`."""
+
+    commands: Dict[str, GroupStats]
+    """Statistics per command, keyed by :attr:`~obdii.Command.label`."""
+    protocols: Dict[str, GroupStats]
+    """Statistics per protocol, keyed by protocol name."""
+
+
+class _Group:
+    __slots__ = ("count", "errors", "samples")
+
+    def __init__(self, max_samples: int) -> None:
+        self.count = 0
+        self.errors: Dict[str, int] = {}
+        self.samples: Dict[str, Deque[int]] = {
+            stage: deque(maxlen=max_samples) for stage in STAGES
+        }
+
+    def add(self, timing: QueryTiming, durations: Dict[str, int]) -> None:
+        self.count += 1
+        if timing.error is not None:
+            self.errors[timing.error] = self.errors.get(timing.error, 0) + 1
+        for stage, duration in durations.items():
+            self.samples[stage].append(duration)
+
+    def summarize(self) -> GroupStats:
+        return GroupStats(
+            count=self.count,
+            errors=dict(self.errors),
+            stages={
+                stage: LatencySummary.from_samples(list(samples))
+                for stage, samples in self.samples.items()
+                if samples
+            },
+        )
+
+
+class QueryStats:
+    """
+    Per-command and per-protocol latency statistics of the queries sent by a :class:`~obdii.Connection`.
+
+    Only the most recent `max_samples` durations of each stage are kept to compute percentiles,
+    counts and errors are cumulative until :meth:`reset`.
+
+    Example
+    -------
+    .. code-block:: python
+
+        conn.query(commands.ENGINE_SPEED)
+
+        snapshot = conn.stats.snapshot()
+        speed = snapshot.commands["ENGINE_SPEED"]
+
+        >>> speed.stages["wait"].p95
+        48.7
+    """
+
+    def __init__(self, max_samples: int = 4096) -> None:
+        self.max_samples = max_samples
+
+        self._lock = Lock()
+        self._commands: Dict[Command, _Group] = {}
+        self._protocols: Dict[str, _Group] = {}
+
+    def __repr__(self) -> str:
+        return f"<QueryStats {len(self._commands)} commands>"
+
+    def record(self, timing: QueryTiming) -> None:
+        """Add the timing of a completed (or failed) query."""
+        durations = timing.durations()
+
+        with self._lock:
+            group = self._commands.get(timing.command)
+            if group is None:
+                group = self._commands[timing.command] = _Group(self.max_samples)
+            group.add(timing, durations)
+
+            group = self._protocols.get(timing.protocol.name)
+            if group is None:
+                group = self._protocols[timing.protocol.name] = _Group(self.max_samples)
+            group.add(timing, durations)
+
+    def snapshot(self) -> StatsSnapshot:
+        """Return a copy of the current statistics."""
+        with self._lock:
+            return StatsSnapshot(
+                commands={k.label: g.summarize() for k, g in self._commands.items()},
+                protocols={k: g.summarize() for k, g in self._protocols.items()},
+            )
+
+    def reset(self) -> None:
+        """Forget every recorded query."""
+        with self._lock:
+            self._commands.clear()
+            self._protocols.clear()
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Final,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .command import Command
+from .modes import Mode01, ModeAT
+from .protocol import Protocol
+from .protocols.protocol_can import CAN_PROTOCOLS
+from .response import Response
+from .utils.bits import bytes_to_string
+
+if TYPE_CHECKING:
+    from .connection import Connection
+
+
+FUNCTIONAL_HEADER_11: Final = "7DF"
+"""Functional (broadcast) request header of 11 bit CAN."""
+FUNCTIONAL_HEADER_29: Final = "18DB33F1"
+"""Functional (broadcast) request header of 29 bit CAN."""
+
+
+class EcuAddress(NamedTuple):
+    """Physical CAN addresses of an ECU."""
+
+    request: str
+    """Header of the requests sent to the ECU, e.g. "7E0"."""
+    response: str
+    """Identifier of the ECU responses, e.g. "7E8"."""
+
+    @classmethod
+    def from_response(cls, response_id: Union[str, bytes, int]) -> EcuAddress:
+        """
+        Derive the physical request header of an ECU from the identifier of its responses.
+
+        11 bit identifiers are answered 8 above the request (7E0 to 7E8),
+        29 bit identifiers swap the target and source addresses (18DA10F1 to 18DAF110).
+        """
+        if isinstance(response_id, bytes):
+            response_id = bytes_to_string(response_id)
+        if isinstance(response_id, str):
+            response_id = int(response_id.replace(" ", ""), 16)
+
+        if response_id <= 0x7FF:
+            return cls(f"{response_id - 8:03X}", f"{response_id:03X}")
+
+        source = response_id & 0xFF
+        target = (response_id >> 8) & 0xFF
+        request = (response_id & 0xFFFF0000) | (source << 8) | target
+        return cls(f"{request:08X}", f"{response_id:08X}")
+
+
+Request = Tuple[Command, Optional[EcuAddress]]
+"""A command and the ECU it is sent to, None for a functional (broadcast) request."""
+
+
+def plan(
+    requests: Sequence[Request], current: Optional[EcuAddress] = None
+) -> List[int]:
+    """
+    Order requests to minimize header switches.
+
+    Requests are grouped by ECU, the group of the currently selected ECU first,
+    the others in order of first appearance, the order within a group is kept.
+
+    Returns
+    -------
+    List[:class:`int`]
+        Indexes of the requests, in the order to send them.
+    """
+    groups: Dict[Optional[EcuAddress], List[int]] = {}
+    if any(ecu == current for _, ecu in requests):
+        groups[current] = []
+    for index, (_, ecu) in enumerate(requests):
+        groups.setdefault(ecu, []).append(index)
+    return [index for indexes in groups.values() for index in indexes]
+
+
+class EcuTargeting:
+    """
+    Physical addressing of single ECUs over CAN.
+
+    Functional requests make the adapter wait for every ECU of the vehicle to answer,
+    addressing one ECU with ``AT SH`` and accepting only its replies with ``AT CRA`` avoids those waits,
+    and pairs well with ``early_return``. The selected ECU is remembered so the header is only sent when it changes.
+
+    Example
+    -------
+    .. code-block:: python
+
+        targeting = EcuTargeting(conn)
+        engine, transmission = targeting.discover()
+
+        with targeting.target(engine):
+            conn.query(commands.ENGINE_SPEED)
+
+        responses = targeting.query_many(
+            [(commands.ENGINE_SPEED, engine), (commands.VEHICLE_SPEED, transmission), (commands.ENGINE_LOAD, engine)]
+        )
+    """
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+
+        self.current: Optional[EcuAddress] = None
+        """The selected ECU, None when requests are functional."""
+        self.switches = 0
+        """Number of header changes sent to the adapter."""
+
+    def __repr__(self) -> str:
+        return f"<EcuTargeting {self.current} switches={self.switches}>"
+
+    def discover(self, command: Command = Mode01.SUPPORTED_PIDS_A) -> List[EcuAddress]:
+        """Return the addresses of the ECUs answering a functional request."""
+        self.select(None)
+        response = self.connection.query(command)
+        return [EcuAddress.from_response(ecu) for ecu in response.messages or {}]
+
+    def select(self, ecu: Optional[EcuAddress]) -> bool:
+        """
+        Address the following requests to an ECU, or to every ECU with None.
+
+        Returns
+        -------
+        :class:`bool`
+            Whether the adapter had to be reconfigured.
+        """
+        if ecu == self.current:
+            return False
+
+        for command in self._header_commands(ecu):
+            self.connection.query(command)
+        self.current = ecu
+        self.switches += 1
+        return True
+
+    @contextmanager
+    def target(self, ecu: Optional[EcuAddress]) -> Iterator[None]:
+        """Address the requests of the block to an ECU, then restore the previous target."""
+        previous = self.current
+        self.select(ecu)
+        try:
+            yield
+        finally:
+            self.select(previous)
+
+    def query(self, command: Command, ecu: Optional[EcuAddress]) -> Response:
+        """Send a command to an ECU, the target stays selected afterwards."""
+        self.select(ecu)
+        return self.connection.query(command)
+
+    def query_many(self, requests: Sequence[Request]) -> List[Response]:
+        """
+        Send commands to their ECUs, ordered with :func:`plan` to minimize header switches.
+
+        Returns
+        -------
+        List[:class:`~obdii.Response`]
+            The responses, in the order of the requests.
+        """
+        responses: List[Optional[Response]] = [None] * len(requests)
+        for index in plan(requests, self.current):
+            command, ecu = requests[index]
+            responses[index] = self.query(command, ecu)
+        return responses  # type: ignore[return-value]
+
+    def _header_commands(self, ecu: Optional[EcuAddress]) -> List[Command]:
+        protocol = self.connection.protocol
+        if protocol not in CAN_PROTOCOLS:
+            raise ValueError(
+                f"Physical addressing requires a CAN protocol, got {Protocol(protocol).name}."
+            )
+
+        long = CAN_PROTOCOLS[protocol]["header_length"] == 29
+        if ecu is None:
+            header = FUNCTIONAL_HEADER_29 if long else FUNCTIONAL_HEADER_11
+            return [self._set_header(header), ModeAT.RESET_CAN_ADDR()]
+
+        receive = ModeAT.SET_CAN_ADDR_LONG if long else ModeAT.SET_CAN_ADDR
+        return [self._set_header(ecu.request), receive(ecu.response)]
+
+    @staticmethod
+    def _set_header(header: str) -> Command:
+        if len(header) == 3:
+            return ModeAT.SET_HEADER_11(*header)
+        return ModeAT.SET_HEADER_29(header[0:2], header[2:4], header[4:6], header[6:8])
@@ -1,7 +1,15 @@
+from .transport_mux import TransportMux
+from .transport_recorder import TransportRecorder
+from .transport_replay import TransportReplay
 from .transport_serial import TransportSerial
+from .transport_simulated import TransportSimulated
 from .transport_socket import TransportSocket
 
 __all__ = [
+    "TransportMux",
+    "TransportRecorder",
+    "TransportReplay",
     "TransportSerial",
+    "TransportSimulated",
     "TransportSocket",
 ]
@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 
 class TransportBase(ABC):
+    first_byte_ns: Optional[int] = None
+    """:func:`time.perf_counter_ns` timestamp of the first byte of the last response, if the transport can tell."""
+
     @abstractmethod
     def connect(self, **kwargs) -> None: ...
 
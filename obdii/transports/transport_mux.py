@@ -0,0 +1,113 @@
+import socket as _socket
+
+from socket import AF_INET, SOCK_STREAM, socket
+from struct import Struct
+from time import perf_counter_ns
+from typing import Any, Dict, Final, Optional, Union
+
+from .transport_base import TransportBase
+
+from ..basetypes import MISSING
+
+
+REQUEST_HEADER: Final = Struct(">BI")
+"""Client to server frame header: priority (0-255, higher is served first) and query length."""
+RESPONSE_HEADER: Final = Struct(">I")
+"""Server to client frame header: raw response length."""
+
+
+def recv_exact(sock: socket, size: int) -> bytes:
+    """Read exactly `size` bytes from a stream socket."""
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise RuntimeError("Socket connection closed.")
+        buffer += chunk
+    return bytes(buffer)
+
+
+class TransportMux(TransportBase):
+    def __init__(
+        self,
+        address: str = MISSING,
+        port: Union[str, int] = MISSING,
+        priority: int = 0,
+        timeout: float = 5.0,
+        **kwargs,
+    ) -> None:
+        """
+        Client side of an :class:`~obdii.server.AdapterServer`, sharing one adapter between several processes.
+
+        Parameters
+        ----------
+        address: :class:`str`
+            Hostname of a TCP server, or path of a Unix socket when `port` is omitted.
+        port: Union[:class:`str`, :class:`int`]
+            TCP port of the server.
+        priority: :class:`int`
+            Priority of this client's queries (0-255), higher values are served first.
+        timeout: :class:`float`
+            Socket timeout in seconds.
+        """
+        self.config: Dict[str, Any] = {
+            "address": address,
+            "port": port,
+            "priority": priority,
+            "timeout": timeout,
+            **kwargs,
+        }
+
+        self.socket_conn: Optional[socket] = None
+
+        if address is MISSING:
+            raise ValueError("Address must be specified for TransportMux.")
+        if not 0 <= priority <= 0xFF:
+            raise ValueError("Priority must be between 0 and 255.")
+
+    def __repr__(self) -> str:
+        address = self.config.get("address")
+        port = self.config.get("port")
+        return f"<TransportMux {address if port is MISSING else f'{address}:{port}'}>"
+
+    def is_connected(self) -> bool:
+        return self.socket_conn is not None
+
+    def connect(self, **kwargs) -> None:
+        self.config.update(kwargs)
+
+        address = self.config.get("address")
+        port = self.config.get("port")
+
+        if port is MISSING:
+            af_unix = getattr(_socket, "AF_UNIX", None)
+            if af_unix is None:
+                raise ValueError("Unix sockets are not supported on this platform.")
+            self.socket_conn = socket(af_unix, SOCK_STREAM)
+            target: Any = address
+        else:
+            self.socket_conn = socket(AF_INET, SOCK_STREAM)
+            target = (address, int(port))
+
+        self.socket_conn.settimeout(self.config.get("timeout"))
+        self.socket_conn.connect(target)
+
+    def close(self) -> None:
+        if self.socket_conn:
+            self.socket_conn.close()
+        self.socket_conn = None
+
+    def write_bytes(self, query: bytes) -> None:
+        if not self.socket_conn:
+            raise RuntimeError("Socket is not connected.")
+        header = REQUEST_HEADER.pack(self.config["priority"], len(query))
+        self.socket_conn.sendall(header + query)
+
+    def read_bytes(self) -> bytes:
+        if not self.socket_conn:
+            raise RuntimeError("Socket is not connected.")
+        (length,) = RESPONSE_HEADER.unpack(
+            recv_exact(self.socket_conn, RESPONSE_HEADER.size)
+        )
+        self.first_byte_ns = perf_counter_ns()
+        return recv_exact(self.socket_conn, length)
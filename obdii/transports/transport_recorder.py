@@ -0,0 +1,315 @@
+from logging import getLogger
+from os import PathLike
+from queue import Empty, Queue
+from struct import Struct, error as struct_error
+from threading import Thread
+from time import monotonic_ns, time_ns
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Final,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from .transport_base import TransportBase
+
+
+_log = getLogger(__name__)
+
+
+MAGIC: Final = b"OBDREC"
+"""Signature at the start of every recording file."""
+VERSION: Final = 1
+
+FILE_HEADER: Final = Struct(">6sB")
+"""File header: magic and format version."""
+RECORD_HEADER: Final = Struct(">qBI")
+"""Record header: monotonic timestamp in nanoseconds, direction and payload length."""
+SYNC_MARKER: Final = b"\xffOBDSYNC"
+"""Fixed bytes starting a sync point payload, searched for to recover from a corrupted record."""
+SYNC_PAYLOAD: Final = Struct(">8sq")
+"""Sync point payload: :data:`SYNC_MARKER` and wall clock time in nanoseconds since the epoch."""
+
+READ_SIZE: Final = 1 << 16
+"""Number of bytes read from a recording file at once."""
+MAX_RECORD_SIZE: Final = 1 << 20
+"""Largest payload of an exchange record, a longer length is read as a corrupted record."""
+
+DIRECTION_SYNC: Final = 0x00
+"""Sync point, written when recording starts and every `sync_every` records."""
+DIRECTION_WRITE: Final = 0x01
+"""Bytes written to the adapter."""
+DIRECTION_READ: Final = 0x02
+"""Bytes read from the adapter."""
+
+
+class Record(NamedTuple):
+    """A single entry of a recording."""
+
+    timestamp: int
+    """:func:`time.monotonic_ns` timestamp of the record."""
+    direction: int
+    """One of :data:`DIRECTION_SYNC`, :data:`DIRECTION_WRITE`, :data:`DIRECTION_READ`."""
+    data: bytes
+    """Exchanged bytes, or the sync point payload."""
+
+    @property
+    def wall_time(self) -> Optional[int]:
+        """Wall clock time in nanoseconds since the epoch of a sync point."""
+        if self.direction != DIRECTION_SYNC:
+            return None
+        return SYNC_PAYLOAD.unpack(self.data)[1]
+
+
+def encode_record(timestamp: int, direction: int, data: bytes) -> bytes:
+    """Serialize a record."""
+    return RECORD_HEADER.pack(timestamp, direction, len(data)) + data
+
+
+def encode_sync(timestamp: int) -> bytes:
+    """Serialize a sync point record."""
+    return encode_record(
+        timestamp, DIRECTION_SYNC, SYNC_PAYLOAD.pack(SYNC_MARKER, time_ns())
+    )
+
+
+class _RecordStream:
+    """Buffered reader of a recording file, only the bytes not consumed yet are kept in memory."""
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.buffer = bytearray()
+        self.offset = file.tell()
+        """File offset of the first buffered byte."""
+
+    def _fill(self, size: int) -> int:
+        """Read until `size` bytes are buffered or the file ends, return the number of buffered bytes."""
+        while len(self.buffer) < size:
+            data = self.file.read(max(READ_SIZE, size - len(self.buffer)))
+            if not data:
+                break
+            self.buffer += data
+        return len(self.buffer)
+
+    def peek(self, size: int) -> bytes:
+        """Return the next `size` bytes without consuming them, fewer at the end of the file."""
+        self._fill(size)
+        return bytes(self.buffer[:size])
+
+    def consume(self, size: int) -> None:
+        size = min(size, self._fill(size))
+        del self.buffer[:size]
+        self.offset += size
+
+    def resync(self) -> bool:
+        """Skip to the header of the next sync point after the current offset, False when there is none left."""
+        self.consume(1)
+        keep = RECORD_HEADER.size + len(SYNC_MARKER) - 1
+        while True:
+            index = self.buffer.find(SYNC_MARKER, RECORD_HEADER.size)
+            if index >= 0:
+                self.consume(index - RECORD_HEADER.size)
+                return True
+            # Only the bytes that may still belong to the next sync point are kept while searching
+            if len(self.buffer) > keep:
+                self.consume(len(self.buffer) - keep)
+            buffered = len(self.buffer)
+            if self._fill(buffered + READ_SIZE) == buffered:
+                return False
+
+
+def iter_records(path: Union[str, PathLike]) -> Iterator[Record]:
+    """
+    Read the records of a recording file, oldest first.
+
+    The file is streamed, a truncated last record (e.g. after a crash) ends the iteration,
+    a corrupted record (unknown direction, or a length running past the file or above
+    :data:`MAX_RECORD_SIZE`) is skipped up to the next sync point.
+
+    Parameters
+    ----------
+    path: Union[:class:`str`, :class:`os.PathLike`]
+        Recording file written by :class:`TransportRecorder`.
+    """
+    with open(path, "rb") as file:
+        try:
+            magic, version = FILE_HEADER.unpack(file.read(FILE_HEADER.size))
+        except struct_error:
+            raise ValueError(f"{path} is not a recording.") from None
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a recording.")
+        if version > VERSION:
+            raise ValueError(f"Unsupported recording version {version}.")
+
+        stream = _RecordStream(file)
+        while True:
+            header = stream.peek(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                if header:
+                    _log.warning(f"Truncated record at offset {stream.offset}.")
+                return
+
+            timestamp, direction, length = RECORD_HEADER.unpack(header)
+            size = RECORD_HEADER.size + length
+
+            valid = (
+                direction in (DIRECTION_WRITE, DIRECTION_READ)
+                and length <= MAX_RECORD_SIZE
+            ) or (
+                direction == DIRECTION_SYNC
+                and length == SYNC_PAYLOAD.size
+                and stream.peek(RECORD_HEADER.size + len(SYNC_MARKER)).endswith(
+                    SYNC_MARKER
+                )
+            )
+            if valid:
+                record = stream.peek(size)
+                if len(record) == size:
+                    stream.consume(size)
+                    yield Record(timestamp, direction, record[RECORD_HEADER.size :])
+                    continue
+
+            # A length running past the end is a truncated last record, unless more sync points follow
+            offset = stream.offset
+            if not stream.resync():
+                if valid:
+                    _log.warning(f"Truncated record at offset {offset}.")
+                else:
+                    _log.warning(
+                        f"Corrupted record at offset {offset}, no sync point left."
+                    )
+                return
+            _log.warning(
+                f"Corrupted record at offset {offset}, skipping to the next sync point."
+            )
+
+
+class TransportRecorder(TransportBase):
+    def __init__(
+        self,
+        transport: TransportBase,
+        path: Union[str, PathLike],
+        sync_every: int = 256,
+        batch_size: int = 64,
+        **kwargs,
+    ) -> None:
+        """
+        Wrap a transport and append every exchanged byte to a compact binary recording.
+
+        Records are serialized on the calling thread and written in batches by a background thread,
+        so the query loop never waits on the disk. Read a recording back with :func:`iter_records`.
+
+        Parameters
+        ----------
+        transport: :class:`~obdii.transports.transport_base.TransportBase`
+            The recorded transport.
+        path: Union[:class:`str`, :class:`os.PathLike`]
+            Recording file, appended to when it already exists.
+        sync_every: :class:`int`
+            Number of records between two sync points.
+        batch_size: :class:`int`
+            Maximum number of records written at once.
+        """
+        self.config: Dict[str, Any] = {
+            "path": path,
+            "sync_every": sync_every,
+            "batch_size": batch_size,
+            **kwargs,
+        }
+
+        self.transport = transport
+        self.path = path
+        self.sync_every = sync_every
+        self.batch_size = batch_size
+
+        self._records: Queue[Optional[bytes]] = Queue()
+        self._writer: Optional[Thread] = None
+        self._count = 0
+
+    def __repr__(self) -> str:
+        return f"<TransportRecorder {self.transport!r} -> {self.path}>"
+
+    @property
+    def first_byte_ns(self) -> Optional[int]:  # type: ignore[override]
+        return self.transport.first_byte_ns
+
+    def is_connected(self) -> bool:
+        return self.transport.is_connected()
+
+    def connect(self, **kwargs) -> None:
+        self.config.update(kwargs)
+        self.transport.connect(**kwargs)
+
+        if self._writer is None:
+            file = open(self.path, "ab")
+            if file.tell() == 0:
+                file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+            self._writer = Thread(
+                target=self._write_records,
+                args=(file,),
+                name="obdii-recorder",
+                daemon=True,
+            )
+            self._writer.start()
+
+        self._count = 0
+        self._records.put(encode_sync(monotonic_ns()))
+
+    def close(self) -> None:
+        try:
+            self.transport.close()
+        finally:
+            if self._writer is not None:
+                self._records.put(None)
+                self._writer.join()
+                self._writer = None
+
+    def write_bytes(self, query: bytes) -> None:
+        # Timed when sent, recorded only once the query reached the transport
+        timestamp = monotonic_ns()
+        self.transport.write_bytes(query)
+        self._record(DIRECTION_WRITE, query, timestamp)
+
+    def read_bytes(self) -> bytes:
+        response = self.transport.read_bytes()
+        self._record(DIRECTION_READ, response)
+        return response
+
+    def _record(
+        self, direction: int, data: bytes, timestamp: Optional[int] = None
+    ) -> None:
+        if timestamp is None:
+            timestamp = monotonic_ns()
+        self._count += 1
+        if self._count % self.sync_every == 0:
+            self._records.put(encode_sync(timestamp))
+        self._records.put(encode_record(timestamp, direction, data))
+
+    def _write_records(self, file: BinaryIO) -> None:
+        """Background writer loop, drains the queue in batches until the close sentinel."""
+        with file:
+            running = True
+            while running:
+                batch: List[bytes] = []
+                record = self._records.get()
+
+                while record is not None:
+                    batch.append(record)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        record = self._records.get_nowait()
+                    except Empty:
+                        break
+                else:
+                    running = False
+
+                if batch:
+                    file.write(b"".join(batch))
+                    file.flush()
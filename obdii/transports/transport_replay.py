@@ -0,0 +1,185 @@
+from os import PathLike
+from time import perf_counter, perf_counter_ns, sleep
+from typing import Any, Dict, Final, Iterable, List, NamedTuple, Optional, Union
+
+from .transport_base import TransportBase
+from .transport_recorder import DIRECTION_READ, DIRECTION_WRITE, Record, iter_records
+
+
+UNMATCHED_RESPONSE: Final = b"?\r\r>"
+"""Response to a query absent from the recording in matched mode, as an ELM327 answers an unknown command."""
+
+
+class ReplayExchange(NamedTuple):
+    """A recorded query and its response."""
+
+    query: bytes
+    response: bytes
+    latency: int
+    """Nanoseconds between the query and the response in the recording."""
+
+
+def normalize_query(query: bytes) -> bytes:
+    """Return the key used to match a query, ignoring spaces, case and line endings."""
+    return query.replace(b' ', b'').strip(b"\r\n").upper()
+
+
+def load_exchanges(records: Iterable[Record]) -> List[ReplayExchange]:
+    """Pair every written query of a recording with the bytes read after it."""
+    exchanges: List[ReplayExchange] = []
+    query: Optional[bytes] = None
+    written = 0
+    response = bytearray()
+    read = 0
+
+    def complete() -> None:
+        if query is not None:
+            exchanges.append(
+                ReplayExchange(query, bytes(response), max(0, read - written))
+            )
+
+    for record in records:
+        if record.direction == DIRECTION_WRITE:
+            complete()
+            query, written = record.data, record.timestamp
+            response.clear()
+            read = written
+        elif record.direction == DIRECTION_READ and query is not None:
+            response += record.data
+            read = record.timestamp
+    complete()
+
+    return exchanges
+
+
+class TransportReplay(TransportBase):
+    def __init__(
+        self,
+        recording: Union[str, PathLike, Iterable[Record]],
+        matched: bool = False,
+        speed: Optional[float] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Serve the responses of a :class:`~obdii.transports.TransportRecorder` recording instead of an adapter.
+
+        Parameters
+        ----------
+        recording: Union[:class:`str`, :class:`os.PathLike`, Iterable[:class:`~obdii.transports.transport_recorder.Record`]]
+            Recording file, or its records.
+        matched: :class:`bool`
+            If False, queries must be sent in the recorded order and a divergence raises :class:`RuntimeError`.
+            If True, each query is answered with the recorded responses to the same query, in turn,
+            an empty query (repeat of the last command) is answered as the query it repeats.
+        speed: Optional[:class:`float`]
+            Pacing of the responses: 1.0 reproduces the recorded adapter latency of each exchange, 2.0 halves them,
+            None (the default) answers as fast as possible. Only the time between a query and its response
+            is reproduced, not the time between two queries, which is left to the caller.
+        """
+        if speed is not None and speed <= 0:
+            raise ValueError("Speed must be positive.")
+
+        self.config: Dict[str, Any] = {
+            "matched": matched,
+            "speed": speed,
+            **kwargs,
+        }
+
+        if isinstance(recording, (str, PathLike)):
+            self.source = str(recording)
+            records: Iterable[Record] = iter_records(recording)
+        else:
+            self.source = "records"
+            records = recording
+
+        self.exchanges = load_exchanges(records)
+        self.matched = matched
+        self.speed = speed
+
+        self.position = 0
+        self._by_query: Dict[bytes, List[ReplayExchange]] = {}
+        self._turns: Dict[bytes, int] = {}
+        self._last_key = b""
+
+        key = b""
+        for exchange in self.exchanges:
+            key = normalize_query(exchange.query) or key
+            self._by_query.setdefault(key, []).append(exchange)
+
+        self._connected = False
+        self._pending: Optional[ReplayExchange] = None
+        self._sent_at = 0.0
+
+    def __repr__(self) -> str:
+        return f"<TransportReplay {self.source} {self.position}/{len(self.exchanges)}>"
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether every exchange was served, in strict order mode."""
+        return self.position >= len(self.exchanges)
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def connect(self, **kwargs) -> None:
+        self.config.update(kwargs)
+        self.position = 0
+        self._turns.clear()
+        self._last_key = b""
+        self._connected = True
+
+    def close(self) -> None:
+        self._connected = False
+        self._pending = None
+
+    def write_bytes(self, query: bytes) -> None:
+        if not self._connected:
+            raise RuntimeError("Replay is not connected.")
+
+        self._sent_at = perf_counter()
+        if self.matched:
+            self._pending = self._match(query)
+            return
+
+        if self.exhausted:
+            raise RuntimeError(f"Recording exhausted after {self.position} exchanges.")
+
+        exchange = self.exchanges[self.position]
+        if normalize_query(exchange.query) != normalize_query(query):
+            raise RuntimeError(
+                f"Replay diverged at exchange {self.position}: expected {exchange.query!r}, got {query!r}."
+            )
+
+        self.position += 1
+        self._pending = exchange
+
+    def read_bytes(self) -> bytes:
+        if not self._connected:
+            raise RuntimeError("Replay is not connected.")
+
+        self.first_byte_ns = None
+        exchange, self._pending = self._pending, None
+        if exchange is None:
+            return UNMATCHED_RESPONSE if self.matched else b''
+
+        if self.speed is not None:
+            remaining = exchange.latency / 1e9 / self.speed - (
+                perf_counter() - self._sent_at
+            )
+            if remaining > 0:
+                sleep(remaining)
+
+        self.first_byte_ns = perf_counter_ns()
+        return exchange.response
+
+    def _match(self, query: bytes) -> Optional[ReplayExchange]:
+        # Repeats are resolved to the query they repeat, as the adapter does
+        key = normalize_query(query) or self._last_key
+        self._last_key = key
+        candidates = self._by_query.get(key)
+        if not candidates:
+            return None
+
+        turn = self._turns.get(key, 0)
+        self._turns[key] = turn + 1
+        return candidates[turn % len(candidates)]
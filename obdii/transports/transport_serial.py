@@ -1,3 +1,4 @@
+from time import perf_counter_ns
 from typing import Optional, Dict, Any
 
 from serial import Serial
@@ -61,6 +62,16 @@ class TransportSerial(TransportBase):
     def read_bytes(self, expected_seq: bytes = b'>', size: int = MISSING) -> bytes:
         if not self.serial_conn or not self.serial_conn.is_open:
             raise RuntimeError("Serial port is not connected.")
-        return self.serial_conn.read_until(
-            expected_seq, size if size is not MISSING else None
+
+        # The first byte is read alone to time it, separating the adapter wait from the transfer
+        self.first_byte_ns = None
+        first = self.serial_conn.read(1)
+        if not first:
+            return first
+        self.first_byte_ns = perf_counter_ns()
+
+        if (expected_seq and first == expected_seq) or size == 1:
+            return first
+        return first + self.serial_conn.read_until(
+            expected_seq, size - 1 if size is not MISSING else None
         )
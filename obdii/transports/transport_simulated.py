@@ -0,0 +1,584 @@
+from dataclasses import dataclass, field
+from math import pi, sin
+from re import fullmatch
+from time import monotonic, perf_counter_ns, sleep
+from typing import Any, Callable, Dict, Final, Iterable, List, Optional, Tuple, Union
+
+from .transport_base import TransportBase
+
+from ..command import Command
+from ..modes import Mode01
+from ..protocol import Protocol
+from ..protocols.protocol_can import CAN_PROTOCOLS
+from ..protocols.protocol_j1850 import J1850_PROTOCOLS, ProtocolJ1850
+
+
+Signal = Callable[[float], List[int]]
+"""Signal generator, returns the data bytes of a PID at `t` seconds since connection."""
+
+
+def _encode(value: float, width: int) -> List[int]:
+    raw = max(0, min(int(round(value)), (1 << (8 * width)) - 1))
+    return list(raw.to_bytes(width, "big"))
+
+
+def constant(*data: int) -> Signal:
+    """Signal returning the same data bytes at any time."""
+    values = list(data)
+    return lambda t: values
+
+
+def sine(
+    low: int, high: int, period: float, width: int = 1, phase: float = 0.0
+) -> Signal:
+    """Signal oscillating between two raw values, encoded big-endian on `width` bytes."""
+    middle = (low + high) / 2
+    amplitude = (high - low) / 2
+    return lambda t: _encode(
+        middle + amplitude * sin(2 * pi * t / period + phase), width
+    )
+
+
+def ramp(low: int, high: int, duration: float, width: int = 1) -> Signal:
+    """Signal rising linearly from `low` to `high` over `duration` seconds, then holding `high`."""
+    return lambda t: _encode(low + (high - low) * min(t / duration, 1.0), width)
+
+
+DEFAULT_VIN: Final = "1OBDII0SIMULATED1"
+
+DEFAULT_SIGNALS: Final[Dict[Command, Signal]] = {
+    Mode01.ENGINE_LOAD: sine(40, 160, 20.0),
+    Mode01.ENGINE_COOLANT_TEMP: ramp(60, 130, 300.0),
+    Mode01.ENGINE_SPEED: sine(800 * 4, 3000 * 4, 20.0, width=2),
+    Mode01.VEHICLE_SPEED: sine(0, 120, 60.0),
+    Mode01.INTAKE_AIR_TEMP: constant(65),
+    Mode01.THROTTLE_POSITION: sine(30, 200, 20.0),
+    Mode01.OBD_STANDARDS: constant(0x06),
+    Mode01.ENGINE_RUN_TIME: lambda t: _encode(t, 2),
+    Mode01.FUEL_LEVEL: constant(180),
+    Mode01.AMBIENT_AIR_TEMP: constant(60),
+    Mode01.FUEL_TYPE: constant(0x01),
+}
+"""Signals of the default engine ECU."""
+
+PROTOCOL_DESCRIPTIONS: Final[Dict[Protocol, str]] = {
+    Protocol.SAE_J1850_PWM: "SAE J1850 PWM",
+    Protocol.SAE_J1850_VPW: "SAE J1850 VPW",
+    Protocol.ISO_9141_2: "ISO 9141-2",
+    Protocol.ISO_14230_4_KWP: "ISO 14230-4 (KWP 5BAUD)",
+    Protocol.ISO_14230_4_KWP_FAST: "ISO 14230-4 (KWP FAST)",
+    Protocol.ISO_15765_4_CAN: "ISO 15765-4 (CAN 11/500)",
+    Protocol.ISO_15765_4_CAN_B: "ISO 15765-4 (CAN 29/500)",
+    Protocol.ISO_15765_4_CAN_C: "ISO 15765-4 (CAN 11/250)",
+    Protocol.ISO_15765_4_CAN_D: "ISO 15765-4 (CAN 29/250)",
+    Protocol.SAE_J1939_CAN: "SAE J1939 (CAN 29/250)",
+    Protocol.USER1_CAN: "USER1 (CAN 11/125)",
+    Protocol.USER2_CAN: "USER2 (CAN 11/50)",
+}
+
+_FUNCTIONAL_HEADERS: Final = {0x7DF, 0x18DB33F1}
+_NO_PID_MODES: Final = {0x03, 0x04, 0x07, 0x0A}
+
+_AT_COMMANDS: Final[Tuple[Tuple[str, str], ...]] = (
+    ("Z", r"Z"),
+    ("WS", r"WS"),
+    ("D", r"D"),
+    ("E", r"E([01])"),
+    ("L", r"L([01])"),
+    ("H", r"H([01])"),
+    ("S", r"S([01])"),
+    ("I", r"I"),
+    ("@1", r"@1"),
+    ("RV", r"RV"),
+    ("DP", r"DP"),
+    ("DPN", r"DPN"),
+    ("SP", r"SP(A?)([0-9A-C])"),
+    ("TP", r"TP(A?)([0-9A-C])"),
+    ("SH", r"SH([0-9A-F]{3}|[0-9A-F]{6}|[0-9A-F]{8})"),
+    ("CRA", r"CRA([0-9A-F]{3}|[0-9A-F]{8})?"),
+    ("AR", r"AR"),
+    ("ST", r"ST([0-9A-F]{2})"),
+    ("AT", r"AT([012])"),
+    ("CAF", r"CAF([01])"),
+    ("CFC", r"CFC([01])"),
+    ("FC", r"FCS(?:M[0-2]|H[0-9A-F]{3}|H[0-9A-F]{8}|D[0-9A-F]{2,10})"),
+    ("C", r"C([01])"),
+    ("DLC", r"D([01])"),
+    ("BRD", r"BRD([0-9A-F]{2})"),
+    ("PC", r"PC"),
+    ("IGN", r"IGN"),
+    ("M", r"M[01]"),
+    ("AL", r"AL"),
+    ("NL", r"NL"),
+    ("BI", r"BI"),
+    ("SS", r"SS"),
+    ("IFR", r"IFR[0-6HS]"),
+    ("FI", r"FI"),
+)
+"""Supported AT commands: name (as used by `unsupported`) and pattern of the command without spaces."""
+
+
+def _supported_bitmap(pids: Iterable[int], base: int) -> List[int]:
+    bitmap = 0
+    for pid in pids:
+        if base < pid <= base + 0x20:
+            bitmap |= 1 << (0x20 - (pid - base))
+    return list(bitmap.to_bytes(4, "big"))
+
+
+def _dtc_bytes(code: str) -> List[int]:
+    category = "PCBU".index(code[0].upper())
+    value = (category << 14) | int(code[1:], 16)
+    return [value >> 8, value & 0xFF]
+
+
+@dataclass
+class SimulatedECU:
+    """
+    Electronic control unit of a :class:`TransportSimulated` vehicle.
+
+    Attributes
+    ----------
+    index: :class:`int`
+        Position of the ECU on the bus, the engine is 0.
+        Defines its addresses, e.g. 7E8 + index on 11 bit CAN, 10 + index on KWP and J1850.
+    signals: Dict[:class:`~obdii.Command`, :class:`Signal`]
+        Data generators of the supported PIDs, the supported PIDs bitmaps are derived from them.
+    dtcs: List[:class:`str`]
+        Stored trouble codes returned by Mode 03 (e.g. "P0158"), cleared by Mode 04.
+    latency: :class:`float`
+        Seconds before the ECU answers a request.
+    vin: Optional[:class:`str`]
+        Vehicle identification number returned by Mode 09.
+    calibration_id: Optional[:class:`str`]
+        Calibration identifier returned by Mode 09.
+    ecu_name: Optional[:class:`str`]
+        ECU name returned by Mode 09.
+    """
+
+    index: int = 0
+    signals: Dict[Command, Signal] = field(
+        default_factory=lambda: dict(DEFAULT_SIGNALS)
+    )
+    dtcs: List[str] = field(default_factory=list)
+    latency: float = 0.0
+    vin: Optional[str] = DEFAULT_VIN
+    calibration_id: Optional[str] = "OBDIISIMCAL00001"
+    ecu_name: Optional[str] = "ECM-EngineControl"
+
+    def pids(self, mode: int) -> List[int]:
+        """Return the PIDs of a mode the ECU can answer, excluding supported PIDs bitmaps."""
+        if mode == 0x09:
+            return [p for pid in self.infos() for p in (pid - 1, pid)]
+        return [int(c.pid) for c in self.signals if int(c.mode.value) == mode]
+
+    def infos(self) -> Dict[int, List[int]]:
+        """Return the Mode 09 data of the ECU keyed by PID, padded like a vehicle would."""
+        infos: Dict[int, List[int]] = {}
+        for pid, text, size in (
+            (0x02, self.vin, 17),
+            (0x04, self.calibration_id, 16),
+            (0x0A, self.ecu_name, 20),
+        ):
+            if text is not None:
+                infos[pid] = list(text.encode("ascii")[:size].ljust(size, b'\x00'))
+        return infos
+
+    def data(self, mode: int, pid: int, t: float) -> Optional[List[int]]:
+        """Return the data bytes of a Mode 01/02 PID at time `t`, None if unsupported."""
+        supported = self.pids(mode)
+        if pid % 0x20 == 0:
+            if pid and not any(p > pid for p in supported):
+                return None
+            return _supported_bitmap(supported, pid)
+
+        for command, signal in self.signals.items():
+            if int(command.mode.value) == mode and command.pid == pid:
+                return list(signal(t))
+        return None
+
+
+class TransportSimulated(TransportBase):
+    def __init__(
+        self,
+        protocol: Protocol = Protocol.ISO_15765_4_CAN,
+        ecus: Union[int, List[SimulatedECU]] = 1,
+        version: str = "ELM327 v2.1",
+        baudrate: Optional[int] = None,
+        settle: float = 0.0,
+        reset_time: float = 0.0,
+        unsupported: Iterable[str] = (),
+        stn: Optional[str] = None,
+        **kwargs,
+    ) -> None:
+        """
+        In-process ELM327 adapter connected to a simulated vehicle, for tests and benchmarks without hardware.
+
+        Answers the AT commands used by :class:`~obdii.Connection` and Mode 01, 02, 03, 04 and 09 requests,
+        honouring the echo, linefeed, spaces, headers, CAN formatting, header and receive filter settings.
+
+        Parameters
+        ----------
+        protocol: :class:`~obdii.Protocol`
+            Protocol spoken by the vehicle, found by automatic search (``AT SP 0``).
+        ecus: Union[:class:`int`, List[:class:`SimulatedECU`]]
+            The vehicle ECUs, or a number of ECUs: an engine ECU followed by ECUs only reporting the vehicle speed.
+        version: :class:`str`
+            Identification returned by ``AT I`` and ``AT Z``.
+        baudrate: Optional[:class:`int`]
+            Simulated serial link speed, each transmitted byte takes 10 bit times, instantaneous when omitted.
+        settle: :class:`float`
+            Seconds the adapter keeps listening after the last ECU response, skipped when the early return count is reached.
+        reset_time: :class:`float`
+            Seconds taken by ``AT Z``.
+        unsupported: Iterable[:class:`str`]
+            AT command names answered with ``?``, to simulate clones (e.g. ``{"BRD", "CAF"}``).
+        stn: Optional[:class:`str`]
+            Identification returned by ``STI``, simulating an STN chip when set.
+        """
+        if isinstance(ecus, int):
+            ecus = [
+                SimulatedECU(index=0)
+                if index == 0
+                else SimulatedECU(
+                    index=index,
+                    signals={
+                        Mode01.VEHICLE_SPEED: DEFAULT_SIGNALS[Mode01.VEHICLE_SPEED]
+                    },
+                    vin=None,
+                    calibration_id=None,
+                    ecu_name=None,
+                )
+                for index in range(ecus)
+            ]
+
+        self.config: Dict[str, Any] = {
+            "protocol": protocol,
+            "version": version,
+            "baudrate": baudrate,
+            "settle": settle,
+            "reset_time": reset_time,
+            **kwargs,
+        }
+
+        self.vehicle_protocol = protocol
+        self.ecus = ecus
+        self.unsupported = {name.upper() for name in unsupported}
+        self.stn = stn
+
+        self._connected = False
+        self._started = 0.0
+        self._pending: Optional[Tuple[bytes, float, float]] = None
+        self._last_query = ""
+        self._reset_state()
+
+    def __repr__(self) -> str:
+        return (
+            f"<TransportSimulated {self.vehicle_protocol.name} {len(self.ecus)} ECU(s)>"
+        )
+
+    def _reset_state(self) -> None:
+        self.echo = True
+        self.linefeed = False
+        self.headers = False
+        self.spaces = True
+        self.dlc = False
+        self.can_formatting = True
+        self.auto_protocol = True
+        self.protocol = self.vehicle_protocol
+        self.header: Optional[int] = None
+        self.receive_filter: Optional[int] = None
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def connect(self, **kwargs) -> None:
+        self.config.update(kwargs)
+        self._reset_state()
+        self._started = monotonic()
+        self._connected = True
+
+    def close(self) -> None:
+        self._connected = False
+        self._pending = None
+
+    def write_bytes(self, query: bytes) -> None:
+        if not self._connected:
+            raise RuntimeError("Simulated adapter is not connected.")
+
+        text = query.decode(errors="ignore").strip("\r\n")
+        body = text.replace(" ", "").upper() or self._last_query
+        self._last_query = body
+        lines, wait = self._handle(body)
+
+        eol = "\r\n" if self.linefeed else "\r"
+        echo = text + eol if self.echo else ""
+        response = (echo + eol.join(lines) + eol + eol + ">").encode()
+
+        baudrate = self.config.get("baudrate")
+        if baudrate:
+            wait += len(query) * 10 / baudrate
+            transfer = len(response) * 10 / baudrate
+        else:
+            transfer = 0.0
+
+        self._pending = (response, wait, transfer)
+
+    def read_bytes(self) -> bytes:
+        if not self._connected:
+            raise RuntimeError("Simulated adapter is not connected.")
+
+        self.first_byte_ns = None
+        if self._pending is None:
+            return b''
+
+        response, wait, transfer = self._pending
+        self._pending = None
+
+        if wait > 0:
+            sleep(wait)
+        self.first_byte_ns = perf_counter_ns()
+        if transfer > 0:
+            sleep(transfer)
+
+        return response
+
+    def _handle(self, body: str) -> Tuple[List[str], float]:
+        """Return the response lines of a query (without spaces) and the time before the first byte."""
+        if body.startswith("AT"):
+            return self._handle_at(body[2:])
+        if body == "STI" and self.stn is not None:
+            return [self.stn], 0.0
+        if body and fullmatch(r"[0-9A-F]+", body):
+            return self._handle_obd(body)
+        return ["?"], 0.0
+
+    def _handle_at(self, body: str) -> Tuple[List[str], float]:
+        for name, pattern in _AT_COMMANDS:
+            match = fullmatch(pattern, body)
+            if match is None:
+                continue
+            if name in self.unsupported:
+                return ["?"], 0.0
+            return self._apply_at(
+                name, match.groups()
+            ), 0.0 if name != "Z" else self.config.get("reset_time", 0.0)
+        return ["?"], 0.0
+
+    def _apply_at(self, name: str, args: Tuple[Optional[str], ...]) -> List[str]:
+        if name in ("Z", "WS"):
+            self._reset_state()
+            return ["", self.config["version"]]
+        if name == "D":
+            self._reset_state()
+        elif name == "E":
+            self.echo = args[0] == "1"
+        elif name == "L":
+            self.linefeed = args[0] == "1"
+        elif name == "H":
+            self.headers = args[0] == "1"
+        elif name == "S":
+            self.spaces = args[0] == "1"
+        elif name == "DLC":
+            self.dlc = args[0] == "1"
+        elif name == "CAF":
+            self.can_formatting = args[0] == "1"
+        elif name == "I":
+            return [self.config["version"]]
+        elif name == "@1":
+            return ["OBDII to RS232 Interpreter"]
+        elif name == "RV":
+            return ["12.6V"]
+        elif name == "IGN":
+            return ["ON"]
+        elif name == "DP":
+            description = PROTOCOL_DESCRIPTIONS.get(self.protocol, "AUTO")
+            return [f"AUTO, {description}" if self.auto_protocol else description]
+        elif name == "DPN":
+            return [f"{'A' if self.auto_protocol else ''}{self.protocol.value:X}"]
+        elif name in ("SP", "TP"):
+            number = int(args[1], 16)
+            self.auto_protocol = number == 0 or args[0] == "A"
+            self.protocol = (
+                self.vehicle_protocol if self.auto_protocol else Protocol(number)
+            )
+        elif name == "SH":
+            value = int(args[0], 16)
+            if len(args[0]) == 6 and self._is_29_bit():
+                value |= 0x18 << 24
+            self.header = value
+        elif name == "CRA":
+            self.receive_filter = int(args[0], 16) if args[0] else None
+        elif name == "AR":
+            self.receive_filter = None
+        return ["OK"]
+
+    def _is_29_bit(self) -> bool:
+        return CAN_PROTOCOLS.get(self.protocol, {}).get("header_length") == 29
+
+    def _request_id(self, ecu: SimulatedECU) -> int:
+        if self._is_29_bit():
+            return 0x18DA00F1 | ((0x10 + ecu.index) << 8)
+        return 0x7E0 + ecu.index
+
+    def _response_id(self, ecu: SimulatedECU) -> int:
+        if self.protocol in CAN_PROTOCOLS:
+            if self._is_29_bit():
+                return 0x18DAF100 | (0x10 + ecu.index)
+            return 0x7E8 + ecu.index
+        return 0x10 + ecu.index
+
+    def _responders(self) -> List[SimulatedECU]:
+        ecus = self.ecus
+        if self.protocol in CAN_PROTOCOLS:
+            if self.header is not None and self.header not in _FUNCTIONAL_HEADERS:
+                ecus = [ecu for ecu in ecus if self._request_id(ecu) == self.header]
+            if self.receive_filter is not None:
+                ecus = [
+                    ecu for ecu in ecus if self._response_id(ecu) == self.receive_filter
+                ]
+        return sorted(ecus, key=lambda ecu: ecu.latency)
+
+    def _handle_obd(self, body: str) -> Tuple[List[str], float]:
+        mode = int(body[:2], 16)
+        rest = body[2:]
+        pid: Optional[int] = None
+
+        if mode not in _NO_PID_MODES:
+            if len(rest) < 2:
+                return ["?"], 0.0
+            pid = int(rest[:2], 16)
+            rest = rest[4:] if mode == 0x02 else rest[2:]
+
+        if len(rest) > 1:
+            return ["?"], 0.0
+        expected = int(rest, 16) if rest else 0
+
+        if self.protocol != self.vehicle_protocol:
+            return ["UNABLE TO CONNECT"], 0.0
+
+        t = monotonic() - self._started
+        arrivals: List[Tuple[float, str]] = []
+        for ecu in self._responders():
+            for payload in self._payloads(ecu, mode, pid, t):
+                arrivals.extend(
+                    (ecu.latency, line) for line in self._format(ecu, payload, mode)
+                )
+
+        if not arrivals:
+            return ["NO DATA"], max(
+                (ecu.latency for ecu in self.ecus), default=0.0
+            ) + self.config["settle"]
+
+        if expected and len(arrivals) >= expected:
+            arrivals = arrivals[:expected]
+            wait = arrivals[-1][0]
+        else:
+            wait = arrivals[-1][0] + self.config["settle"]
+
+        return [line for _, line in arrivals], wait
+
+    def _payloads(
+        self, ecu: SimulatedECU, mode: int, pid: Optional[int], t: float
+    ) -> List[List[int]]:
+        """Return the messages (service byte onwards) answered by an ECU, one per frame on legacy protocols."""
+        legacy = self.protocol not in CAN_PROTOCOLS
+
+        if mode == 0x03:
+            codes = [byte for code in ecu.dtcs for byte in _dtc_bytes(code)]
+            if not legacy:
+                return [[0x43, len(ecu.dtcs)] + codes]
+            chunks = [codes[i : i + 6] for i in range(0, len(codes), 6)] or [[]]
+            return [[0x43] + chunk + [0x00] * (6 - len(chunk)) for chunk in chunks]
+
+        if mode == 0x04:
+            ecu.dtcs.clear()
+            return [[0x44]]
+
+        if pid is None:
+            return []
+
+        if mode == 0x09:
+            return self._infos(ecu, pid, legacy)
+
+        data = ecu.data(mode, pid, t)
+        if data is None:
+            return []
+        return [[0x40 + mode, pid] + data]
+
+    def _infos(self, ecu: SimulatedECU, pid: int, legacy: bool) -> List[List[int]]:
+        infos = ecu.infos()
+
+        if pid == 0x00:
+            return (
+                [[0x49, 0x00] + _supported_bitmap(ecu.pids(0x09), 0)] if infos else []
+            )
+
+        if pid % 2 == 1 and pid + 1 in infos:
+            return [[0x49, pid, (len(infos[pid + 1]) + 3) // 4]]
+
+        data = infos.get(pid)
+        if data is None:
+            return []
+
+        if not legacy:
+            return [[0x49, pid, 0x01] + data]
+
+        data = [0x00] * (-len(data) % 4) + data
+        return [
+            [0x49, pid, seq + 1] + data[i : i + 4]
+            for seq, i in enumerate(range(0, len(data), 4))
+        ]
+
+    def _format(self, ecu: SimulatedECU, payload: List[int], mode: int) -> List[str]:
+        """Format a message into the lines printed by the adapter."""
+        sep = " " if self.spaces else ""
+
+        def hexs(values: List[int]) -> str:
+            return sep.join(f"{value:02X}" for value in values)
+
+        source = self._response_id(ecu)
+
+        if self.protocol not in CAN_PROTOCOLS:
+            if not self.headers:
+                return [hexs(payload)]
+            if self.protocol in J1850_PROTOCOLS:
+                priority = 0x41 if self.protocol is Protocol.SAE_J1850_PWM else 0x48
+                frame = [priority, 0x6B, source] + payload
+                return [hexs(frame + [ProtocolJ1850.compute_crc(frame)])]
+            if self.protocol is Protocol.ISO_9141_2:
+                frame = [0x48, 0x6B, source] + payload
+            else:
+                frame = [0x80 | len(payload), 0xF1, source] + payload
+            return [hexs(frame + [sum(frame) % 256])]
+
+        if len(payload) <= 7:
+            frames = [[len(payload)] + payload]
+        else:
+            size = len(payload)
+            frames = [[0x10 | (size >> 8), size & 0xFF] + payload[:6]]
+            for sn, i in enumerate(range(6, size, 7), start=1):
+                frames.append([0x20 | (sn & 0x0F)] + payload[i : i + 7])
+
+        if not self.headers and self.can_formatting:
+            if len(frames) == 1:
+                return [hexs(payload)]
+            return [f"{len(payload):03X}"] + [
+                f"{sn & 0x0F:X}:{sep}{hexs(frame[2:] if sn == 0 else frame[1:])}"
+                for sn, frame in enumerate(frames)
+            ]
+
+        if not self.headers:
+            return [hexs(frame) for frame in frames]
+
+        if self._is_29_bit():
+            header = hexs(list(source.to_bytes(4, "big")))
+        else:
+            header = f"{source:03X}"
+        dlc = (
+            [f"{len(frame)}" for frame in frames] if self.dlc else ["" for _ in frames]
+        )
+        return [
+            sep.join(part for part in (header, length, hexs(frame)) if part)
+            for length, frame in zip(dlc, frames)
+        ]
@@ -1,4 +1,5 @@
 from socket import AF_INET, SOCK_STREAM, error as s_error, socket
+from time import perf_counter_ns
 from typing import Optional, Union, Dict, Any
 
 from .transport_base import TransportBase
@@ -69,11 +70,14 @@ class TransportSocket(TransportBase):
 
         lenterm = len(expected_seq)
         buffer = bytearray()
+        self.first_byte_ns = None
         while True:
             chunk = self.socket_conn.recv(1)
             if not chunk:
                 raise RuntimeError("Socket connection closed.")
 
+            if not buffer:
+                self.first_byte_ns = perf_counter_ns()
             buffer += chunk
 
             if buffer[-lenterm:] == expected_seq:
@@ -0,0 +1,66 @@
+"""
+Unit tests for obdii.bench package.
+"""
+import pytest
+
+from obdii.bench import (
+    BenchCase,
+    BenchResult,
+    compare_results,
+    load_results,
+    micro_cases,
+    run_case,
+    save_results,
+)
+from obdii.bench.__main__ import main
+from obdii.bench.runner import format_ns
+
+
+CASES = micro_cases()
+
+
+@pytest.mark.bench
+@pytest.mark.parametrize("case", CASES, ids=[case.name for case in CASES])
+def test_micro_case_runs(case):
+    case.func()
+
+
+class TestRunner:
+    def test_run_case_calibrates_loops(self):
+        result = run_case(BenchCase("noop", lambda: None), repeat=2, min_time=0.001)
+
+        assert result.name == "noop"
+        assert result.repeat == 2
+        assert result.number >= 1
+        assert 0 < result.min_ns <= result.median_ns
+
+    def test_save_load_and_compare(self, tmp_path):
+        path = tmp_path / "baseline.json"
+        baseline = [BenchResult("a", 100.0, 90.0, 10, 3), BenchResult("b", 50.0, 40.0, 10, 3)]
+        save_results(baseline, path)
+
+        loaded = load_results(path)
+        current = [BenchResult("a", 150.0, 140.0, 10, 3), BenchResult("c", 1.0, 1.0, 1, 1)]
+        comparisons = compare_results(loaded, current)
+
+        assert loaded["b"] == baseline[1]
+        assert [(c.name, c.ratio) for c in comparisons] == [("a", 1.5)]
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [(12, "12 ns"), (1_500, "1.50 us"), (2_000_000, "2.00 ms"), (3e9, "3.00 s")],
+    )
+    def test_format_ns(self, value, expected):
+        assert format_ns(value) == expected
+
+
+class TestCommandLine:
+    def test_micro_is_default_and_reports_regressions(self, tmp_path, capsys):
+        path = tmp_path / "results.json"
+        options = ["-k", "command.build", "--repeat", "1", "--min-time", "0.001"]
+
+        assert main([*options, "-o", str(path)]) == 0
+        save_results([BenchResult("command.build", 1e-3, 1e-3, 1, 1)], path)
+
+        assert main(["micro", *options, "-c", str(path)]) == 1
+        assert "REGRESSION" in capsys.readouterr().out
@@ -0,0 +1,133 @@
+"""
+Unit tests for obdii.bench.connect module.
+"""
+import pytest
+
+from obdii import Protocol, commands
+from obdii.bench.connect import (
+    DEFAULT_MIX,
+    VARIANTS,
+    format_report,
+    parse_transport,
+    resolve_commands,
+    run_mix,
+    run_variants,
+)
+from obdii.connection import Connection
+from obdii.modes import ModeAT
+from obdii.protocols.protocol_base import ProtocolBase
+from obdii.transports import TransportSimulated
+from obdii.transports.transport_base import TransportBase
+
+
+class EngineTransport(TransportBase):
+    """Answers engine speed and vehicle speed queries, acknowledges AT commands."""
+
+    ANSWERS = {
+        b"010C": b"7E8 04 41 0C 40 80\r\r>",
+        b"010D": b"7E8 03 41 0D 32\r\r>",
+    }
+
+    def __init__(self) -> None:
+        self.writes = []
+
+    def connect(self, **kwargs) -> None: ...
+
+    def close(self) -> None: ...
+
+    def write_bytes(self, query: bytes) -> None:
+        self.writes.append(query)
+
+    def read_bytes(self) -> bytes:
+        key = self.writes[-1].replace(b' ', b'').strip()
+        if key.startswith(b"AT"):
+            return b"OK\r\r>"
+        return self.ANSWERS.get(key[:4], b"NO DATA\r\r>")
+
+    def is_connected(self) -> bool:
+        return True
+
+
+@pytest.fixture
+def conn():
+    connection = Connection(EngineTransport(), auto_connect=False)
+    connection.protocol = Protocol.ISO_15765_4_CAN
+    connection.protocol_handler = ProtocolBase.get_handler(connection.protocol)
+    return connection
+
+
+class TestHelpers:
+    @pytest.mark.parametrize(
+        ("spec", "expected"),
+        [
+            ("COM5", "COM5"),
+            ("/dev/ttyUSB0", "/dev/ttyUSB0"),
+            ("192.168.0.10:35000", ("192.168.0.10", 35000)),
+        ],
+    )
+    def test_parse_transport(self, spec, expected):
+        assert parse_transport(spec) == expected
+
+    def test_parse_transport_simulated(self):
+        assert isinstance(parse_transport("sim"), TransportSimulated)
+
+    def test_run_mix_simulated(self):
+        with Connection(parse_transport("sim"), log_handler=None) as conn:
+            report = run_mix(conn, resolve_commands(DEFAULT_MIX), max_queries=10)
+
+        assert report.queries == 10
+        assert report.errors == 0
+
+    def test_resolve_commands(self):
+        assert resolve_commands(["ENGINE_SPEED", " vehicle_speed", ""]) == [
+            commands.ENGINE_SPEED,
+            commands.VEHICLE_SPEED,
+        ]
+
+
+class TestRunMix:
+    def test_counts_queries_bytes_and_errors(self, conn):
+        mix = [commands.ENGINE_SPEED, commands.VEHICLE_SPEED, commands.ENGINE_LOAD]
+
+        report = run_mix(conn, mix, duration=10, max_queries=6)
+
+        assert report.queries == 6
+        assert report.errors == 2
+        assert report.bytes_sent == sum(len(q) for q in conn.transport.writes)
+        assert report.bytes_received > 0
+        assert report.queries_per_second > 0
+        assert report.stats.commands["ENGINE_SPEED"].count == 2
+        assert conn._hooks["on_send"] == []
+
+        text = format_report(report)
+        assert "ENGINE_SPEED" in text and "6 queries" in text
+
+    def test_variants_are_applied_and_restored(self, conn):
+        reports = run_variants(
+            conn, [commands.ENGINE_SPEED], list(VARIANTS), duration=10, max_queries=2
+        )
+
+        assert [r.variant for r in reports] == [
+            "default",
+            "early_return",
+            "default x4",
+            "smart_query",
+            "spaces_off",
+            "header_target",
+        ]
+        assert conn.early_return is False and conn.smart_query is False
+        assert b"AT S1\r" in conn.transport.writes
+        assert conn.transport.writes[-1] == b"AT SH 7DF\r"
+
+    def test_smart_query_runs_a_repeated_workload(self, conn):
+        mix = [commands.ENGINE_SPEED, commands.VEHICLE_SPEED]
+
+        baseline, repeated, smart = run_variants(
+            conn, mix, ["smart_query"], duration=10, max_queries=8
+        )
+        writes = conn.transport.writes
+
+        assert repeated.variant == "default x4" and smart.variant == "smart_query"
+        assert repeated.stats.commands["ENGINE_SPEED"].count == 4
+        assert writes[8:16] == [b"01 0C\r"] * 4 + [b"01 0D\r"] * 4
+        assert writes[16:24].count(ModeAT.REPEAT.build()) == 6
@@ -0,0 +1,106 @@
+"""
+Shared fixtures of the unit tests.
+"""
+import pytest
+
+from threading import Event
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from obdii.command import Command
+from obdii.connection import Connection
+from obdii.protocol import Protocol
+from obdii.protocols.protocol_base import ProtocolBase
+from obdii.transports import TransportSimulated
+from obdii.transports.transport_base import TransportBase
+
+
+class ScriptedTransport(TransportBase):
+    """
+    Answers queries with scripted responses and records the written queries.
+
+    Once the scripted responses run out, queries are answered with ``default``,
+    or with their own payload when ``default`` is None.
+    Reads block (up to 2 seconds) while :attr:`release` is cleared.
+    """
+
+    def __init__(self, *responses: bytes, default: Optional[bytes] = b">") -> None:
+        self.responses = list(responses)
+        self.default = default
+        self.connected = True
+        self.writes: List[bytes] = []
+        self.release = Event()
+        self.release.set()
+
+    def connect(self, **kwargs) -> None:
+        self.connected = True
+
+    def close(self) -> None:
+        self.connected = False
+
+    def write_bytes(self, query: bytes) -> None:
+        self.writes.append(query)
+
+    def read_bytes(self) -> bytes:
+        self.release.wait(timeout=2)
+        if self.responses:
+            return self.responses.pop(0)
+        if self.default is None:
+            return self.writes[-1].strip() + b"\r\r>"
+        return self.default
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+
+@pytest.fixture
+def scripted() -> Callable[..., Connection]:
+    """
+    Factory of connections to a :class:`ScriptedTransport`, left uninitialized.
+
+    The protocol is set without negotiation when ``protocol`` is given,
+    other keyword arguments are passed to the connection.
+    """
+    def factory(
+        *responses: bytes,
+        default: Optional[bytes] = b">",
+        protocol: Optional[Protocol] = None,
+        **options,
+    ) -> Connection:
+        conn = Connection(
+            ScriptedTransport(*responses, default=default), auto_connect=False, **options
+        )
+        if protocol is not None:
+            conn.protocol = protocol
+            conn.protocol_handler = ProtocolBase.get_handler(protocol)
+        return conn
+
+    return factory
+
+
+@pytest.fixture
+def simulated() -> Callable[..., Tuple[Connection, List[bytes]]]:
+    """
+    Factory of connected connections to a :class:`~obdii.transports.TransportSimulated`.
+
+    Returns the connection with the list of every query it sent, after sending ``queries``
+    and closing it when ``close`` is set. Other keyword arguments are passed to the connection.
+    """
+    def factory(
+        transport: Optional[TransportSimulated] = None,
+        queries: Iterable[Command] = (),
+        close: bool = False,
+        **options,
+    ) -> Tuple[Connection, List[bytes]]:
+        if transport is None:
+            transport = TransportSimulated()
+        conn = Connection(transport, auto_connect=False, log_handler=None, **options)
+        sent: List[bytes] = []
+        conn.add_hook("on_send", sent.append)
+        conn.connect()
+        for command in queries:
+            conn.query(command)
+        if close:
+            conn.close()
+        return conn, sent
+
+    return factory
@@ -13,6 +13,7 @@ from obdii.protocols.protocol_can import ProtocolCAN
 
 
 HANDLER = ProtocolCAN()
+HEADERLESS = ProtocolCAN(headers=False)
 
 
 class TestProtocolCANSingleFrame:
@@ -65,6 +66,46 @@ class TestProtocolCANMultiFrame:
         assert resp.unparsed == expected
 
 
+class TestProtocolCANHeaderless:
+    """CAN message parsing with headers off (AT H0), spaces on or off."""
+
+    @pytest.mark.parametrize(
+        ("command", "raw", "expected"),
+        [
+            (commands.ENGINE_SPEED, b"41 0C 40 80\r>", [0x40, 0x80]),
+            (commands.ENGINE_SPEED, b"410C4080\r\r>", [0x40, 0x80]),
+            (commands.ENGINE_SPEED, b"010C\r410C4080\r\r>", [0x40, 0x80]),
+            (
+                commands.VIN,
+                b"014\r0: 49 02 01 57 56 57\r1: 5A 5A 5A 31 4A 4D 33\r2: 36 33 39 37 36 00 00\r>",
+                [1, 87, 86, 87, 90, 90, 90, 49, 74, 77, 51, 54, 51, 57, 55, 54, 0, 0],
+            ),
+            (
+                commands.VIN,
+                b"014\r\n0:490201575657\r\n1:5A5A5A314A4D33\r\n2:36333937360000\r\n\r\n>",
+                [1, 87, 86, 87, 90, 90, 90, 49, 74, 77, 51, 54, 51, 57, 55, 54, 0, 0],
+            ),
+        ],
+        ids=["single-frame", "single-frame-no-spaces", "echo", "multi-frame", "multi-frame-no-spaces"],
+    )
+    def test_headerless_parsing(self, protocol_impl, command, raw, expected):
+        resp = protocol_impl(raw, command, Protocol.ISO_15765_4_CAN, HEADERLESS)
+
+        assert resp.unparsed == expected
+        assert list(resp.messages) == [b""]
+
+    def test_headerless_segment_numbers_wrap(self, protocol_impl):
+        data = list(range(2, 0x80))
+        lines = [b"%03X" % (len(data) + 2), b"0:4902" + bytes(data[:4]).hex().upper().encode()]
+        rest = data[4:]
+        for index, start in enumerate(range(0, len(rest), 7), start=1):
+            lines.append(b"%X:" % (index & 0x0F) + bytes(rest[start : start + 7]).hex().upper().encode())
+
+        resp = protocol_impl(b"\r".join(lines) + b"\r>", commands.VIN, Protocol.ISO_15765_4_CAN, HEADERLESS)
+
+        assert resp.unparsed == data
+
+
 class TestProtocolCANMultiECU:
     """Multi-ECU CAN message parsing."""
 
@@ -14,6 +14,7 @@ from obdii.protocols.protocol_j1850 import ProtocolJ1850
 
 
 HANDLER = ProtocolJ1850()
+HEADERLESS = ProtocolJ1850(headers=False)
 
 
 class TestProtocolJ1850SingleFrame:
@@ -86,6 +87,29 @@ class TestProtocolJ1850MultiFrame:
         assert resp.unparsed == expected
 
 
+class TestProtocolJ1850Headerless:
+    """J1850 message parsing with headers off (AT H0), spaces on or off."""
+
+    @pytest.mark.parametrize(
+        ("command", "raw", "expected"),
+        [
+            (commands.ENGINE_SPEED, b"41 0C 0D 48\r>", [0x0D, 0x48]),
+            (commands.ENGINE_SPEED, b"010C\r410C0D48\r\r>", [0x0D, 0x48]),
+            (
+                commands.VIN,
+                b"49 02 02 57 56 57 5A\r49 02 01 00 00 00 31\r>",
+                [0x00, 0x00, 0x00, 0x31, 0x57, 0x56, 0x57, 0x5A],
+            ),
+        ],
+        ids=["single-frame", "echo-no-spaces", "multi-frame"],
+    )
+    def test_headerless_parsing(self, protocol_impl, command, raw, expected):
+        resp = protocol_impl(raw, command, Protocol.SAE_J1850_PWM, HEADERLESS)
+
+        assert resp.unparsed == expected
+        assert list(resp.messages) == [b""]
+
+
 class TestProtocolJ1850MultiECU:
     """Multi-ECU J1850 message parsing."""
 
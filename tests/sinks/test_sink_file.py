@@ -0,0 +1,191 @@
+"""
+Unit tests for obdii.sinks.sink_file and obdii.sinks.sink_base modules.
+"""
+
+import pytest
+
+from csv import reader
+from json import loads
+from threading import Event
+from time import sleep
+from typing import List
+
+from obdii import Protocol, commands
+from obdii.connection import Connection
+from obdii.modes import ModeAT
+from obdii.response import Context, Response
+from obdii.sinks import SinkFile
+from obdii.sinks.sink_base import SinkBase
+from obdii.sinks.sink_file import serialize_value
+from obdii.transports import TransportSimulated
+
+
+def response(command, value, timestamp=1.5):
+    context = Context(command, Protocol.ISO_15765_4_CAN)
+    return Response(context, b"", timestamp=timestamp, value=value)
+
+
+class BlockedSink(SinkBase):
+    """Sink whose writer waits for the test to release it."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.release_writes = Event()
+        self.batches: List[List[Response]] = []
+        self.flushes = 0
+        self.fail = False
+        self.fail_open = 0
+
+    def open(self):
+        if self.fail_open:
+            self.fail_open -= 1
+            raise OSError("read-only file system")
+
+    def write_batch(self, batch):
+        self.release_writes.wait(5)
+        if self.fail:
+            raise OSError("disk full")
+        self.batches.append(batch)
+
+    def flush(self):
+        self.flushes += 1
+
+    def release(self):
+        pass
+
+
+class TestSinkBase:
+    def test_drops_when_queue_full(self):
+        sink = BlockedSink(max_queue=2, batch_size=1)
+        results = [sink.put(response(commands.ENGINE_SPEED, i)) for i in range(6)]
+
+        assert results.count(False) == sink.dropped
+        assert sink.dropped >= 3
+        assert sink.queued <= 2
+
+        sink.release_writes.set()
+        sink.close()
+
+        assert sink.written == 6 - sink.dropped
+        assert sink.queued == 0
+
+    def test_batches_and_final_flush(self):
+        sink = BlockedSink(batch_size=3, flush_interval=60)
+        for i in range(7):
+            sink.put(response(commands.ENGINE_SPEED, i))
+        sink.release_writes.set()
+        sink.close()
+
+        assert [r.value for batch in sink.batches for r in batch] == list(range(7))
+        assert max(len(batch) for batch in sink.batches) <= 3
+        assert sink.flushes >= 1
+        assert not sink.running
+
+    def test_failed_write_counts_dropped(self):
+        sink = BlockedSink()
+        sink.fail = True
+        sink.release_writes.set()
+        sink.put(response(commands.ENGINE_SPEED, 1))
+        sink.close()
+
+        assert sink.dropped == 1
+        assert sink.written == 0
+
+    def test_failed_open_starts_again(self):
+        sink = BlockedSink()
+        sink.fail_open = 1
+        sink.release_writes.set()
+        sink.put(response(commands.ENGINE_SPEED, 1))
+        for _ in range(100):
+            if not sink.running:
+                break
+            sleep(0.01)
+
+        assert not sink.running
+
+        sink.put(response(commands.ENGINE_SPEED, 2))
+        sink.close()
+
+        assert [r.value for batch in sink.batches for r in batch] == [1, 2]
+
+    def test_drops_after_close(self):
+        sink = BlockedSink()
+        sink.release_writes.set()
+        sink.put(response(commands.ENGINE_SPEED, 1))
+        sink.close()
+
+        assert not sink.put(response(commands.ENGINE_SPEED, 2))
+        assert not sink.running
+        assert sink.dropped == 1
+
+        sink.start()
+        assert sink.put(response(commands.ENGINE_SPEED, 3))
+        sink.close()
+
+        assert [r.value for batch in sink.batches for r in batch] == [1, 3]
+
+    def test_ignores_at_responses(self):
+        sink = BlockedSink()
+
+        assert sink.put(response(ModeAT.VERSION_ID, "ELM327 v2.1"))
+        assert not sink.running
+
+
+class TestSinkFile:
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown format"):
+            SinkFile(tmp_path / "out.csv", format="xml")
+
+    def test_serialize_value(self):
+        assert serialize_value((1, [2.5, None])) == [1, [2.5, None]]
+        assert serialize_value(Protocol.ISO_15765_4_CAN) == "ISO_15765_4_CAN"
+        assert serialize_value(b"\x01") == "b'\\x01'"
+
+    def test_csv(self, tmp_path):
+        path = tmp_path / "out.csv"
+        with SinkFile(path) as sink:
+            sink.put(response(commands.ENGINE_SPEED, 1726.0, 10.0))
+            sink.put(response(commands.DTC_OXYGEN_SENSOR_1, (0.45, -3.1), 11.0))
+
+        rows = list(reader(path.open(newline="")))
+
+        assert rows[0] == ["timestamp", "command", "value", "units"]
+        assert rows[1][:3] == ["10.0", "ENGINE_SPEED", "1726.0"]
+        assert rows[2][2] == "[0.45, -3.1]"
+
+    def test_ndjson_appends(self, tmp_path):
+        path = tmp_path / "out.ndjson"
+        for timestamp in (1.0, 2.0):
+            with SinkFile(path) as sink:
+                sink.put(response(commands.VEHICLE_SPEED, 30, timestamp))
+
+        rows = [loads(line) for line in path.read_text().splitlines()]
+
+        assert [row["timestamp"] for row in rows] == [1.0, 2.0]
+        assert rows[0]["command"] == "VEHICLE_SPEED"
+
+    def test_rotation_by_size(self, tmp_path):
+        path = tmp_path / "out.ndjson"
+        with SinkFile(path, max_bytes=1, batch_size=1) as sink:
+            for i in range(3):
+                sink.put(response(commands.VEHICLE_SPEED, i))
+
+        assert len(sink.rotated) == 2
+        assert all(name.endswith(".ndjson") for name in sink.rotated)
+        assert len(list(tmp_path.iterdir())) == 3
+
+    def test_attach_connection(self, tmp_path):
+        path = tmp_path / "out.csv"
+        sink = SinkFile(path)
+
+        with Connection(TransportSimulated(), log_handler=None) as conn:
+            sink.attach(conn)
+            conn.query(commands.VEHICLE_SPEED)
+            conn.query(commands.ENGINE_SPEED)
+            sink.detach(conn)
+            conn.query(commands.VEHICLE_SPEED)
+        sink.close()
+
+        rows = list(reader(path.open(newline="")))
+
+        assert [row[1] for row in rows[1:]] == ["VEHICLE_SPEED", "ENGINE_SPEED"]
@@ -0,0 +1,130 @@
+"""
+Unit tests for obdii.sinks.sink_sqlite module.
+"""
+
+import pytest
+import sqlite3
+
+from time import monotonic, sleep
+
+from obdii import Protocol, commands
+from obdii.command import Command
+from obdii.connection import Connection
+from obdii.mode import Mode
+from obdii.response import Context, Response
+from obdii.sinks import SinkSQLite
+from obdii.sinks.sink_sqlite import split_value
+from obdii.transports import TransportSimulated
+
+
+def response(command, value, timestamp=1.5, messages=None, raw=b""):
+    context = Context(command, Protocol.ISO_15765_4_CAN)
+    return Response(context, raw, timestamp=timestamp, value=value, messages=messages)
+
+
+def samples(path):
+    with sqlite3.connect(path) as db:
+        return db.execute(
+            "SELECT c.name, e.header, s.timestamp, s.value, s.value_text, s.raw"
+            " FROM samples s JOIN commands c ON c.id = s.command_id"
+            " LEFT JOIN ecus e ON e.id = s.ecu_id ORDER BY s.rowid"
+        ).fetchall()
+
+
+def test_split_value():
+    assert split_value(None) == (None, None)
+    assert split_value(12) == (12.0, None)
+    assert split_value(True) == (None, "true")
+    assert split_value((0.45, -3.1)) == (None, "[0.45, -3.1]")
+
+
+def test_wal_and_sessions(tmp_path):
+    path = tmp_path / "obd.db"
+    for label in ("first", "second"):
+        with SinkSQLite(path, label=label) as sink:
+            sink.put(response(commands.VEHICLE_SPEED, 30))
+
+    with sqlite3.connect(path) as db:
+        assert db.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        sessions = db.execute("SELECT id, label FROM sessions").fetchall()
+        rows = db.execute("SELECT session_id FROM samples").fetchall()
+
+    assert sessions == [(1, "first"), (2, "second")]
+    assert rows == [(1,), (2,)]
+    assert sink.session_id == 2
+
+
+def test_one_row_per_ecu(tmp_path):
+    path = tmp_path / "obd.db"
+    messages = {b"7E8": [0x1E], b"7E9": [0x28]}
+    raw = b"7E8 03 41 0D 1E\r7E9 03 41 0D 28\r\r>"
+    with SinkSQLite(path) as sink:
+        sink.put(response(commands.VEHICLE_SPEED, 30, 2.0, messages, raw))
+        sink.put(response(commands.VEHICLE_SPEED, None, 3.0, raw=b"NO DATA\r\r>"))
+
+    assert samples(path) == [
+        ("VEHICLE_SPEED", "7E8", 2.0, 30.0, None, raw),
+        ("VEHICLE_SPEED", "7E9", 2.0, 40.0, None, raw),
+        ("VEHICLE_SPEED", None, 3.0, None, None, b"NO DATA\r\r>"),
+    ]
+
+
+def test_failed_batch_is_rolled_back(tmp_path):
+    path = tmp_path / "obd.db"
+    sink = SinkSQLite(path)
+    sink.open()
+    sink.write_batch([response(commands.VEHICLE_SPEED, 1)])
+
+    with pytest.raises(sqlite3.Error):
+        sink.write_batch(
+            [
+                response(commands.VEHICLE_SPEED, 2),
+                response(commands.VEHICLE_SPEED, 3, timestamp=object()),
+            ]
+        )
+    sink.write_batch([response(commands.VEHICLE_SPEED, 4)])
+    sink.release()
+
+    assert [value for *_, value, _, _ in samples(path)] == [1.0, 4.0]
+
+
+def test_unnamed_commands_are_kept_apart(tmp_path):
+    path = tmp_path / "obd.db"
+    with SinkSQLite(path) as sink:
+        sink.put(response(Command(Mode.REQUEST, 0x0C, 2), 800))
+        sink.put(response(Command(Mode.REQUEST, 0x0D, 1), 30))
+
+    assert [name for name, *_ in samples(path)] == ["010C", "010D"]
+
+
+def test_commits_by_size(tmp_path):
+    path = tmp_path / "obd.db"
+    sink = SinkSQLite(path, transaction_rows=2, flush_interval=60, batch_size=1)
+    sink.start()
+    for i in range(4):
+        sink.put(response(commands.VEHICLE_SPEED, i))
+
+    deadline = monotonic() + 5
+    while sink.written < 4 and monotonic() < deadline:
+        sleep(0.01)
+
+    assert len(samples(path)) == 4
+    sink.close()
+
+
+def test_attach_connection(tmp_path):
+    path = tmp_path / "obd.db"
+    sink = SinkSQLite(path)
+
+    with Connection(TransportSimulated(ecus=2), log_handler=None) as conn:
+        sink.attach(conn)
+        conn.query(commands.VEHICLE_SPEED)
+        sink.detach(conn)
+    sink.close()
+
+    rows = samples(path)
+
+    assert [(name, header) for name, header, *_ in rows] == [
+        ("VEHICLE_SPEED", "7E8"),
+        ("VEHICLE_SPEED", "7E9"),
+    ]
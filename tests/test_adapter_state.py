@@ -0,0 +1,121 @@
+"""
+Unit tests for obdii.adapter_state module.
+"""
+
+import pytest
+
+from obdii import at_commands, commands
+from obdii.adapter_state import AdapterState, _parse
+from obdii.targeting import EcuAddress, EcuTargeting
+from obdii.transports import TransportSimulated
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        (b"AT E0\r", ("echo", "0", ())),
+        (b"AT AT2\r", ("adaptive_timing", "2", ())),
+        (b"AT SH 7E0\r", ("header", "7E0", ())),
+        (b"AT SH 18 DA 10 F1\r", ("header", "18DA10F1", ())),
+        (b"AT ST 32\r", ("timeout", "32", ())),
+        (b"AT SP 6\r", ("protocol", "6", ())),
+        (b"AT SP 0\r", ("protocol", "", ("protocol",))),
+        (b"AT CRA\r", ("can_receive_address", "", ("id_filter", "id_mask", "receive_address"))),
+        (b"AT CF 7E8\r", ("id_filter", "7E8", ("can_receive_address",))),
+        (b"AT FC SM 1\r", ("flow_control_mode", "1", ())),
+        (b"AT Z\r", ("*", "", ())),
+        (b"AT WS\r", ("*", "", ())),
+        (b"AT D\r", ("*", "", ())),
+        (b"AT DPN\r", (None, "", ())),
+        (b"AT I\r", (None, "", ())),
+    ],
+)
+def test_parse(query, expected):
+    assert _parse(query) == expected
+
+
+class TestAdapterState:
+    def test_init_sequence_is_mirrored(self, simulated):
+        state = AdapterState()
+        simulated(adapter_state=state)
+
+        assert state.settings == {"echo": "0", "headers": "1", "spaces": "1"}
+
+    def test_redundant_commands_are_skipped(self, simulated):
+        state = AdapterState()
+        conn, sent = simulated(adapter_state=state)
+        del sent[:]
+
+        with conn:
+            response = conn.query(at_commands.HEADERS_ON)
+            conn.query(at_commands.SET_TIMEOUT("32"))
+            conn.query(at_commands.SET_TIMEOUT("32"))
+            conn.query(at_commands.SET_TIMEOUT("40"))
+            conn.query(at_commands.VERSION_ID)
+            conn.query(at_commands.VERSION_ID)
+
+        assert response.value == "OK"
+        assert response.raw == b"OK"
+        assert sent == [b"AT ST 32\r", b"AT ST 40\r", b"AT I\r", b"AT I\r"]
+        assert state.get("timeout") == "40"
+        assert state.skipped == 2
+
+    @pytest.mark.parametrize("reset", [at_commands.RESET, at_commands.RESET_SOFT, at_commands.RESET_DEFAULTS])
+    def test_reset_invalidates(self, simulated, reset):
+        state = AdapterState()
+        conn, sent = simulated(adapter_state=state)
+
+        with conn:
+            conn.query(reset)
+            conn.query(at_commands.ECHO_OFF)
+
+        assert sent[-2:] == [reset.build(), b"AT E0\r"]
+        assert state.settings == {"echo": "0"}
+
+    def test_rejected_command_is_not_mirrored(self, simulated):
+        state = AdapterState()
+        conn, sent = simulated(TransportSimulated(unsupported={"ST"}), adapter_state=state)
+
+        with conn:
+            conn.query(at_commands.SET_TIMEOUT("32"))
+            conn.query(at_commands.SET_TIMEOUT("32"))
+
+        assert sent[-2:] == [b"AT ST 32\r", b"AT ST 32\r"]
+        assert state.get("timeout") is None
+
+    def test_receive_address_overrides_filters(self, simulated):
+        state = AdapterState()
+        state.settings.update(id_filter="7E8", id_mask="7FF")
+        conn, _ = simulated(adapter_state=state)
+
+        with conn:
+            conn.query(at_commands.SET_ID_FILTER("7E8"))
+            conn.query(at_commands.SET_CAN_ADDR("7E9"))
+
+        assert state.get("can_receive_address") == "7E9"
+        assert state.get("id_filter") is None
+
+    def test_connect_clears(self, simulated):
+        state = AdapterState()
+        state.settings["timeout"] = "32"
+        conn, sent = simulated(adapter_state=state)
+
+        with conn:
+            conn.query(at_commands.SET_TIMEOUT("32"))
+
+        assert sent[-1] == b"AT ST 32\r"
+
+    def test_header_switches(self, simulated):
+        state = AdapterState()
+        conn, sent = simulated(TransportSimulated(ecus=2), adapter_state=state)
+        engine = EcuAddress("7E0", "7E8")
+
+        with conn:
+            targeting = EcuTargeting(conn)
+            targeting.select(engine)
+            targeting.current = None
+            targeting.select(engine)
+            response = conn.query(commands.VEHICLE_SPEED)
+
+        assert sent.count(b"AT SH 7E0\r") == 1
+        assert list(response.messages) == [b"7E8"]
@@ -0,0 +1,205 @@
+"""
+Unit tests for obdii.archive module.
+"""
+
+import pytest
+
+from threading import Event
+
+from obdii import Protocol, commands
+from obdii.archive import (
+    CHUNK_HEADER,
+    EXTENSION,
+    ArchiveReader,
+    ArchiveWriter,
+)
+from obdii.command import Command
+from obdii.connection import Connection
+from obdii.modes import ModeAT
+from obdii.response import Context, Response
+from obdii.transports import TransportSimulated
+
+
+def response(command, value, timestamp=1.5):
+    context = Context(command, Protocol.ISO_15765_4_CAN)
+    return Response(context, b"", timestamp=timestamp, value=value)
+
+
+def fill(directory, rows=100, codec="zlib", chunk_rows=10):
+    with ArchiveWriter(directory, codec=codec, chunk_rows=chunk_rows) as writer:
+        for i in range(rows):
+            writer.append(commands.ENGINE_SPEED, i * 1000, 800.0 + i)
+
+
+class TestWriter:
+    def test_unknown_codec(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown codec"):
+            ArchiveWriter(tmp_path, codec="zstd")
+
+    def test_one_chunk_every_chunk_rows(self, tmp_path):
+        fill(tmp_path, rows=25, chunk_rows=10)
+
+        with ArchiveReader(tmp_path) as reader:
+            index = reader.index("ENGINE_SPEED")
+
+        assert [entry.rows for entry in index] == [10, 10, 5]
+        assert [(entry.first, entry.last) for entry in index][1] == (10_000, 19_000)
+
+    def test_appends_to_existing_files(self, tmp_path):
+        fill(tmp_path, rows=10)
+        with ArchiveWriter(tmp_path) as writer:
+            writer.append(commands.ENGINE_SPEED, 50_000, 1.0)
+
+        with ArchiveReader(tmp_path) as reader:
+            assert len(reader.read("ENGINE_SPEED").timestamps) == 11
+
+    def test_discards_incomplete_chunk(self, tmp_path):
+        fill(tmp_path, rows=20)
+        path = tmp_path / f"ENGINE_SPEED{EXTENSION}"
+        with open(path, "ab") as file:
+            file.write(CHUNK_HEADER.pack(0, 0, 1, 500, 1, 0) + b"\x00" * 10)
+
+        with ArchiveReader(tmp_path) as reader:
+            assert len(reader.index("ENGINE_SPEED")) == 2
+
+        with ArchiveWriter(tmp_path) as writer:
+            writer.append(commands.ENGINE_SPEED, 99_000, 1.0)
+
+        with ArchiveReader(tmp_path) as reader:
+            assert reader.read("ENGINE_SPEED").timestamps[-1] == 99_000
+
+    def test_width_mismatch(self, tmp_path):
+        fill(tmp_path, rows=1)
+        command = Command(0x01, 0x0C, 4, units=["rpm", "rpm"])
+        command.name = "ENGINE_SPEED"
+
+        writer = ArchiveWriter(tmp_path)
+        writer.append(command, 1, (1.0, 2.0))
+
+        with pytest.raises(ValueError, match="values per row"):
+            writer.flush()
+
+        writer.append(command, 2, (1.0, 2.0))
+        writer.close()
+
+        assert writer.dropped == 2
+
+    def test_unnamed_commands_are_kept_apart(self, tmp_path):
+        with ArchiveWriter(tmp_path) as writer:
+            writer.append(Command(0x01, 0x0C, 2), 1, 800.0)
+            writer.append(Command(0x01, 0x0D, 1), 1, 50.0)
+
+        with ArchiveReader(tmp_path) as reader:
+            assert reader.commands() == ["010C", "010D"]
+            assert list(reader.read(Command(0x01, 0x0D, 1)).values) == [50.0]
+
+    def test_drops_chunks_when_behind(self, tmp_path, mocker):
+        release = Event()
+        encode = mocker.patch(
+            "obdii.archive.encode_chunk", side_effect=lambda *_: release.wait(5) and b""
+        )
+
+        writer = ArchiveWriter(tmp_path, chunk_rows=1, max_pending=1)
+        for i in range(4):
+            writer.append(commands.ENGINE_SPEED, i, 1.0)
+        release.set()
+        writer.close()
+
+        assert writer.dropped + encode.call_count == 4
+        assert writer.dropped >= 2
+
+    def test_ignores_at_responses(self, tmp_path):
+        with ArchiveWriter(tmp_path) as writer:
+            writer.append_response(response(ModeAT.VERSION_ID, "ELM327 v2.1"))
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestReader:
+    @pytest.mark.parametrize("codec", ["none", "zlib", "lzma"])
+    def test_round_trip(self, tmp_path, codec):
+        fill(tmp_path, rows=35, codec=codec)
+
+        with ArchiveReader(tmp_path) as reader:
+            rows = reader.read(commands.ENGINE_SPEED)
+
+        assert list(rows.timestamps) == [i * 1000 for i in range(35)]
+        assert list(rows.values) == [800.0 + i for i in range(35)]
+        assert all(rows.validity)
+
+    def test_time_range(self, tmp_path):
+        fill(tmp_path, rows=100)
+
+        with ArchiveReader(tmp_path) as reader:
+            rows = reader.read("ENGINE_SPEED", start=15_000, end=42_500)
+            assert reader.span("ENGINE_SPEED") == (0, 99_000)
+
+        assert list(rows.timestamps) == [i * 1000 for i in range(15, 43)]
+
+    def test_range_outside(self, tmp_path):
+        fill(tmp_path, rows=10)
+
+        with ArchiveReader(tmp_path) as reader:
+            assert len(reader.read("ENGINE_SPEED", start=10**9).timestamps) == 0
+
+    def test_multi_valued_and_missing(self, tmp_path):
+        with ArchiveWriter(tmp_path) as writer:
+            writer.append(commands.DTC_OXYGEN_SENSOR_1, 1, (0.45, -3.1))
+            writer.append(commands.DTC_OXYGEN_SENSOR_1, 2, None)
+
+        with ArchiveReader(tmp_path) as reader:
+            rows = reader.read(commands.DTC_OXYGEN_SENSOR_1)
+
+        assert rows.width == 2
+        assert list(rows.values[:2]) == [0.45, -3.1]
+        assert list(rows.validity) == [1, 0]
+
+    def test_corrupted_chunk(self, tmp_path):
+        fill(tmp_path, rows=10, codec="none")
+        path = tmp_path / f"ENGINE_SPEED{EXTENSION}"
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        with ArchiveReader(tmp_path) as reader:
+            with pytest.raises(ValueError, match="Corrupted"):
+                reader.read("ENGINE_SPEED")
+
+    def test_unknown_command(self, tmp_path):
+        fill(tmp_path, rows=1)
+
+        with ArchiveReader(tmp_path) as reader:
+            with pytest.raises(KeyError, match="VEHICLE_SPEED"):
+                reader.read("VEHICLE_SPEED")
+
+    def test_refresh_sees_live_appends(self, tmp_path):
+        writer = ArchiveWriter(tmp_path, chunk_rows=2)
+        writer.append(commands.ENGINE_SPEED, 1, 1.0)
+        writer.flush()
+
+        with ArchiveReader(tmp_path) as reader:
+            assert reader.commands() == ["ENGINE_SPEED"]
+
+            writer.append(commands.VEHICLE_SPEED, 2, 30.0)
+            writer.append(commands.ENGINE_SPEED, 3, 2.0)
+            writer.flush()
+            reader.refresh()
+
+            assert reader.commands() == ["ENGINE_SPEED", "VEHICLE_SPEED"]
+            assert list(reader.read("ENGINE_SPEED").values) == [1.0, 2.0]
+
+
+def test_attach_connection(tmp_path):
+    writer = ArchiveWriter(tmp_path)
+
+    with Connection(TransportSimulated(), log_handler=None) as conn:
+        writer.attach(conn)
+        for _ in range(3):
+            conn.query(commands.VEHICLE_SPEED)
+        writer.detach(conn)
+        conn.query(commands.VEHICLE_SPEED)
+    writer.close()
+
+    with ArchiveReader(tmp_path) as reader:
+        assert reader.commands() == ["VEHICLE_SPEED"]
+        assert len(reader.read("VEHICLE_SPEED").timestamps) == 3
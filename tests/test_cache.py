@@ -0,0 +1,152 @@
+"""
+Unit tests for obdii.cache module.
+"""
+import pytest
+
+from obdii import Context, Protocol, Response, commands
+from obdii.cache import SESSION, ResponseCache
+from obdii.transports import TransportSimulated
+from obdii.transports.transport_simulated import SimulatedECU
+
+
+def make_response(command, value=1) -> Response:
+    return Response(Context(command, Protocol.ISO_15765_4_CAN), b"", value=value)
+
+
+class TestResponseCachePolicies:
+    def test_static_commands_are_cached_for_session(self):
+        cache = ResponseCache()
+
+        assert cache.ttl(commands.VIN) == SESSION
+        assert cache.ttl(commands.SUPPORTED_PIDS_A) == SESSION
+        assert cache.ttl(commands.ENGINE_SPEED) == 0
+
+    def test_user_policies_override_defaults(self):
+        cache = ResponseCache({commands.VIN: 0, commands.ENGINE_SPEED: 0.5})
+
+        assert cache.ttl(commands.VIN) == 0
+        assert cache.ttl(commands.ENGINE_SPEED) == 0.5
+
+
+class TestResponseCacheLookup:
+    def test_hit_and_miss_are_counted(self):
+        cache = ResponseCache()
+        response = make_response(commands.VIN)
+
+        assert cache.get(commands.VIN) is None
+        cache.put(commands.VIN, response)
+
+        assert cache.get(commands.VIN) is response
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+        assert stats.hit_ratio == 0.5
+
+    def test_uncacheable_commands_are_ignored(self):
+        cache = ResponseCache()
+
+        cache.put(commands.ENGINE_SPEED, make_response(commands.ENGINE_SPEED))
+
+        assert cache.get(commands.ENGINE_SPEED) is None
+        assert len(cache) == 0
+        assert cache.stats().misses == 0
+
+    def test_expired_entries_miss(self, mocker):
+        cache = ResponseCache({commands.ENGINE_SPEED: 0.1})
+        clock = mocker.patch("obdii.cache.monotonic", return_value=10.0)
+
+        cache.put(commands.ENGINE_SPEED, make_response(commands.ENGINE_SPEED))
+        clock.return_value = 10.05
+        assert cache.get(commands.ENGINE_SPEED) is not None
+
+        clock.return_value = 10.2
+        assert cache.get(commands.ENGINE_SPEED) is None
+
+    def test_empty_responses_are_not_cached(self):
+        cache = ResponseCache()
+
+        cache.put(commands.VIN, make_response(commands.VIN, value=None))
+
+        assert len(cache) == 0
+
+
+class TestResponseCacheInvalidation:
+    def test_invalidate_single_and_all(self):
+        cache = ResponseCache()
+        cache.put(commands.VIN, make_response(commands.VIN))
+        cache.put(commands.CVN, make_response(commands.CVN))
+
+        cache.invalidate(commands.VIN)
+        assert cache.get(commands.VIN) is None
+        assert cache.get(commands.CVN) is not None
+
+        cache.invalidate()
+        assert len(cache) == 0
+
+    def test_clear_dtc_drops_dynamic_entries(self):
+        cache = ResponseCache({commands.ENGINE_COOLANT_TEMP: 60})
+        cache.put(commands.VIN, make_response(commands.VIN))
+        cache.put(commands.ENGINE_COOLANT_TEMP, make_response(commands.ENGINE_COOLANT_TEMP))
+
+        cache.put(commands.CLEAR_DTC, make_response(commands.CLEAR_DTC))
+
+        assert cache.get(commands.VIN) is not None
+        assert cache.get(commands.ENGINE_COOLANT_TEMP) is None
+
+    def test_reset_stats(self):
+        cache = ResponseCache()
+        cache.get(commands.VIN)
+
+        cache.reset_stats()
+
+        assert cache.stats().misses == 0
+
+
+class TestConnectionCache:
+    def test_query_served_from_cache(self, mocker, scripted):
+        cache = ResponseCache()
+        conn = scripted(cache=cache)
+
+        mocker.patch.object(
+            conn, "wait_for_response", return_value=make_response(commands.VIN)
+        )
+
+        first = conn.query(commands.VIN)
+        second = conn.query(commands.VIN)
+
+        assert first is second
+        assert conn.transport.writes == [commands.VIN.build()]
+        assert cache.stats().hits == 1
+
+    @pytest.mark.parametrize("thread_safe", [False, True])
+    def test_dynamic_commands_always_queried(self, mocker, scripted, thread_safe):
+        conn = scripted(thread_safe=thread_safe, cache=ResponseCache())
+
+        mocker.patch.object(
+            conn, "wait_for_response", return_value=make_response(commands.ENGINE_SPEED)
+        )
+
+        conn.query(commands.ENGINE_SPEED)
+        conn.query(commands.ENGINE_SPEED)
+        transport = conn.transport
+        conn.close()
+
+        assert len(transport.writes) == 2
+
+    def test_invalidated_on_connect_and_close(self, simulated):
+        cache = ResponseCache()
+        first, _ = simulated(
+            TransportSimulated(ecus=[SimulatedECU(vin="VINAAAAAAAAAAAAA1")]), cache=cache
+        )
+        with first:
+            first.query(commands.VIN)
+            assert len(cache) == 1
+        assert len(cache) == 0
+
+        cache.put(commands.VIN, make_response(commands.VIN, "VINAAAAAAAAAAAAA1"))
+        second, _ = simulated(
+            TransportSimulated(ecus=[SimulatedECU(vin="VINBBBBBBBBBBBBB2")]), cache=cache
+        )
+        with second:
+            vin = second.query(commands.VIN)
+
+        assert bytes(vin.unparsed).endswith(b"VINBBBBBBBBBBBBB2")
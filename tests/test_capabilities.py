@@ -0,0 +1,142 @@
+"""
+Unit tests for obdii.capabilities module.
+"""
+
+import pytest
+
+from obdii.capabilities import Capabilities, CapabilityStore, parse_version
+from obdii.transports import TransportSimulated
+
+
+@pytest.mark.parametrize(
+    ("identity", "expected"),
+    [
+        ("ELM327 v2.1", (2, 1)),
+        ("ELM327 v1.4b", (1, 4)),
+        ("ELM327 v1.5", (1, 5)),
+        ("OBDLink", (0, 0)),
+    ],
+)
+def test_parse_version(identity, expected):
+    assert parse_version(identity) == expected
+
+
+class TestProbe:
+    def test_genuine(self, simulated):
+        conn, sent = simulated(
+            TransportSimulated(version="ELM327 v2.3"), probe=True, close=True
+        )
+        capabilities = conn.capabilities
+
+        assert capabilities.identity == "ELM327 v2.3"
+        assert capabilities.version == (2, 3)
+        assert not capabilities.clone
+        assert capabilities.unsupported == []
+        assert capabilities.early_return is True
+        assert capabilities.confirmation_off is True
+        assert capabilities.baudrate_switch is True
+        assert conn.early_return is True
+        assert sent[-2:] == [b"01 00 1\r", b"AT C0\r"]
+
+    def test_confirmation_requires_v2_3(self, simulated):
+        conn, sent = simulated(
+            TransportSimulated(version="ELM327 v2.1"), probe=True, close=True
+        )
+
+        assert conn.capabilities.confirmation_off is False
+        assert b"AT C0\r" not in sent
+
+    def test_clone_disables_early_return(self, simulated):
+        conn, sent = simulated(
+            TransportSimulated(version="ELM327 v1.5", unsupported={"IGN", "CRA"}),
+            early_return=True,
+            probe=True,
+            close=True,
+        )
+        capabilities = conn.capabilities
+
+        assert capabilities.clone
+        assert capabilities.unsupported == ["CRA", "IGN"]
+        assert capabilities.reported_version == (1, 5)
+        assert capabilities.version == (1, 0)
+        assert capabilities.early_return is False
+        assert capabilities.baudrate_switch is False
+        assert conn.early_return is False
+        assert b"01 00 1\r" not in sent
+
+    def test_clone_version_string(self, simulated):
+        conn, _ = simulated(TransportSimulated(version="ELM327 v1.5"), probe=True, close=True)
+
+        assert conn.capabilities.clone
+        assert conn.capabilities.version == (1, 4)
+
+    def test_missing_newer_feature_is_not_a_clone(self, simulated):
+        conn, _ = simulated(
+            TransportSimulated(version="ELM327 v1.3", unsupported={"IGN", "C"}),
+            probe=True,
+            close=True,
+        )
+
+        assert not conn.capabilities.clone
+        assert conn.capabilities.version == (1, 3)
+        assert conn.capabilities.early_return is True
+
+    def test_stn(self, simulated):
+        conn, sent = simulated(
+            TransportSimulated(version="ELM327 v1.4b", stn="STN1110 v4.2.1"),
+            probe=True,
+            close=True,
+        )
+
+        assert b"STI\r" in sent
+        assert conn.stats.snapshot().commands["STN_ID"].count == 1
+        assert conn.capabilities.stn == "STN1110 v4.2.1"
+        assert not conn.capabilities.clone
+        assert conn.early_return is True
+
+    def test_early_return_inconclusive_without_vehicle(self, simulated):
+        conn, _ = simulated(TransportSimulated(ecus=[]), probe=True, close=True)
+
+        assert conn.capabilities.early_return is None
+        assert conn.early_return is False
+
+
+class TestCapabilityStore:
+    def test_round_trip(self, tmp_path):
+        store = CapabilityStore(tmp_path / "adapters.json")
+        capabilities = Capabilities(
+            "ELM327 v1.5", reported_version=(1, 5), version=(1, 4), clone=True
+        )
+        store.put(capabilities)
+
+        assert store.get(capabilities.key) == capabilities
+        assert store.get("unknown") is None
+
+    def test_known_adapter_skips_feature_tests(self, simulated, tmp_path):
+        store = CapabilityStore(tmp_path / "cache" / "adapters.json")
+        first, first_sent = simulated(capability_store=store, probe=True, close=True)
+        second, second_sent = simulated(capability_store=store, probe=True, close=True)
+
+        assert b"AT IGN\r" in first_sent
+        assert b"AT IGN\r" not in second_sent
+        assert b"01 00 1\r" not in second_sent
+        assert second.capabilities == first.capabilities
+        assert second.early_return is True
+
+    def test_inconclusive_early_return_is_tested_again(self, simulated, tmp_path):
+        store = CapabilityStore(tmp_path / "adapters.json")
+        simulated(TransportSimulated(ecus=[]), capability_store=store, probe=True, close=True)
+        conn, sent = simulated(capability_store=store, probe=True, close=True)
+
+        assert b"AT IGN\r" not in sent
+        assert b"01 00 1\r" in sent
+        assert conn.capabilities.early_return is True
+
+    def test_unreadable_file_is_ignored(self, simulated, tmp_path):
+        path = tmp_path / "adapters.json"
+        path.write_text("{")
+
+        conn, _ = simulated(capability_store=CapabilityStore(path), probe=True, close=True)
+
+        assert conn.capabilities.early_return is True
+        assert CapabilityStore(path).get(conn.capabilities.key) == conn.capabilities
@@ -0,0 +1,164 @@
+"""
+Unit tests for obdii.columnar module.
+"""
+
+import pytest
+
+from obdii import Protocol, commands
+from obdii.columnar import Column, ColumnStore, value_width
+from obdii.command import Command
+from obdii.connection import Connection
+from obdii.mode import Mode
+from obdii.response import Context, Response
+from obdii.transports import TransportSimulated
+
+
+def response(command, value, timestamp=1.5):
+    context = Context(command, Protocol.ISO_15765_4_CAN)
+    return Response(context, b"", timestamp=timestamp, value=value)
+
+
+class TestColumn:
+    def test_value_width(self):
+        assert value_width(commands.ENGINE_SPEED) == 1
+        assert value_width(commands.DTC_OXYGEN_SENSOR_1) == 2
+
+    def test_chunked_growth(self):
+        column = Column("ENGINE_SPEED", chunk_size=4)
+        for i in range(10):
+            column.append(i, float(i))
+
+        chunks = list(column.chunks())
+
+        assert len(column) == 10
+        assert [len(timestamps) for timestamps, _, _ in chunks] == [4, 4, 2]
+        assert list(chunks[2][1].cast('B').cast('d')) == [8.0, 9.0]
+        assert column.nbytes == 3 * 4 * 17
+
+    def test_missing_values(self):
+        column = Column("ENGINE_SPEED")
+        column.append(1, 800.0)
+        column.append(2, None)
+        column.append(3, "N/A")
+
+        _, values, validity = next(column.chunks())
+
+        assert list(validity) == [1, 0, 0]
+        assert values[0] == 800.0
+
+    def test_multi_valued(self):
+        column = Column("DTC_OXYGEN_SENSOR_1", width=2)
+        column.append(1, (0.45, -3.1))
+        column.append(2, 0.45)
+
+        _, values, validity = next(column.chunks())
+
+        assert list(values[:2]) == [0.45, -3.1]
+        assert list(validity) == [1, 0]
+
+
+class TestNumpyExport:
+    np = pytest.importorskip("numpy")
+
+    def test_single_chunk_is_zero_copy(self):
+        column = Column("ENGINE_SPEED", chunk_size=8)
+        column.append(1, 800.0)
+        column.append(2, 900.0)
+
+        timestamps, values, validity = column.to_numpy()
+        column.append(3, 1000.0)
+
+        assert timestamps.tolist() == [1, 2]
+        assert not values.flags.owndata
+        assert validity.dtype == bool
+
+    def test_multiple_chunks_and_width(self):
+        column = Column("DTC_OXYGEN_SENSOR_1", width=2, chunk_size=2)
+        for i in range(3):
+            column.append(i, (i, -i))
+
+        timestamps, values, validity = column.to_numpy()
+
+        assert timestamps.tolist() == [0, 1, 2]
+        assert values.shape == (3, 2)
+        assert values[2].tolist() == [2.0, -2.0]
+        assert validity.all()
+
+    def test_empty(self):
+        timestamps, values, validity = Column("ENGINE_SPEED").to_numpy()
+
+        assert len(timestamps) == len(values) == len(validity) == 0
+
+
+class TestColumnStore:
+    def test_append_and_lookup(self):
+        store = ColumnStore()
+        store.append(response(commands.ENGINE_SPEED, 800.0, timestamp=2.0))
+        store.append(response(commands.ENGINE_SPEED, None))
+        store.append(response(commands.VIN, None))
+
+        column = store[commands.ENGINE_SPEED]
+        timestamps, values, validity = next(column.chunks())
+
+        assert "ENGINE_SPEED" in store
+        assert timestamps[0] == 2_000_000_000
+        assert list(validity) == [1, 0]
+        assert len(store) == 2
+
+    def test_unnamed_commands_are_kept_apart(self):
+        store = ColumnStore()
+        store.append(response(Command(Mode.REQUEST, 0x0C, 2), 800.0))
+        store.append(response(Command(Mode.REQUEST, 0x0D, 1), 50.0))
+
+        assert list(store.columns()) == ["010C", "010D"]
+        assert len(store[Command(Mode.REQUEST, 0x0D, 1)]) == 1
+
+    def test_ignores_at_commands(self):
+        from obdii.modes import ModeAT
+
+        store = ColumnStore()
+        store.append(response(ModeAT.VERSION_ID, "ELM327 v2.1"))
+
+        assert len(store) == 0
+
+    def test_attach_to_connection(self):
+        store = ColumnStore()
+
+        with Connection(TransportSimulated(), log_handler=None) as conn:
+            store.attach(conn)
+            for _ in range(5):
+                conn.query(commands.ENGINE_SPEED)
+            store.detach(conn)
+            conn.query(commands.ENGINE_SPEED)
+
+        assert list(store.columns()) == ["ENGINE_SPEED"]
+        assert len(store["ENGINE_SPEED"]) == 5
+
+
+class TestArrowExport:
+    pa = pytest.importorskip("pyarrow")
+
+    def test_to_arrow_nulls(self):
+        column = Column("ENGINE_SPEED")
+        column.append(1, 800.0)
+        column.append(2, None)
+
+        table = column.to_arrow()
+
+        assert table.column_names == ["timestamp", "ENGINE_SPEED"]
+        assert table.column("ENGINE_SPEED").to_pylist() == [800.0, None]
+
+    def test_write_parquet(self, tmp_path):
+        from pyarrow import parquet
+
+        store = ColumnStore()
+        store.append(response(commands.DTC_OXYGEN_SENSOR_1, (0.5, 1.0)))
+
+        (path,) = store.write_parquet(tmp_path)
+        table = parquet.read_table(path)
+
+        assert table.column_names == [
+            "timestamp",
+            "DTC_OXYGEN_SENSOR_1_0",
+            "DTC_OXYGEN_SENSOR_1_1",
+        ]
@@ -79,6 +79,19 @@ class TestCommandEquality:
         assert hash(simple_command) != hash(other)
 
 
+class TestCommandLabel:
+    """Test Command.label."""
+
+    def test_label_of_named_command(self):
+        class Commands:
+            ENGINE_SPEED = Command(mode=Mode.REQUEST, pid=0x0C)
+
+        assert Commands.ENGINE_SPEED.label == "ENGINE_SPEED"
+
+    def test_label_of_unnamed_command(self, simple_command):
+        assert simple_command.label == "010C"
+
+
 class TestCommandFormatting:
     """Test Command formatting via __call__."""
 
@@ -159,4 +172,20 @@ class TestCommandBuild:
     def test_build_early_return_at_mode_ignored(self):
         cmd = Command(mode=Mode.AT, pid='Z', expected_bytes=10)
         # AT commands shouldn't have return digit
-        assert cmd.build(early_return=True) == b"AT Z\r"
\ No newline at end of file
+        assert cmd.build(early_return=True) == b"AT Z\r"
+
+    @pytest.mark.parametrize(
+        ("expected_bytes_val", "responses", "early_return", "expected_suffix"),
+        [
+            (4, 2, True, b" 2"),
+            (None, 3, True, b" 3"),
+            (4, 2, False, b''),
+            (4, 16, True, b''),
+        ],
+        ids=["overrides_bytes", "without_bytes", "false_flag", "too_many"]
+    )
+    def test_build_early_return_responses(self, expected_bytes_val, responses, early_return, expected_suffix):
+        cmd = Command(mode=Mode.REQUEST, pid=0x01, expected_bytes=expected_bytes_val)
+        result = cmd.build(early_return=early_return, responses=responses)
+
+        assert result == b"01 01" + expected_suffix + b'\r'
\ No newline at end of file
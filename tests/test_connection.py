@@ -3,8 +3,10 @@ Unit tests for obdii.connection module.
 """
 import pytest
 
+from threading import Barrier, Event, Thread
 from typing import List, Tuple
 
+from obdii import commands
 from obdii.command import Command
 from obdii.connection import Connection
 from obdii.mode import Mode
@@ -13,7 +15,7 @@ from obdii.protocol import Protocol
 from obdii.protocols.protocol_base import ProtocolBase
 from obdii.response import Context, Response
 from obdii.transports.transport_base import TransportBase
-from obdii.transports import TransportSerial, TransportSocket
+from obdii.transports import TransportSerial, TransportSimulated, TransportSocket
 
 
 class FakeTransport(TransportBase):
@@ -158,6 +160,146 @@ class TestQueryBehavior:
         assert ft.writes == [expected_first, expected_second]
 
 
+class TestThreadSafeQuery:
+    """Serialized worker queue and in-flight coalescing when thread_safe is enabled."""
+
+    def test_concurrent_identical_commands_share_response(self, mocker):
+        ft = FakeTransport()
+        ft.connected = True
+        conn = Connection(ft, auto_connect=False, thread_safe=True)
+
+        release = Event()
+        calls: List[Command] = []
+
+        def slow_query(cmd: Command):
+            calls.append(cmd)
+            release.wait(timeout=2)
+            return Response(Context(cmd, Protocol.AUTO), b"OK\r>")
+
+        mocker.patch.object(conn, "_query", side_effect=slow_query)
+        n_threads = 4
+        submitted = Barrier(n_threads + 1, timeout=2)
+        submit = conn._submit
+
+        def counting_submit(cmd: Command):
+            future = submit(cmd)
+            submitted.wait()
+            return future
+
+        mocker.patch.object(conn, "_submit", side_effect=counting_submit)
+
+        cmd = Command(Mode.REQUEST, 0x0C, 2)
+        barrier = Barrier(n_threads)
+        results: List[Response] = []
+
+        def worker():
+            barrier.wait()
+            results.append(conn.query(cmd))
+
+        threads = [Thread(target=worker) for _ in range(n_threads)]
+        for thread in threads:
+            thread.start()
+
+        # Let every thread join the in-flight request before answering it
+        submitted.wait()
+        release.set()
+        for thread in threads:
+            thread.join(timeout=2)
+
+        conn.close()
+
+        assert len(results) == n_threads
+        assert all(r is results[0] for r in results)
+        assert calls == [cmd]
+        assert conn._in_flight == {}
+
+    def test_clear_dtc_is_never_shared(self, mocker):
+        ft = FakeTransport()
+        ft.connected = True
+        conn = Connection(ft, auto_connect=False, thread_safe=True)
+
+        release = Event()
+        calls: List[Command] = []
+
+        def slow_query(cmd: Command):
+            calls.append(cmd)
+            release.wait(timeout=2)
+            return Response(Context(cmd, Protocol.AUTO), b"44\r>")
+
+        mocker.patch.object(conn, "_query", side_effect=slow_query)
+
+        first = conn._submit(commands.CLEAR_DTC)
+        second = conn._submit(commands.CLEAR_DTC)
+        release.set()
+
+        assert first is not second
+        assert first.result(timeout=2) is not second.result(timeout=2)
+        assert calls == [commands.CLEAR_DTC, commands.CLEAR_DTC]
+        conn.close()
+
+    def test_worker_stopped_from_itself_does_not_stop_the_next(self, mocker):
+        ft = FakeTransport()
+        ft.connected = True
+        conn = Connection(ft, auto_connect=False, thread_safe=True)
+
+        stopped = Event()
+        proceed = Event()
+        first = Command(Mode.REQUEST, 0x0C, 2)
+
+        def query(cmd: Command):
+            if cmd == first:
+                conn._stop_worker()
+                stopped.set()
+                proceed.wait(timeout=5)
+            return Response(Context(cmd, Protocol.AUTO), b"OK\r>")
+
+        mocker.patch.object(conn, "_query", side_effect=query)
+
+        conn._submit(first)
+        assert stopped.wait(timeout=2)
+        try:
+            response = conn._submit(Command(Mode.REQUEST, 0x0D, 1)).result(timeout=1)
+        finally:
+            proceed.set()
+
+        assert response.raw == b"OK\r>"
+        conn.close()
+
+    def test_requests_are_serialized_on_worker(self, mocker):
+        ft = FakeTransport()
+        ft.connected = True
+        conn = Connection(ft, auto_connect=False, thread_safe=True)
+
+        dummy_resp = Response(Context(Command(Mode.AT, 'I', 0), Protocol.AUTO), b"OK\r>")
+        mocker.patch.object(conn, "wait_for_response", return_value=dummy_resp)
+
+        first = Command(Mode.REQUEST, 0x0C, 2)
+        second = Command(Mode.REQUEST, 0x0D, 1)
+
+        conn.query(first)
+        conn.query(second)
+        worker = conn._worker
+
+        conn.close()
+
+        assert ft.writes == [first.build(), second.build()]
+        assert worker is not None and not worker.is_alive()
+
+    def test_errors_are_propagated_and_released(self, mocker):
+        ft = FakeTransport()
+        ft.connected = True
+        conn = Connection(ft, auto_connect=False, thread_safe=True)
+
+        mocker.patch.object(conn, "_query", side_effect=ValueError("boom"))
+
+        with pytest.raises(ValueError):
+            conn.query(Command(Mode.REQUEST, 0x0C, 2))
+
+        conn.close()
+
+        assert conn._in_flight == {}
+
+
 class TestWaitForResponse:
     """Waiting for raw bytes and parsing to Response, including fallback."""
 
@@ -200,6 +342,72 @@ class TestWaitForResponse:
         assert resp.raw == b"DATA\r>"
 
 
+class TestHooks:
+    """Event hooks around send, receive, parse and errors."""
+
+    def test_hooks_are_called_in_order(self, scripted):
+        conn = scripted(default=b"OK\r>")
+        events: List[Tuple] = []
+
+        conn.add_hook("on_send", lambda q: events.append(("send", q)))
+        conn.add_hook("on_receive", lambda raw, elapsed: events.append(("receive", raw, elapsed >= 0)))
+        conn.add_hook("on_parsed", lambda resp: events.append(("parsed", resp.raw)))
+
+        cmd = Command(Mode.AT, 'I', 0)
+        conn.query(cmd)
+
+        assert events == [
+            ("send", cmd.build()),
+            ("receive", b"OK\r>", True),
+            ("parsed", b"OK\r>"),
+        ]
+
+    def test_hook_decorator_uses_function_name(self, scripted, mocker):
+        conn = scripted(default=b"OK\r>")
+        errors: List[Exception] = []
+
+        @conn.hook
+        def on_error(exc: Exception) -> None:
+            errors.append(exc)
+
+        mocker.patch.object(conn.transport, "write_bytes", side_effect=RuntimeError("not connected"))
+        with pytest.raises(RuntimeError):
+            conn.query(Command(Mode.AT, 'I', 0))
+
+        assert len(errors) == 1 and isinstance(errors[0], RuntimeError)
+
+    def test_failing_hook_does_not_break_query(self, scripted):
+        conn = scripted(default=b"OK\r>")
+
+        def broken(_):
+            raise ValueError("hook failure")
+
+        conn.add_hook("on_parsed", broken)
+
+        resp = conn.query(Command(Mode.AT, 'I', 0))
+
+        assert resp.raw == b"OK\r>"
+
+    def test_remove_hook(self, scripted):
+        conn = scripted(default=b"OK\r>")
+        sent: List[bytes] = []
+
+        conn.add_hook("on_send", sent.append)
+        conn.remove_hook("on_send", sent.append)
+        conn.remove_hook("on_send", sent.append)
+        conn.query(Command(Mode.AT, 'I', 0))
+
+        assert sent == []
+
+    def test_unknown_hook_raises(self, scripted):
+        conn = scripted()
+
+        with pytest.raises(ValueError):
+            conn.add_hook("on_unknown", print)
+        with pytest.raises(ValueError):
+            conn.remove_hook("on_unknown", print)
+
+
 class TestCloseAndContextManager:
     """close() behavior and context manager enter/exit semantics."""
 
@@ -313,3 +521,98 @@ class TestProtocolHelpers:
         # chosen protocol should be the first matching priority from preferences (CAN 0x09 over J1850/ISO)
         assert conn.protocol == Protocol.ISO_15765_4_CAN_D
         assert isinstance(conn.protocol_handler, ProtocolBase)
+
+
+class TestCompactFormat:
+    """Compact wire format (no spaces, linefeeds nor echo) and headers off, end to end."""
+
+    @pytest.mark.parametrize(
+        "protocol",
+        [
+            Protocol.ISO_15765_4_CAN,
+            Protocol.ISO_15765_4_CAN_B,
+            Protocol.SAE_J1850_VPW,
+            Protocol.ISO_14230_4_KWP_FAST,
+        ],
+    )
+    @pytest.mark.parametrize("headers", [True, False])
+    def test_compact_parses_like_default(self, protocol, headers):
+        transport = TransportSimulated(protocol)
+        with Connection(transport, log_handler=None) as conn:
+            expected = conn.query(commands.VIN)
+            default_size = len(conn.query(commands.VEHICLE_SPEED).raw)
+
+        transport = TransportSimulated(protocol)
+        with Connection(
+            transport, compact=True, headers=headers, log_handler=None
+        ) as conn:
+            response = conn.query(commands.VIN)
+            compact_size = len(conn.query(commands.VEHICLE_SPEED).raw)
+
+        assert not transport.spaces and not transport.linefeed and not transport.echo
+        assert transport.headers is headers
+        assert expected.unparsed
+        assert response.unparsed == expected.unparsed
+        assert list(response.messages) == (list(expected.messages) if headers else [b""])
+        assert compact_size < default_size
+
+    def test_init_sequence(self):
+        conn = Connection(FakeTransport(), compact=True, headers=False, auto_connect=False)
+
+        assert [c.name for c in conn.init_sequence[:-1]] == [
+            "RESET",
+            "ECHO_OFF",
+            "HEADERS_OFF",
+            "SPACES_OFF",
+            "LINEFEED_OFF",
+        ]
+
+
+class TestFastInit:
+    """Fast initialization avoiding the AT Z hardware reset."""
+
+    @pytest.mark.parametrize(
+        ("unsupported", "expected"),
+        [
+            (set(), [("probe", True), ("RESET_DEFAULTS", True)]),
+            ({"D"}, [("probe", True), ("RESET_DEFAULTS", False), ("RESET_SOFT", True)]),
+            (
+                {"D", "WS"},
+                [("probe", True), ("RESET_DEFAULTS", False), ("RESET_SOFT", False), ("RESET", True)],
+            ),
+            ({"E", "WS"}, [("probe", False), ("RESET_SOFT", False), ("RESET", True)]),
+        ],
+        ids=["defaults", "soft", "hardware", "unresponsive"],
+    )
+    def test_fallbacks(self, unsupported, expected):
+        transport = TransportSimulated(unsupported=unsupported)
+        with Connection(transport, fast_init=True, log_handler=None) as conn:
+            steps = [(step.name, step.ok) for step in conn.init_steps]
+
+        assert steps[: len(expected) + 1] == expected + [("fast_reset", True)]
+        assert conn.protocol == Protocol.ISO_15765_4_CAN
+
+    def test_skips_hardware_reset(self):
+        transport = TransportSimulated(reset_time=0.5)
+        with Connection(transport, fast_init=True, log_handler=None) as conn:
+            fast = sum(step.duration for step in conn.init_steps if step.name != "auto_protocol")
+
+        assert fast < 0.5e9
+
+    def test_steps_are_timed(self):
+        transport = TransportSimulated(reset_time=0.05)
+        with Connection(transport, log_handler=None) as conn:
+            steps = {step.name: step for step in conn.init_steps}
+
+        assert list(steps) == ["RESET", "ECHO_OFF", "HEADERS_ON", "SPACES_ON", "auto_protocol"]
+        assert steps["RESET"].duration >= 0.05e9
+        assert all(step.ok for step in steps.values())
+
+    def test_failed_step_is_recorded(self, mocker):
+        conn = Connection(FakeTransport(), auto_connect=False, log_handler=None)
+        conn.init_sequence = [ModeAT.RESET, mocker.Mock(side_effect=RuntimeError, __name__="_boom")]
+
+        with pytest.raises(ConnectionError):
+            conn.connect()
+
+        assert [(step.name, step.ok) for step in conn.init_steps] == [("RESET", True), ("boom", False)]
@@ -0,0 +1,147 @@
+"""
+Unit tests for obdii.deadband module.
+"""
+
+import pytest
+
+from obdii import Protocol, commands
+from obdii.command import Command
+from obdii.connection import Connection
+from obdii.deadband import Deadband, DeadbandFilter, changed
+from obdii.mode import Mode
+from obdii.modes import ModeAT
+from obdii.response import Context, Response
+from obdii.transports import TransportSimulated
+from obdii.transports.transport_simulated import SimulatedECU, ramp
+
+
+def response(command, value, timestamp=0.0, ecu=b"7E8"):
+    context = Context(command, Protocol.ISO_15765_4_CAN)
+    return Response(context, b"", timestamp=timestamp, value=value, messages={ecu: [0]})
+
+
+@pytest.mark.parametrize(
+    ("previous", "current", "deadband", "expected"),
+    [
+        (800, 800, Deadband(), False),
+        (800, 801, Deadband(), True),
+        (800, 820, Deadband(absolute=25), False),
+        (800, 825, Deadband(absolute=25), True),
+        (100.0, 100.9, Deadband(relative=0.01), False),
+        (100.0, 101.0, Deadband(relative=0.01), True),
+        ([18, 0, 24], [18, 1, 24], Deadband(absolute=2), False),
+        ([18, 0, 24], [18, 0], Deadband(absolute=2), True),
+        (
+            [(0, "Off"), (2, "Closed loop")],
+            [(0, "Off"), (2, "Closed loop")],
+            Deadband(),
+            False,
+        ),
+        ([(0, "Off")], [(1, "Open loop")], Deadband(absolute=5), True),
+        (True, False, Deadband(absolute=5), True),
+        ("P0158", "P0158", Deadband(), False),
+        (None, 0, Deadband(), True),
+    ],
+    ids=[
+        "same",
+        "any_change",
+        "below_absolute",
+        "at_absolute",
+        "below_relative",
+        "at_relative",
+        "list_below",
+        "list_length",
+        "enumerated_same",
+        "enumerated_label",
+        "bool_exact",
+        "string",
+        "none",
+    ],
+)
+def test_changed(previous, current, deadband, expected):
+    assert changed(previous, current, deadband) is expected
+
+
+class TestDeadbandFilter:
+    def test_forwards_first_and_changes(self):
+        forwarded = []
+        stage = DeadbandFilter(
+            forwarded.append, policies={commands.ENGINE_SPEED: Deadband(absolute=50)}
+        )
+
+        for value in (800, 820, 860, 870, 910):
+            stage.put(response(commands.ENGINE_SPEED, value))
+
+        assert [r.value for r in forwarded] == [800, 860, 910]
+        assert (stage.forwarded, stage.suppressed) == (3, 2)
+
+    def test_default_and_policy(self):
+        stage = DeadbandFilter(default=Deadband(relative=0.5))
+
+        assert stage.policy(commands.ENGINE_SPEED) == Deadband(relative=0.5)
+
+    def test_heartbeat(self):
+        stage = DeadbandFilter(heartbeat=10.0)
+
+        assert stage.put(response(commands.VEHICLE_SPEED, 30, timestamp=0.0))
+        assert not stage.put(response(commands.VEHICLE_SPEED, 30, timestamp=9.0))
+        assert stage.put(response(commands.VEHICLE_SPEED, 30, timestamp=10.0))
+
+    def test_per_ecu(self):
+        stage = DeadbandFilter()
+
+        assert stage.put(response(commands.VEHICLE_SPEED, 30, ecu=b"7E8"))
+        assert stage.put(response(commands.VEHICLE_SPEED, 30, ecu=b"7E9"))
+        assert not stage.put(response(commands.VEHICLE_SPEED, 30, ecu=b"7E9"))
+
+    def test_each_ecu_message_is_compared(self):
+        command = Command(Mode.REQUEST, 0x0D, 1, resolver=lambda message: message[0])
+        stage = DeadbandFilter()
+
+        def multi(first, second):
+            context = Context(command, Protocol.ISO_15765_4_CAN)
+            return Response(
+                context, b"", value=first, messages={b"7E8": [first], b"7E9": [second]}
+            )
+
+        assert stage.put(multi(30, 40))
+        assert not stage.put(multi(30, 40))
+        assert stage.put(multi(30, 41))
+        assert not stage.put(multi(30, 41))
+
+    def test_unnamed_commands_are_kept_apart(self):
+        stage = DeadbandFilter()
+
+        assert stage.put(response(Command(Mode.REQUEST, 0x0C, 2), 30))
+        assert stage.put(response(Command(Mode.REQUEST, 0x0D, 1), 30))
+
+    def test_at_responses_pass(self):
+        stage = DeadbandFilter()
+        for _ in range(2):
+            assert stage.put(response(ModeAT.VERSION_ID, "ELM327 v2.1"))
+
+    def test_reset(self):
+        stage = DeadbandFilter()
+        stage.put(response(commands.VEHICLE_SPEED, 30))
+        stage.reset()
+
+        assert stage.put(response(commands.VEHICLE_SPEED, 30))
+
+
+def test_attach_connection():
+    forwarded = []
+    stage = DeadbandFilter(forwarded.append)
+    transport = TransportSimulated(
+        ecus=[SimulatedECU(signals={commands.VEHICLE_SPEED: ramp(50, 50, 1.0)})]
+    )
+
+    with Connection(transport, log_handler=None) as conn:
+        stage.attach(conn)
+        for _ in range(5):
+            conn.query(commands.VEHICLE_SPEED)
+        stage.detach(conn)
+
+    assert [
+        r.value for r in forwarded if r.context.command == commands.VEHICLE_SPEED
+    ] == [50]
+    assert stage.suppressed == 4
@@ -0,0 +1,151 @@
+"""
+Unit tests for obdii.decoder module.
+"""
+
+import pytest
+
+from obdii import Protocol, commands
+from obdii.connection import Connection
+from obdii.decoder import (
+    DecodeResult,
+    command_ref_from_query,
+    decode,
+    decode_one,
+    decode_recording,
+    recording_items,
+    resolve_ref,
+    to_ref,
+)
+from obdii.mode import Mode
+from obdii.transports import TransportRecorder, TransportSimulated
+from obdii.transports.transport_simulated import SimulatedECU, constant
+
+
+CAN = Protocol.ISO_15765_4_CAN
+
+ITEMS = [
+    (CAN, commands.ENGINE_SPEED, b"7E8 04 41 0C 1A F8\r\r>"),
+    (CAN, "VEHICLE_SPEED", b"7E8 03 41 0D 32\r\r>"),
+    (CAN.value, (1, 0x0D), b"NO DATA\r\r>"),
+    (Protocol.ISO_14230_4_KWP, "ENGINE_SPEED", b"84 F1 11 41 0C 1F 44 36\r\r>"),
+]
+
+EXPECTED = [1726.0, 50, None, 2001.0]
+
+
+class TestReferences:
+    @pytest.mark.parametrize(
+        ("ref", "expected"),
+        [
+            ("ENGINE_SPEED", commands.ENGINE_SPEED),
+            ((1, 0x0C), commands.ENGINE_SPEED),
+            ((3, None), commands.GET_DTC),
+            (commands.VIN, commands.VIN),
+        ],
+    )
+    def test_resolve_ref(self, ref, expected):
+        assert resolve_ref(ref) is expected
+
+    def test_to_ref_uses_names_of_builtin_commands(self):
+        assert to_ref(commands.ENGINE_SPEED) == "ENGINE_SPEED"
+
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            (b"01 0C 1\r", (1, 0x0C)),
+            (b"03\r", (3, None)),
+            (b"AT Z\r", None),
+            (b"01 FF\r", None),
+        ],
+    )
+    def test_command_ref_from_query(self, query, expected):
+        assert command_ref_from_query(query) == expected
+
+
+class TestDecode:
+    def test_decode_one(self):
+        result = decode_one(CAN, "ENGINE_SPEED", b"7E8 04 41 0C 1A F8\r\r>", 42)
+
+        assert result == DecodeResult(
+            "ENGINE_SPEED", 1726.0, [0x1A, 0xF8], {b"7E8": [0x1A, 0xF8]}, None, 42
+        )
+
+    def test_decode_one_error(self):
+        result = decode_one(CAN, "ENGINE_SPEED", b"NO DATA\r\r>")
+
+        assert result.error == "MissingDataError"
+        assert result.value is None
+
+    def test_decode_in_process(self):
+        results = list(decode(ITEMS, workers=1, chunk_size=3))
+
+        assert [r.value for r in results] == EXPECTED
+
+    def test_decode_process_pool_keeps_order(self):
+        items = ITEMS * 50
+
+        results = list(decode(items, workers=2, chunk_size=7))
+
+        assert [r.value for r in results] == EXPECTED * 50
+
+    def test_custom_command(self):
+        from obdii.command import Command
+
+        custom = Command(Mode.REQUEST, 0x0C, 2, resolver=lambda data: data[0])
+
+        assert (
+            next(decode([(CAN, custom, b"7E8 04 41 0C 1A F8\r\r>")], workers=1)).value
+            == 0x1A
+        )
+
+
+class TestRecording:
+    @pytest.fixture
+    def recording(self, tmp_path):
+        path = tmp_path / "session.obdrec"
+        transport = TransportSimulated(
+            Protocol.ISO_14230_4_KWP_FAST,
+            ecus=[SimulatedECU(signals={commands.ENGINE_SPEED: constant(0x1A, 0xF8)})],
+        )
+
+        with Connection(
+            TransportRecorder(transport, path), smart_query=True, log_handler=None
+        ) as conn:
+            conn.query(commands.ENGINE_SPEED)
+            conn.query(commands.ENGINE_SPEED)
+            conn.query(commands.GET_DTC)
+
+        return path
+
+    def test_recording_items(self, recording):
+        items = list(recording_items(recording))
+
+        assert [(protocol, ref) for protocol, ref, _, _, _ in items] == [
+            (Protocol.ISO_14230_4_KWP_FAST.value, (1, 0x0C)),
+            (Protocol.ISO_14230_4_KWP_FAST.value, (1, 0x0C)),
+            (Protocol.ISO_14230_4_KWP_FAST.value, (3, None)),
+        ]
+        assert items[0][3] < items[1][3] < items[2][3]
+        assert all(headers for *_, headers in items)
+
+    def test_decode_recording(self, recording):
+        results = list(decode_recording(recording, workers=1))
+
+        assert [r.value for r in results[:2]] == [1726.0, 1726.0]
+        assert results[2].command == "GET_DTC"
+
+    @pytest.mark.parametrize("protocol", [CAN, Protocol.ISO_14230_4_KWP_FAST])
+    def test_decode_recording_without_headers(self, tmp_path, protocol):
+        path = tmp_path / "session.obdrec"
+        transport = TransportSimulated(
+            protocol,
+            ecus=[SimulatedECU(signals={commands.ENGINE_SPEED: constant(0x1A, 0xF8)})],
+        )
+
+        with Connection(
+            TransportRecorder(transport, path), headers=False, log_handler=None
+        ) as conn:
+            conn.query(commands.ENGINE_SPEED)
+
+        assert [item[4] for item in recording_items(path)] == [False]
+        assert [r.value for r in decode_recording(path, workers=1)] == [1726.0]
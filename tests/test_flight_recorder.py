@@ -0,0 +1,106 @@
+"""
+Unit tests for obdii.flight_recorder module.
+"""
+import pytest
+
+from obdii import Protocol, at_commands, commands
+from obdii.errors import BusError, MissingDataError
+from obdii.flight_recorder import (
+    OUTCOME_NO_MESSAGE,
+    OUTCOME_OK,
+    FlightRecorder,
+)
+
+
+class TestFlightRecorder:
+    def test_records_exchanges(self, scripted):
+        conn = scripted(
+            b"7E8 04 41 0C 40 80\r>", b"7E8 ZZ\r>", protocol=Protocol.ISO_15765_4_CAN
+        )
+        recorder = FlightRecorder()
+        recorder.attach(conn)
+
+        conn.query(commands.ENGINE_SPEED)
+        conn.query(commands.VEHICLE_SPEED)
+
+        first, second = recorder.exchanges()
+        assert first.query == commands.ENGINE_SPEED.build()
+        assert first.raw == b"7E8 04 41 0C 40 80\r>"
+        assert first.outcome == OUTCOME_OK
+        assert second.outcome == OUTCOME_NO_MESSAGE
+
+    def test_capacity_bounds_buffer(self, scripted):
+        conn = scripted(*[b"OK\r>"] * 5, protocol=Protocol.ISO_15765_4_CAN)
+        recorder = FlightRecorder(capacity=3)
+        recorder.attach(conn)
+
+        for _ in range(5):
+            conn.query(at_commands.ECHO_OFF)
+
+        assert len(recorder) == 3
+
+    def test_error_outcome_and_auto_dump(self, scripted, tmp_path):
+        conn = scripted(b"BUS ERROR\r>", protocol=Protocol.ISO_15765_4_CAN)
+        recorder = FlightRecorder(dump_path=tmp_path / "dump.log")
+        recorder.attach(conn)
+
+        with pytest.raises(BusError):
+            conn.query(commands.ENGINE_SPEED)
+
+        assert [e.outcome for e in recorder] == ["BusError"]
+        (dump,) = tmp_path.glob("dump-*.log")
+        content = dump.read_text(encoding="utf-8")
+        assert "BusError" in content and "BUS ERROR" in content
+
+    def test_parse_failure_triggers_dump(self, scripted, tmp_path):
+        conn = scripted(b"7E8 ZZ\r>", protocol=Protocol.ISO_15765_4_CAN)
+        recorder = FlightRecorder(dump_path=tmp_path / "dump.log")
+        recorder.attach(conn)
+
+        conn.query(commands.ENGINE_SPEED)
+
+        (dump,) = tmp_path.glob("dump-*.log")
+        assert OUTCOME_NO_MESSAGE in dump.read_text(encoding="utf-8")
+
+    def test_no_data_does_not_dump(self, scripted, tmp_path):
+        conn = scripted(b"NO DATA\r>", protocol=Protocol.ISO_15765_4_CAN)
+        recorder = FlightRecorder(dump_path=tmp_path / "dump.log")
+        recorder.attach(conn)
+
+        with pytest.raises(MissingDataError):
+            conn.query(commands.ENGINE_SPEED)
+
+        assert [e.outcome for e in recorder] == ["MissingDataError"]
+        assert list(tmp_path.iterdir()) == []
+
+    def test_auto_dumps_are_rate_limited(self, scripted, tmp_path, mocker):
+        clock = mocker.patch("obdii.flight_recorder.monotonic", return_value=100.0)
+        conn = scripted(*[b"BUS ERROR\r>"] * 3, protocol=Protocol.ISO_15765_4_CAN)
+        recorder = FlightRecorder(dump_path=tmp_path / "dump.log", dump_interval=10)
+        recorder.attach(conn)
+
+        for now in (100.0, 105.0, 111.0):
+            clock.return_value = now
+            with pytest.raises(BusError):
+                conn.query(commands.ENGINE_SPEED)
+
+        dumps = sorted(tmp_path.glob("dump-*.log"))
+        assert len(dumps) == 2
+        assert dumps[0].read_text(encoding="utf-8").count("BusError") == 1
+
+    def test_detach_and_clear(self, scripted):
+        conn = scripted(b"OK\r>", b"OK\r>", protocol=Protocol.ISO_15765_4_CAN)
+        recorder = FlightRecorder()
+        recorder.attach(conn)
+        conn.query(at_commands.ECHO_OFF)
+
+        recorder.detach(conn)
+        conn.query(at_commands.ECHO_OFF)
+        assert len(recorder) == 1
+
+        recorder.clear()
+        assert len(recorder) == 0
+
+    def test_dump_without_path_raises(self):
+        with pytest.raises(ValueError):
+            FlightRecorder().dump()
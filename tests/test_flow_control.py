@@ -0,0 +1,113 @@
+"""
+Unit tests for obdii.flow_control module.
+"""
+
+import pytest
+
+from obdii import Protocol, commands
+from obdii.flow_control import FlowControl, flow_control_data, read_bulk
+from obdii.targeting import EcuAddress
+from obdii.transports import TransportSimulated
+from obdii.transports.transport_simulated import DEFAULT_VIN
+
+
+@pytest.mark.parametrize(
+    ("block_size", "separation_time", "expected"),
+    [(0, 0, "30 00 00"), (8, 0x0A, "30 08 0A"), (0, 0xF1, "30 00 F1")],
+)
+def test_flow_control_data(block_size, separation_time, expected):
+    assert flow_control_data(block_size, separation_time) == expected
+
+
+@pytest.mark.parametrize(("block_size", "separation_time"), [(256, 0), (0, 0x80)])
+def test_flow_control_data_invalid(block_size, separation_time):
+    with pytest.raises(ValueError):
+        flow_control_data(block_size, separation_time)
+
+
+class TestFlowControl:
+    def test_sets_and_restores(self, simulated):
+        conn, sent = simulated()
+        with conn:
+            with FlowControl(conn, EcuAddress("7E0", "7E8")):
+                vin = conn.query(commands.VIN)
+
+        assert sent[-6:] == [
+            b"AT CFC1\r",
+            b"AT FC SH 7E0\r",
+            b"AT FC SD 30 00 00\r",
+            b"AT FC SM 1\r",
+            b"09 02\r",
+            b"AT FC SM 0\r",
+        ]
+        assert bytes(vin.unparsed).endswith(DEFAULT_VIN.encode())
+
+    def test_restores_on_error(self, simulated):
+        conn, sent = simulated()
+        with conn:
+            with pytest.raises(RuntimeError):
+                with FlowControl(conn, separation_time=1):
+                    raise RuntimeError
+
+        assert sent[-1] == b"AT FC SM 0\r"
+
+    def test_defaults_send_nothing(self, simulated):
+        conn, sent = simulated()
+        with conn:
+            count = len(sent)
+            with FlowControl(conn):
+                conn.query(commands.VIN)
+
+        assert sent[count:] == [b"09 02\r"]
+
+    def test_header_is_automatic_without_header(self, simulated):
+        conn, sent = simulated()
+        with conn:
+            with FlowControl(conn, block_size=8):
+                conn.query(commands.CALIBRATION_ID)
+
+        assert not any(query.startswith(b"AT FC SH") for query in sent)
+        assert sent[-5:] == [
+            b"AT CFC1\r",
+            b"AT FC SD 30 08 00\r",
+            b"AT FC SM 2\r",
+            b"09 04\r",
+            b"AT FC SM 0\r",
+        ]
+
+    @pytest.mark.parametrize(
+        ("protocol", "header", "expected"),
+        [
+            (Protocol.ISO_15765_4_CAN_B, "18DA10F1", b"AT FC SH 18DA10F1\r"),
+            (Protocol.ISO_15765_4_CAN, EcuAddress("7E1", "7E9"), b"AT FC SH 7E1\r"),
+        ],
+    )
+    def test_header(self, simulated, protocol, header, expected):
+        conn, _ = simulated(TransportSimulated(protocol))
+        with conn:
+            built = [
+                command.build() for command in FlowControl(conn, header).commands()
+            ]
+
+        assert expected in built
+
+    def test_requires_can(self, simulated):
+        conn, _ = simulated(TransportSimulated(Protocol.SAE_J1850_PWM))
+        with conn:
+            with pytest.raises(ValueError, match="CAN protocol"):
+                FlowControl(conn).commands()
+
+
+def test_read_bulk(simulated):
+    conn, sent = simulated()
+    with conn:
+        responses = read_bulk(
+            conn,
+            [commands.VIN, commands.CALIBRATION_ID, commands.ECU_NAME],
+            separation_time=1,
+        )
+
+    assert list(responses) == ["VIN", "CALIBRATION_ID", "ECU_NAME"]
+    assert b"AT FC SD 30 00 01\r" in sent
+    assert b"AT FC SM 2\r" in sent
+    assert sent[-1] == b"AT FC SM 0\r"
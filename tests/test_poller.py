@@ -0,0 +1,152 @@
+"""
+Unit tests for obdii.poller module.
+"""
+
+import pytest
+
+from obdii import commands
+from obdii.connection import Connection
+from obdii.errors import InvalidCommandError
+from obdii.poller import DEFAULT_BOUNDS, AdaptivePoller, RateBounds, _Signal
+from obdii.transports import TransportSimulated
+from obdii.transports.transport_simulated import SimulatedECU, constant, sine
+
+
+class FailingConnection:
+    def query(self, command):
+        raise InvalidCommandError(b"?")
+
+
+@pytest.fixture
+def conn():
+    transport = TransportSimulated(
+        ecus=[
+            SimulatedECU(
+                signals={
+                    commands.ENGINE_SPEED: sine(0, 40000, 0.5, width=2),
+                    commands.ENGINE_COOLANT_TEMP: constant(130),
+                }
+            )
+        ]
+    )
+    with Connection(transport, log_handler=None) as conn:
+        yield conn
+
+
+class TestSignal:
+    def test_change_in_thresholds(self):
+        signal = _Signal(commands.ENGINE_SPEED, RateBounds(), [100.0])
+        signal.value = 800.0
+
+        assert signal.change(1000.0) == 2.0
+        assert signal.change(800.0) == 0.0
+        assert signal.change(None) == 1.0
+
+    def test_change_of_sequences(self):
+        signal = _Signal(commands.ENGINE_SPEED, RateBounds(), [1.0, 10.0])
+        signal.value = [1, 10]
+
+        assert signal.change([3, 10]) == 2.0
+        assert signal.change([1, 30]) == 2.0
+        assert signal.change([1]) == 1.0
+        signal.value = [(0, "Off")]
+        assert signal.change([(0, "Off")]) == 0.0
+
+
+class TestAdaptivePoller:
+    def test_thresholds_from_value_range(self, conn):
+        poller = AdaptivePoller(
+            conn,
+            [commands.ENGINE_COOLANT_TEMP, commands.VIN],
+            resolution=0.01,
+            thresholds={commands.VIN: 5.0},
+        )
+
+        assert poller._signals[commands.ENGINE_COOLANT_TEMP].thresholds == [pytest.approx(2.55)]
+        assert poller._signals[commands.VIN].thresholds == [5.0]
+
+    def test_bounds(self, conn):
+        poller = AdaptivePoller(
+            conn,
+            [commands.ENGINE_SPEED, commands.ENGINE_COOLANT_TEMP, commands.VIN],
+            bounds={commands.ENGINE_SPEED: RateBounds(5.0, 25.0)},
+            default=RateBounds(0.5, 2.0),
+        )
+
+        assert poller.rates() == {
+            "ENGINE_SPEED": 25.0,
+            "ENGINE_COOLANT_TEMP": DEFAULT_BOUNDS[
+                commands.ENGINE_COOLANT_TEMP
+            ].max_rate,
+            "VIN": 2.0,
+        }
+
+    def test_stable_signal_slows_down(self, conn):
+        poller = AdaptivePoller(
+            conn,
+            [commands.ENGINE_SPEED, commands.ENGINE_COOLANT_TEMP],
+            bounds={
+                commands.ENGINE_SPEED: RateBounds(1.0, 200.0),
+                commands.ENGINE_COOLANT_TEMP: RateBounds(1.0, 200.0),
+            },
+            smoothing=1.0,
+        )
+
+        responses = list(poller.run(count=40))
+        names = [r.context.command.name for r in responses]
+
+        assert poller.rate(commands.ENGINE_COOLANT_TEMP) == 1.0
+        assert poller.rate(commands.ENGINE_SPEED) > 50.0
+        assert names.count("ENGINE_SPEED") > names.count("ENGINE_COOLANT_TEMP")
+
+    def test_moving_signal_speeds_up(self, conn):
+        poller = AdaptivePoller(
+            conn,
+            [commands.ENGINE_SPEED],
+            bounds={commands.ENGINE_SPEED: RateBounds(1.0, 200.0)},
+        )
+        signal = poller._signals[commands.ENGINE_SPEED]
+        signal.rate = signal.activity = 1.0
+
+        poller.step(wait=False)
+        poller.step(wait=False)
+
+        assert poller.rate(commands.ENGINE_SPEED) > 1.0
+
+    def test_failure_backs_off(self):
+        poller = AdaptivePoller(FailingConnection(), [commands.ENGINE_SPEED])
+
+        assert poller.step() is None
+        assert (
+            poller.rate(commands.ENGINE_SPEED)
+            == DEFAULT_BOUNDS[commands.ENGINE_SPEED].min_rate
+        )
+
+    def test_unexpected_error_keeps_the_signal_scheduled(self, conn, mocker):
+        poller = AdaptivePoller(conn, [commands.ENGINE_SPEED])
+        mocker.patch.object(conn, "query", side_effect=RuntimeError("lost"))
+
+        with pytest.raises(RuntimeError, match="lost"):
+            poller.step(wait=False)
+        mocker.stopall()
+
+        assert poller.step(wait=False) is not None
+
+    def test_run_duration_and_stop(self, conn):
+        poller = AdaptivePoller(
+            conn,
+            [commands.ENGINE_COOLANT_TEMP],
+            bounds={commands.ENGINE_COOLANT_TEMP: RateBounds(0.1, 0.1)},
+        )
+
+        assert len(list(poller.run(duration=0.5))) == 1
+
+    def test_stop(self, conn):
+        poller = AdaptivePoller(conn, [commands.ENGINE_SPEED])
+        responses = []
+
+        for response in poller.run():
+            responses.append(response)
+            poller.stop()
+
+        assert len(responses) == 1
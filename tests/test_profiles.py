@@ -0,0 +1,200 @@
+"""
+Unit tests for obdii.profiles module.
+"""
+
+import pytest
+
+from obdii.modes import Mode01, Mode09
+from obdii.profiles import ProfileStore, VehicleProfile, count_frames, query_key
+from obdii.protocol import Protocol
+from obdii.targeting import EcuAddress
+from obdii.transports import TransportSimulated
+from obdii.transports.transport_simulated import DEFAULT_VIN, SimulatedECU
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(tmp_path / "vehicles.json")
+
+
+class TestVehicleProfile:
+    def test_round_trip(self):
+        profile = VehicleProfile(
+            "7E8:BE1FA813",
+            Protocol.ISO_15765_4_CAN,
+            "ELM327 v2.1",
+            ecus=[EcuAddress("7E0", "7E8")],
+            supported_pids={0x01: [0x0C, 0x0D], 0x09: [0x02]},
+            response_counts={"0100": 2},
+            latencies={"ENGINE_SPEED": 42.0},
+        )
+
+        assert VehicleProfile.from_dict(profile.to_dict()) == profile
+
+    def test_key(self):
+        profile = VehicleProfile("7E8:BE1FA813", Protocol.ISO_15765_4_CAN, "ELM327 v2.1")
+        assert profile.key == "ELM327 v2.1|7E8:BE1FA813"
+
+        profile.vin = DEFAULT_VIN
+        assert profile.key == DEFAULT_VIN
+
+    def test_is_supported(self):
+        profile = VehicleProfile(
+            "", Protocol.ISO_15765_4_CAN, supported_pids={0x01: [0x0C]}
+        )
+
+        assert profile.is_supported(Mode01.ENGINE_SPEED)
+        assert not profile.is_supported(Mode01.VEHICLE_SPEED)
+        assert profile.is_supported(Mode01.SUPPORTED_PIDS_B)
+        assert profile.is_supported(Mode09.VIN)
+
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [
+            (b"7E8 06 41 00 18 1A 80 12\r7E9 06 41 00 00 08 00 00\r\r>", 2),
+            (b"7E8 10 14 49 02 01 31 4F 42\r7E8 21 44 49 49 30 53 49 4D\r\r>", 2),
+            (b"41 0C 1A F8\r\r>", 1),
+            (b"014\r0: 49 02 01 31 4F 42\r1: 44 49 49 30 53 49 4D\r2: 55 4C 41 54 45 44 31\r\r>", 3),
+            (b"014\r0:490201314F42\r1:44494930534D\r2:554C4154454431\r>", 3),
+        ],
+        ids=["ecus", "multi_frame", "headerless", "headerless_multi_frame", "compact"],
+    )
+    def test_count_frames(self, raw, expected):
+        assert count_frames(raw) == expected
+
+    def test_query_key(self):
+        assert query_key(Mode01.ENGINE_SPEED) == "010C"
+
+
+class TestProfileStore:
+    def test_round_trip(self, store):
+        profile = VehicleProfile("7E8:BE1FA813", Protocol.ISO_15765_4_CAN, vin="VIN")
+        store.put(profile)
+
+        assert store.get("VIN") == profile
+        assert store.get("unknown") is None
+
+    def test_profiles_order(self, store):
+        for vin, adapter, last_seen in (("A", "other", 3.0), ("B", "mine", 1.0), ("C", "mine", 2.0)):
+            store.put(
+                VehicleProfile("", Protocol.ISO_15765_4_CAN, adapter, vin, last_seen=last_seen)
+            )
+
+        assert [p.vin for p in store.profiles("mine")] == ["C", "B", "A"]
+
+    def test_unreadable_file_is_ignored(self, simulated, tmp_path):
+        path = tmp_path / "vehicles.json"
+        path.write_text("{")
+
+        conn, _ = simulated(profile_store=ProfileStore(path), close=True)
+
+        assert ProfileStore(path).get(DEFAULT_VIN) == conn.profile
+
+
+class TestWarmStart:
+    def test_discovery_then_warm_start(self, simulated, store):
+        first, first_sent = simulated(
+            TransportSimulated(ecus=2), profile_store=store, close=True
+        )
+        second, second_sent = simulated(
+            TransportSimulated(ecus=2), profile_store=store, close=True
+        )
+
+        profile = second.profile
+        assert not first.warm_start
+        assert second.warm_start
+        assert profile.vin == DEFAULT_VIN
+        assert profile.protocol == Protocol.ISO_15765_4_CAN
+        assert profile.ecus == [EcuAddress("7E0", "7E8"), EcuAddress("7E1", "7E9")]
+        assert profile.supported_pids[0x01] == [0x04, 0x05, 0x0C, 0x0D, 0x0F, 0x11, 0x1C, 0x1F]
+        assert profile.supported_pids[0x09] == [0x01, 0x02, 0x03, 0x04, 0x09, 0x0A]
+
+        assert b"09 02\r" in first_sent
+        obd_queries = [query for query in second_sent if not query.startswith(b"AT")]
+        assert obd_queries == [b"01 00\r", b"09 02\r"]
+
+    def test_unknown_vehicle_is_discovered(self, simulated, store):
+        simulated(profile_store=store, close=True)
+        conn, sent = simulated(
+            TransportSimulated(
+                protocol=Protocol.SAE_J1850_PWM,
+                ecus=[SimulatedECU(vin="OTHERVEHICLE00001")],
+            ),
+            profile_store=store,
+            close=True,
+        )
+
+        assert not conn.warm_start
+        assert conn.protocol == Protocol.SAE_J1850_PWM
+        assert conn.profile.ecus == []
+        assert b"AT SP 0\r" in sent
+        assert len(store.profiles()) == 2
+
+    def test_vehicles_sharing_a_fingerprint_are_told_apart_by_vin(self, simulated, store):
+        simulated(TransportSimulated(version="ELM327 v1.4b"), profile_store=store, close=True)
+        other = VehicleProfile.from_dict(store.get(DEFAULT_VIN).to_dict())
+        other.vin = "OTHERVEHICLE00001"
+        other.adapter = "ELM327 v1.5"
+        other.last_seen += 1
+        store.put(other)
+
+        conn, sent = simulated(profile_store=store, close=True)
+
+        assert conn.warm_start
+        assert conn.profile.vin == DEFAULT_VIN
+        assert b"09 02\r" in sent
+
+    def test_same_model_with_another_vin_is_not_warm_started(self, simulated, store):
+        first_vin, second_vin = "VINAAAAAAAAAAAAA1", "VINBBBBBBBBBBBBB2"
+        simulated(
+            TransportSimulated(ecus=[SimulatedECU(vin=first_vin)]),
+            profile_store=store,
+            close=True,
+        )
+
+        conn, _ = simulated(
+            TransportSimulated(ecus=[SimulatedECU(vin=second_vin)]),
+            profile_store=store,
+            close=True,
+        )
+
+        assert not conn.warm_start
+        assert conn.profile.vin == second_vin
+        assert store.get(first_vin).vin == first_vin
+        assert store.get(first_vin).fingerprint == store.get(second_vin).fingerprint
+
+        conn, _ = simulated(
+            TransportSimulated(ecus=[SimulatedECU(vin=first_vin)]),
+            profile_store=store,
+            close=True,
+        )
+
+        assert conn.warm_start
+        assert conn.profile.vin == first_vin
+
+    def test_vehicle_without_vin(self, simulated, store):
+        ecu = SimulatedECU(vin=None)
+        simulated(TransportSimulated(ecus=[ecu]), profile_store=store, close=True)
+        conn, _ = simulated(TransportSimulated(ecus=[ecu]), profile_store=store, close=True)
+
+        assert conn.warm_start
+        assert conn.profile.vin is None
+        assert conn.profile.key == f"ELM327 v2.1|{conn.profile.fingerprint}"
+
+    def test_learned_response_counts(self, simulated, store):
+        simulated(TransportSimulated(ecus=2), profile_store=store, close=True)
+        conn, sent = simulated(
+            TransportSimulated(ecus=2),
+            profile_store=store,
+            early_return=True,
+            queries=[Mode01.SUPPORTED_PIDS_A, Mode01.ENGINE_SPEED],
+            close=True,
+        )
+
+        assert conn.profile.response_counts["0100"] == 2
+        assert sent[-2:] == [b"01 00 2\r", b"01 0C 1\r"]
+
+    def test_latencies_saved_on_close(self, simulated, store):
+        simulated(profile_store=store, queries=[Mode01.ENGINE_SPEED], close=True)
+
+        assert "ENGINE_SPEED" in store.get(DEFAULT_VIN).latencies
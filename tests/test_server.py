@@ -0,0 +1,203 @@
+"""
+Unit tests for obdii.server module and its client transport.
+"""
+import pytest
+
+from threading import Thread
+from time import monotonic, sleep
+from typing import List
+
+from obdii import at_commands, commands
+from obdii.connection import Connection
+from obdii.server import AdapterServer, LOCAL_REPLY, REJECTED_REPLY, normalize_query
+from obdii.transports.transport_mux import TransportMux
+
+
+@pytest.fixture
+def server(scripted):
+    with AdapterServer(scripted(default=None), ("127.0.0.1", 0), staleness=60) as srv:
+        yield srv
+
+
+@pytest.fixture
+def transport(server):
+    return server.connection.transport
+
+
+def make_client(server, **kwargs) -> TransportMux:
+    host, port = server.server_address
+    client = TransportMux(host, port, **kwargs)
+    client.connect()
+    return client
+
+
+class TestNormalizeQuery:
+    def test_normalize_ignores_case_and_spaces(self):
+        assert normalize_query(b"01 0c\r") == normalize_query(b"010C\r") == b"010C"
+
+
+class TestAdapterServer:
+    def test_query_roundtrip(self, server, transport):
+        client = make_client(server)
+
+        client.write_bytes(commands.ENGINE_SPEED.build())
+        assert client.read_bytes() == b"01 0C\r\r>"
+        assert transport.writes == [b"01 0C\r"]
+
+        client.close()
+
+    def test_configuration_at_commands_are_local(self, server, transport):
+        client = make_client(server)
+
+        client.write_bytes(at_commands.RESET.build())
+        assert client.read_bytes() == LOCAL_REPLY
+
+        client.write_bytes(at_commands.DESC_PROTOCOL_N.build())
+        assert client.read_bytes() == b"AT DPN\r\r>"
+
+        assert transport.writes == [b"AT DPN\r"]
+        client.close()
+
+    @pytest.mark.parametrize(
+        "query",
+        [b"AT SH 7E0\r", b"AT CRA 7E8\r", b"AT CF 7E8\r", b"AT FC SM 1\r", b"AT SP 6\r"],
+        ids=["header", "receive_address", "filter", "flow_control", "protocol"],
+    )
+    def test_per_client_settings_are_rejected(self, server, transport, query):
+        client = make_client(server)
+
+        client.write_bytes(query)
+
+        assert client.read_bytes() == REJECTED_REPLY
+        assert transport.writes == []
+        client.close()
+
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            (b"AT H1\r", LOCAL_REPLY),
+            (b"AT S1\r", LOCAL_REPLY),
+            (b"AT H0\r", REJECTED_REPLY),
+            (b"AT S0\r", REJECTED_REPLY),
+            (b"AT L0\r", REJECTED_REPLY),
+        ],
+        ids=["headers_on", "spaces_on", "headers_off", "spaces_off", "linefeeds_off"],
+    )
+    def test_format_settings_must_match_the_server(self, server, transport, query, expected):
+        client = make_client(server)
+
+        client.write_bytes(query)
+
+        assert client.read_bytes() == expected
+        assert transport.writes == []
+        client.close()
+
+    def test_repeat_uses_client_last_query(self, server, transport):
+        client = make_client(server)
+
+        client.write_bytes(commands.VEHICLE_SPEED.build())
+        client.read_bytes()
+        client.write_bytes(at_commands.REPEAT.build())
+
+        assert client.read_bytes() == b"01 0D\r\r>"
+        client.close()
+
+    def test_fresh_responses_are_reused(self, server, transport):
+        first = make_client(server)
+        second = make_client(server)
+
+        first.write_bytes(commands.ENGINE_SPEED.build())
+        first.read_bytes()
+        second.write_bytes(b"010C\r")
+
+        assert second.read_bytes() == b"01 0C\r\r>"
+        assert len(transport.writes) == 1
+        assert server.hits == 1
+
+        first.close()
+        second.close()
+
+    def test_stale_responses_are_forgotten(self, scripted, mocker):
+        clock = mocker.patch("obdii.server.monotonic", return_value=0.0)
+
+        with AdapterServer(scripted(default=None), ("127.0.0.1", 0), staleness=1) as srv:
+            srv.request(b"01 0C\r")
+            clock.return_value = 5.0
+            srv.request(b"01 0D\r")
+
+            assert list(srv._recent) == [b"010D"]
+
+    def test_request_without_serving(self, scripted):
+        server = AdapterServer(scripted(default=None), ("127.0.0.1", 0))
+        try:
+            assert server.request(b"01 0C\r") == b"01 0C\r\r>"
+        finally:
+            server.shutdown()
+
+    def test_clear_dtc_is_always_sent(self, server, transport):
+        first = make_client(server)
+        second = make_client(server)
+
+        first.write_bytes(commands.CLEAR_DTC.build())
+        first.read_bytes()
+        second.write_bytes(commands.CLEAR_DTC.build())
+
+        assert second.read_bytes() == b"04\r\r>"
+        assert transport.writes == [b"04\r", b"04\r"]
+        assert server.hits == 0
+
+        first.close()
+        second.close()
+
+    def test_in_flight_queries_are_coalesced(self, scripted):
+        conn = scripted(default=None)
+        transport = conn.transport
+        transport.release.clear()
+
+        with AdapterServer(conn, ("127.0.0.1", 0)) as srv:
+            results: List[bytes] = []
+            threads = [
+                Thread(target=lambda: results.append(srv.request(b"01 0C\r")))
+                for _ in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+
+            deadline = monotonic() + 2
+            while srv.requests < 3:
+                assert monotonic() < deadline, "requests did not reach the server"
+                sleep(0.001)
+            transport.release.set()
+            for thread in threads:
+                thread.join(timeout=2)
+
+        assert results == [b"01 0C\r\r>"] * 3
+        assert transport.writes == [b"01 0C\r"]
+
+
+class TestTransportMux:
+    def test_requires_address(self):
+        with pytest.raises(ValueError):
+            TransportMux()
+
+    def test_rejects_invalid_priority(self):
+        with pytest.raises(ValueError):
+            TransportMux("127.0.0.1", 35001, priority=300)
+
+    def test_not_connected_raises(self):
+        client = TransportMux("127.0.0.1", 35001)
+
+        assert client.is_connected() is False
+        with pytest.raises(RuntimeError):
+            client.write_bytes(b"01 0C\r")
+        with pytest.raises(RuntimeError):
+            client.read_bytes()
+
+    def test_connection_over_mux(self, server, transport):
+        client = make_client(server)
+        conn = Connection(client, auto_connect=False)
+
+        response = conn.query(commands.ENGINE_SPEED)
+
+        assert response.raw == b"01 0C\r\r>"
+        conn.close()
@@ -0,0 +1,129 @@
+"""
+Unit tests for obdii.stats module.
+"""
+import pytest
+
+from obdii import Protocol, commands
+from obdii.command import Command
+from obdii.errors import MissingDataError
+from obdii.mode import Mode
+from obdii.stats import LatencySummary, QueryStats, QueryTiming
+
+
+RESPONSE = b"7E8 04 41 0C 40 80\r>"
+
+
+def make_timing(**stages) -> QueryTiming:
+    return QueryTiming(commands.ENGINE_SPEED, Protocol.ISO_15765_4_CAN, **stages)
+
+
+class TestQueryTiming:
+    def test_durations_with_first_byte(self):
+        timing = make_timing(write_start=0, write_done=10, first_byte=50, prompt=80, parsed=85)
+
+        assert timing.durations() == {
+            "write": 10,
+            "wait": 40,
+            "transfer": 30,
+            "parse": 5,
+            "total": 85,
+        }
+
+    def test_durations_without_first_byte(self):
+        timing = make_timing(write_start=0, write_done=10, prompt=80, parsed=85)
+
+        durations = timing.durations()
+
+        assert durations["wait"] == 70
+        assert "transfer" not in durations
+
+    def test_durations_of_failed_write(self):
+        assert make_timing(write_start=5).durations() == {}
+
+
+class TestLatencySummary:
+    def test_percentiles(self):
+        summary = LatencySummary.from_samples([i * 1_000_000 for i in range(1, 101)])
+
+        assert summary.count == 100
+        assert summary.p50 == 51
+        assert summary.p95 == 96
+        assert summary.p99 == 100
+        assert summary.max == 100
+        assert summary.mean == pytest.approx(50.5)
+
+
+class TestQueryStats:
+    def test_snapshot_groups_by_command_and_protocol(self):
+        stats = QueryStats()
+        stats.record(make_timing(write_start=0, write_done=1, prompt=2, parsed=3))
+        stats.record(
+            make_timing(write_start=0, write_done=1, prompt=2, parsed=3, error="MissingDataError")
+        )
+
+        snapshot = stats.snapshot()
+
+        group = snapshot.commands["ENGINE_SPEED"]
+        assert group.count == 2
+        assert group.errors == {"MissingDataError": 1}
+        assert group.stages["total"].count == 2
+        assert snapshot.protocols["ISO_15765_4_CAN"].count == 2
+
+    def test_unnamed_commands_are_kept_apart(self):
+        stats = QueryStats()
+        for pid in (0x0C, 0x0D):
+            command = Command(Mode.REQUEST, pid, 2)
+            stats.record(QueryTiming(command, Protocol.ISO_15765_4_CAN, write_start=0))
+
+        assert set(stats.snapshot().commands) == {"010C", "010D"}
+
+    def test_max_samples_bounds_memory(self):
+        stats = QueryStats(max_samples=3)
+        for _ in range(10):
+            stats.record(make_timing(write_start=0, write_done=1))
+
+        group = stats.snapshot().commands["ENGINE_SPEED"]
+
+        assert group.count == 10
+        assert group.stages["write"].count == 3
+
+    def test_reset(self):
+        stats = QueryStats()
+        stats.record(make_timing(write_start=0))
+
+        stats.reset()
+
+        assert stats.snapshot().commands == {}
+
+
+class TestConnectionStats:
+    def test_query_is_recorded(self, scripted):
+        conn = scripted(default=RESPONSE, protocol=Protocol.ISO_15765_4_CAN)
+
+        conn.query(commands.ENGINE_SPEED)
+
+        stages = conn.stats.snapshot().commands["ENGINE_SPEED"].stages
+        assert set(stages) == {"write", "wait", "parse", "total"}
+
+    def test_first_byte_splits_wait(self, mocker, scripted):
+        conn = scripted(default=RESPONSE)
+        conn.transport.first_byte_ns = 0
+        mocker.patch("obdii.connection.perf_counter_ns", side_effect=[-10, -5, 20, 25])
+
+        conn.query(commands.ENGINE_SPEED)
+
+        stages = conn.stats.snapshot().commands["ENGINE_SPEED"].stages
+        assert stages["transfer"].max == 20 / 1e6
+
+    def test_errors_are_recorded(self, mocker, scripted):
+        conn = scripted(default=RESPONSE)
+        mocker.patch.object(
+            conn.protocol_handler, "parse_response", side_effect=MissingDataError(b"NO DATA")
+        )
+
+        with pytest.raises(MissingDataError):
+            conn.query(commands.ENGINE_SPEED)
+
+        group = conn.stats.snapshot().commands["ENGINE_SPEED"]
+        assert group.errors == {"MissingDataError": 1}
+        assert "parse" in group.stages
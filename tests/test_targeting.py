@@ -0,0 +1,131 @@
+"""
+Unit tests for obdii.targeting module.
+"""
+
+import pytest
+
+from time import perf_counter
+
+from obdii import Protocol, commands
+from obdii.targeting import EcuAddress, EcuTargeting, plan
+from obdii.transports import TransportSimulated
+from obdii.transports.transport_simulated import SimulatedECU
+
+
+ENGINE = EcuAddress("7E0", "7E8")
+TRANSMISSION = EcuAddress("7E1", "7E9")
+
+
+def two_ecus(latency=0.0):
+    return [SimulatedECU(index=0), SimulatedECU(index=1, latency=latency)]
+
+
+@pytest.mark.parametrize(
+    ("response_id", "expected"),
+    [
+        ("7E8", ENGINE),
+        (b"7E9", TRANSMISSION),
+        (0x7EF, EcuAddress("7E7", "7EF")),
+        ("18 DA F1 10", EcuAddress("18DA10F1", "18DAF110")),
+    ],
+)
+def test_address_from_response(response_id, expected):
+    assert EcuAddress.from_response(response_id) == expected
+
+
+@pytest.mark.parametrize(
+    ("ecus", "current", "expected"),
+    [
+        ([ENGINE, TRANSMISSION, ENGINE, None, TRANSMISSION], None, [3, 0, 2, 1, 4]),
+        ([ENGINE, TRANSMISSION, ENGINE, TRANSMISSION], ENGINE, [0, 2, 1, 3]),
+        ([ENGINE, TRANSMISSION, ENGINE], TRANSMISSION, [1, 0, 2]),
+        ([ENGINE, ENGINE], TRANSMISSION, [0, 1]),
+        ([], None, []),
+    ],
+)
+def test_plan(ecus, current, expected):
+    requests = [(commands.ENGINE_SPEED, ecu) for ecu in ecus]
+
+    assert plan(requests, current) == expected
+
+
+class TestEcuTargeting:
+    def test_discover(self, simulated):
+        conn, _ = simulated(TransportSimulated(ecus=two_ecus()))
+        with conn:
+            assert EcuTargeting(conn).discover() == [ENGINE, TRANSMISSION]
+
+    def test_discover_29_bit(self, simulated):
+        conn, _ = simulated(TransportSimulated(Protocol.ISO_15765_4_CAN_B, ecus=two_ecus()))
+        with conn:
+            targeting = EcuTargeting(conn)
+            engine, _ = targeting.discover()
+
+            with targeting.target(engine):
+                response = conn.query(commands.VEHICLE_SPEED)
+
+        assert engine == EcuAddress("18DA10F1", "18DAF110")
+        assert len(response.messages) == 1
+
+    def test_select_only_when_changed(self, simulated):
+        conn, sent = simulated(TransportSimulated(ecus=two_ecus()))
+        with conn:
+            targeting = EcuTargeting(conn)
+            del sent[:]
+
+            assert targeting.select(TRANSMISSION)
+            assert not targeting.select(TRANSMISSION)
+            response = conn.query(commands.VEHICLE_SPEED)
+
+        assert sent[:2] == [b"AT SH 7E1\r", b"AT CRA 7E9\r"]
+        assert list(response.messages) == [b"7E9"]
+        assert targeting.switches == 1
+
+    def test_target_restores_functional(self, simulated):
+        conn, sent = simulated(TransportSimulated(ecus=two_ecus()))
+        with conn:
+            targeting = EcuTargeting(conn)
+            with targeting.target(ENGINE):
+                pass
+            response = conn.query(commands.VEHICLE_SPEED)
+
+        assert sent[-3:-1] == [b"AT SH 7DF\r", b"AT CRA\r"]
+        assert targeting.current is None
+        assert len(response.messages) == 2
+
+    def test_query_many_keeps_order_and_minimizes_switches(self, simulated):
+        conn, _ = simulated(TransportSimulated(ecus=two_ecus()))
+        with conn:
+            targeting = EcuTargeting(conn)
+            responses = targeting.query_many(
+                [
+                    (commands.ENGINE_SPEED, ENGINE),
+                    (commands.VEHICLE_SPEED, TRANSMISSION),
+                    (commands.ENGINE_LOAD, ENGINE),
+                ]
+            )
+
+        assert [r.context.command for r in responses] == [
+            commands.ENGINE_SPEED,
+            commands.VEHICLE_SPEED,
+            commands.ENGINE_LOAD,
+        ]
+        assert [list(r.messages) for r in responses] == [[b"7E8"], [b"7E9"], [b"7E8"]]
+        assert targeting.switches == 2
+
+    def test_targeting_skips_slow_ecu(self, simulated):
+        conn, _ = simulated(TransportSimulated(ecus=two_ecus(latency=0.1)))
+        with conn:
+            targeting = EcuTargeting(conn)
+            targeting.select(ENGINE)
+
+            start = perf_counter()
+            conn.query(commands.VEHICLE_SPEED)
+
+        assert perf_counter() - start < 0.1
+
+    def test_requires_can(self, simulated):
+        conn, _ = simulated(TransportSimulated(Protocol.ISO_9141_2, ecus=two_ecus()))
+        with conn:
+            with pytest.raises(ValueError, match="CAN protocol"):
+                EcuTargeting(conn).select(ENGINE)
@@ -264,7 +264,8 @@ class TestTransportSerialReadBytes:
         transport = TransportSerial(port="COM3")
         mock_serial = mocker.MagicMock()
         mock_serial.is_open = True
-        mock_serial.read_until.return_value = b"OK\r>"
+        mock_serial.read.return_value = b"OK\r>"[:1]
+        mock_serial.read_until.return_value = b"OK\r>"[1:]
         transport.serial_conn = mock_serial
 
         result = transport.read_bytes()
@@ -277,7 +278,8 @@ class TestTransportSerialReadBytes:
         transport = TransportSerial(port="COM3")
         mock_serial = mocker.MagicMock()
         mock_serial.is_open = True
-        mock_serial.read_until.return_value = b"OK\r\n"
+        mock_serial.read.return_value = b"OK\r\n"[:1]
+        mock_serial.read_until.return_value = b"OK\r\n"[1:]
         transport.serial_conn = mock_serial
 
         result = transport.read_bytes(expected_seq=b"\r\n")
@@ -290,14 +292,48 @@ class TestTransportSerialReadBytes:
         transport = TransportSerial(port="COM3")
         mock_serial = mocker.MagicMock()
         mock_serial.is_open = True
-        mock_serial.read_until.return_value = b"OK"
+        mock_serial.read.return_value = b"OK"[:1]
+        mock_serial.read_until.return_value = b"OK"[1:]
         transport.serial_conn = mock_serial
 
         result = transport.read_bytes(size=100)
 
-        mock_serial.read_until.assert_called_once_with(b'>', 100)
+        mock_serial.read_until.assert_called_once_with(b'>', 99)
         assert result == b"OK"
 
+    def test_read_bytes_records_first_byte(self, mocker):
+        """Test read_bytes times the first byte of the response."""
+        transport = TransportSerial(port="COM3")
+        mock_serial = mocker.MagicMock()
+        mock_serial.is_open = True
+        mock_serial.read.return_value = b"O"
+        mock_serial.read_until.return_value = b"K\r>"
+        transport.serial_conn = mock_serial
+        mocker.patch("obdii.transports.transport_serial.perf_counter_ns", return_value=42)
+
+        assert transport.read_bytes() == b"OK\r>"
+        assert transport.first_byte_ns == 42
+        mock_serial.read.assert_called_once_with(1)
+
+    @pytest.mark.parametrize(
+        ("first", "expected_first_byte"),
+        [(b">", 42), (b"", None)],
+        ids=["prompt_only", "timeout"],
+    )
+    def test_read_bytes_without_more_bytes(self, mocker, first, expected_first_byte):
+        """Test read_bytes returns at once on a bare prompt or a timeout."""
+        transport = TransportSerial(port="COM3")
+        mock_serial = mocker.MagicMock()
+        mock_serial.is_open = True
+        mock_serial.read.return_value = first
+        transport.serial_conn = mock_serial
+        transport.first_byte_ns = 1
+        mocker.patch("obdii.transports.transport_serial.perf_counter_ns", return_value=42)
+
+        assert transport.read_bytes() == first
+        assert transport.first_byte_ns == expected_first_byte
+        mock_serial.read_until.assert_not_called()
+
     def test_read_bytes_when_not_connected(self):
         """Test read_bytes raises RuntimeError when not connected."""
         transport = TransportSerial(port="COM3")
@@ -330,7 +366,8 @@ class TestTransportSerialReadBytes:
         transport = TransportSerial(port="COM3")
         mock_serial = mocker.MagicMock()
         mock_serial.is_open = True
-        mock_serial.read_until.return_value = response
+        mock_serial.read.return_value = response[:1]
+        mock_serial.read_until.return_value = response[1:]
         transport.serial_conn = mock_serial
 
         result = transport.read_bytes(expected_seq=expected_seq)
@@ -343,7 +380,8 @@ class TestTransportSerialReadBytes:
         transport = TransportSerial(port="COM3")
         mock_serial = mocker.MagicMock()
         mock_serial.is_open = True
-        mock_serial.read_until.return_value = b"TEST>>"
+        mock_serial.read.return_value = b"TEST>>"[:1]
+        mock_serial.read_until.return_value = b"TEST>>"[1:]
         transport.serial_conn = mock_serial
 
         result = transport.read_bytes(expected_seq=b">>")
@@ -356,10 +394,11 @@ class TestTransportSerialReadBytes:
         transport = TransportSerial(port="COM3")
         mock_serial = mocker.MagicMock()
         mock_serial.is_open = True
-        mock_serial.read_until.return_value = b"OK"
+        mock_serial.read.return_value = b"OK"[:1]
+        mock_serial.read_until.return_value = b"OK"[1:]
         transport.serial_conn = mock_serial
 
         result = transport.read_bytes(expected_seq=b"", size=2)
 
-        mock_serial.read_until.assert_called_once_with(b"", 2)
+        mock_serial.read_until.assert_called_once_with(b"", 1)
         assert result == b"OK"
@@ -0,0 +1,157 @@
+"""
+Unit tests for obdii.transports.transport_recorder module.
+"""
+
+import pytest
+
+from obdii import commands
+from obdii.connection import Connection
+from obdii.transports import transport_recorder
+from obdii.transports.transport_recorder import (
+    DIRECTION_READ,
+    DIRECTION_SYNC,
+    DIRECTION_WRITE,
+    FILE_HEADER,
+    MAGIC,
+    RECORD_HEADER,
+    TransportRecorder,
+    encode_record,
+    encode_sync,
+    iter_records,
+)
+from obdii.transports.transport_simulated import TransportSimulated
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "session.obdrec"
+
+
+def write_recording(path, *records: bytes) -> None:
+    path.write_bytes(FILE_HEADER.pack(MAGIC, 1) + b"".join(records))
+
+
+class TestTransportRecorder:
+    """Test suite for TransportRecorder."""
+
+    def test_records_every_exchange(self, path):
+        recorder = TransportRecorder(TransportSimulated(), path)
+
+        with Connection(recorder, log_handler=None) as conn:
+            conn.query(commands.ENGINE_SPEED)
+
+        records = list(iter_records(path))
+        exchanges = [r for r in records if r.direction != DIRECTION_SYNC]
+
+        assert records[0].direction == DIRECTION_SYNC
+        assert records[0].wall_time is not None
+        assert exchanges[0][1:] == (DIRECTION_WRITE, b"AT Z\r")
+        assert exchanges[-2].data == b"01 0C\r"
+        assert exchanges[-1].direction == DIRECTION_READ
+        assert exchanges[-1].data.endswith(b">")
+        assert [r.timestamp for r in records] == sorted(r.timestamp for r in records)
+
+    def test_sync_points(self, path):
+        recorder = TransportRecorder(TransportSimulated(), path, sync_every=4)
+        recorder.connect()
+        for _ in range(4):
+            recorder.write_bytes(b"01 0D\r")
+            recorder.read_bytes()
+        recorder.close()
+
+        directions = [r.direction for r in iter_records(path)]
+
+        assert directions.count(DIRECTION_SYNC) == 3
+
+    def test_appends_to_existing_recording(self, path):
+        for _ in range(2):
+            recorder = TransportRecorder(TransportSimulated(), path)
+            recorder.connect()
+            recorder.write_bytes(b"AT I\r")
+            recorder.read_bytes()
+            recorder.close()
+
+        records = list(iter_records(path))
+
+        assert path.read_bytes().count(MAGIC) == 1
+        assert len(records) == 6
+
+    def test_failed_write_is_not_recorded(self, path, mocker):
+        inner = TransportSimulated()
+        recorder = TransportRecorder(inner, path)
+        recorder.connect()
+        mocker.patch.object(inner, "write_bytes", side_effect=OSError("unplugged"))
+
+        with pytest.raises(OSError):
+            recorder.write_bytes(b"01 0C\r")
+        recorder.close()
+
+        assert [r.direction for r in iter_records(path)] == [DIRECTION_SYNC]
+
+    def test_delegates_first_byte(self, path):
+        inner = TransportSimulated()
+        recorder = TransportRecorder(inner, path)
+        recorder.connect()
+        recorder.write_bytes(b"AT I\r")
+        recorder.read_bytes()
+        recorder.close()
+
+        assert recorder.first_byte_ns == inner.first_byte_ns is not None
+        assert not recorder.is_connected()
+
+
+class TestIterRecords:
+    """Test suite for reading recordings."""
+
+    def test_not_a_recording(self, path):
+        path.write_bytes(b"timestamp,command,value\n")
+
+        with pytest.raises(ValueError, match="not a recording"):
+            list(iter_records(path))
+
+    def test_truncated_last_record(self, path):
+        record = encode_record(1, DIRECTION_WRITE, b"01 0C\r")
+        write_recording(path, record, record[:-2])
+
+        assert [r.data for r in iter_records(path)] == [b"01 0C\r"]
+
+    def test_corrupted_record_resyncs(self, path):
+        corrupted = RECORD_HEADER.pack(2, 0x7F, 3) + b"abc"
+        write_recording(
+            path,
+            encode_record(1, DIRECTION_WRITE, b"AT I\r"),
+            corrupted,
+            encode_sync(3),
+            encode_record(4, DIRECTION_READ, b"OK\r\r>"),
+        )
+
+        records = list(iter_records(path))
+
+        assert [r.timestamp for r in records] == [1, 3, 4]
+
+    def test_corrupted_length_resyncs(self, path):
+        write_recording(
+            path,
+            encode_record(1, DIRECTION_WRITE, b"AT I\r"),
+            RECORD_HEADER.pack(2, DIRECTION_READ, 100) + b"abc",
+            encode_sync(3),
+            encode_record(4, DIRECTION_READ, b"OK\r\r>"),
+            RECORD_HEADER.pack(5, DIRECTION_WRITE, 0xFFFFFFFF) + b"abc",
+            encode_sync(6),
+        )
+
+        records = list(iter_records(path))
+
+        assert [r.timestamp for r in records] == [1, 3, 4, 6]
+
+    def test_streamed_in_small_reads(self, path, monkeypatch):
+        records = [encode_record(i, DIRECTION_WRITE, b"01 0C\r" * i) for i in range(20)]
+        write_recording(
+            path, *records[:10], b"garbage" * 3, encode_sync(10), *records[10:]
+        )
+        expected = list(iter_records(path))
+
+        monkeypatch.setattr(transport_recorder, "READ_SIZE", 5)
+
+        assert list(iter_records(path)) == expected
+        assert len(expected) == 21
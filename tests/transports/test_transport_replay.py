@@ -0,0 +1,153 @@
+"""
+Unit tests for obdii.transports.transport_replay module.
+"""
+
+import pytest
+
+from time import perf_counter
+
+from obdii import commands
+from obdii.connection import Connection
+from obdii.transports.transport_recorder import (
+    DIRECTION_READ,
+    DIRECTION_SYNC,
+    DIRECTION_WRITE,
+    Record,
+    TransportRecorder,
+)
+from obdii.transports.transport_replay import (
+    UNMATCHED_RESPONSE,
+    ReplayExchange,
+    TransportReplay,
+    load_exchanges,
+)
+from obdii.transports.transport_simulated import SimulatedECU, TransportSimulated
+
+
+MS = 1_000_000
+
+RECORDS = [
+    Record(0, DIRECTION_SYNC, b""),
+    Record(1 * MS, DIRECTION_WRITE, b"01 0C\r"),
+    Record(21 * MS, DIRECTION_READ, b"41 0C 1A F8\r\r>"),
+    Record(30 * MS, DIRECTION_WRITE, b"01 0D\r"),
+    Record(35 * MS, DIRECTION_READ, b"41 0D 32"),
+    Record(40 * MS, DIRECTION_READ, b"\r\r>"),
+    Record(50 * MS, DIRECTION_WRITE, b"01 0C\r"),
+    Record(60 * MS, DIRECTION_READ, b"41 0C 1B 00\r\r>"),
+]
+
+
+def exchange(transport, query):
+    transport.write_bytes(query)
+    return transport.read_bytes()
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """A recorded session of a few engine speed queries."""
+    path = tmp_path / "session.obdrec"
+    transport = TransportSimulated(ecus=[SimulatedECU(latency=0.02)])
+
+    with Connection(TransportRecorder(transport, path), log_handler=None) as conn:
+        for _ in range(3):
+            conn.query(commands.ENGINE_SPEED)
+
+    return path
+
+
+class TestLoadExchanges:
+    """Test suite for pairing recorded queries and responses."""
+
+    def test_pairs_and_joins_reads(self):
+        assert load_exchanges(RECORDS) == [
+            ReplayExchange(b"01 0C\r", b"41 0C 1A F8\r\r>", 20 * MS),
+            ReplayExchange(b"01 0D\r", b"41 0D 32\r\r>", 10 * MS),
+            ReplayExchange(b"01 0C\r", b"41 0C 1B 00\r\r>", 10 * MS),
+        ]
+
+    def test_ignores_reads_before_first_query(self):
+        records = [Record(0, DIRECTION_READ, b">")] + RECORDS
+
+        assert len(load_exchanges(records)) == 3
+
+
+class TestTransportReplay:
+    """Test suite for TransportReplay."""
+
+    def test_strict_order(self):
+        transport = TransportReplay(RECORDS)
+        transport.connect()
+
+        assert exchange(transport, b"010C\r") == b"41 0C 1A F8\r\r>"
+        assert exchange(transport, b"01 0D\r") == b"41 0D 32\r\r>"
+        assert exchange(transport, b"01 0C\r") == b"41 0C 1B 00\r\r>"
+        assert transport.exhausted
+
+        with pytest.raises(RuntimeError, match="exhausted"):
+            transport.write_bytes(b"01 0C\r")
+
+    def test_strict_divergence(self):
+        transport = TransportReplay(RECORDS)
+        transport.connect()
+
+        with pytest.raises(RuntimeError, match="diverged at exchange 0"):
+            transport.write_bytes(b"01 0D\r")
+
+    def test_matched_cycles_responses(self):
+        transport = TransportReplay(RECORDS, matched=True)
+        transport.connect()
+
+        answers = [exchange(transport, b"01 0C\r") for _ in range(3)]
+
+        assert answers == [
+            b"41 0C 1A F8\r\r>",
+            b"41 0C 1B 00\r\r>",
+            b"41 0C 1A F8\r\r>",
+        ]
+        assert exchange(transport, b"09 02\r") == UNMATCHED_RESPONSE
+
+    def test_matched_resolves_repeats(self):
+        records = [
+            Record(1 * MS, DIRECTION_WRITE, b"01 0C\r"),
+            Record(2 * MS, DIRECTION_READ, b"41 0C 1A F8\r\r>"),
+            Record(3 * MS, DIRECTION_WRITE, b"\r"),
+            Record(4 * MS, DIRECTION_READ, b"41 0C 1B 00\r\r>"),
+            Record(5 * MS, DIRECTION_WRITE, b"01 0D\r"),
+            Record(6 * MS, DIRECTION_READ, b"41 0D 32\r\r>"),
+        ]
+        transport = TransportReplay(records, matched=True)
+        transport.connect()
+
+        assert exchange(transport, b"01 0D\r") == b"41 0D 32\r\r>"
+        assert exchange(transport, b"\r") == b"41 0D 32\r\r>"
+        assert exchange(transport, b"01 0C\r") == b"41 0C 1A F8\r\r>"
+        assert exchange(transport, b"\r") == b"41 0C 1B 00\r\r>"
+
+    @pytest.mark.parametrize(
+        ("speed", "minimum", "maximum"),
+        [(None, 0.0, 0.015), (1.0, 0.02, 1.0), (4.0, 0.005, 0.015)],
+        ids=["fast", "original", "scaled"],
+    )
+    def test_pacing(self, speed, minimum, maximum):
+        transport = TransportReplay(RECORDS, speed=speed)
+        transport.connect()
+
+        start = perf_counter()
+        exchange(transport, b"01 0C\r")
+        elapsed = perf_counter() - start
+
+        assert minimum <= elapsed < maximum
+        assert transport.first_byte_ns is not None
+
+    def test_invalid_speed(self):
+        with pytest.raises(ValueError, match="positive"):
+            TransportReplay(RECORDS, speed=0)
+
+    def test_replays_recorded_session(self, recording):
+        with Connection(TransportReplay(recording), log_handler=None) as conn:
+            values = [conn.query(commands.ENGINE_SPEED).value for _ in range(3)]
+
+            assert conn.transport.exhausted
+
+        assert all(isinstance(value, float) for value in values)
@@ -0,0 +1,225 @@
+"""
+Unit tests for obdii.transports.transport_simulated module.
+"""
+
+import pytest
+
+from time import perf_counter
+
+from obdii import Protocol, commands
+from obdii.connection import Connection
+from obdii.modes import Mode01, ModeAT
+from obdii.transports.transport_simulated import (
+    DEFAULT_VIN,
+    SimulatedECU,
+    TransportSimulated,
+    constant,
+    ramp,
+    sine,
+)
+
+
+def exchange(transport: TransportSimulated, query: bytes) -> bytes:
+    transport.write_bytes(query)
+    return transport.read_bytes()
+
+
+@pytest.fixture
+def transport():
+    transport = TransportSimulated()
+    transport.connect()
+    yield transport
+    transport.close()
+
+
+class TestSignals:
+    """Test suite for signal generators."""
+
+    def test_constant(self):
+        assert constant(0x1A, 0xF8)(123.0) == [0x1A, 0xF8]
+
+    def test_sine_bounds(self):
+        signal = sine(10, 20, period=4.0, width=2)
+        values = [int.from_bytes(bytes(signal(t / 10)), "big") for t in range(40)]
+
+        assert min(values) == 10
+        assert max(values) == 20
+
+    def test_ramp_holds_high(self):
+        signal = ramp(0, 100, duration=10.0)
+
+        assert signal(0.0) == [0]
+        assert signal(5.0) == [50]
+        assert signal(60.0) == [100]
+
+
+class TestAdapter:
+    """Test suite for the simulated ELM327 command set."""
+
+    def test_not_connected_raises(self):
+        with pytest.raises(RuntimeError, match="not connected"):
+            TransportSimulated().write_bytes(b"ATZ\r")
+
+    def test_reset_echoes_and_identifies(self, transport):
+        assert exchange(transport, b"ATZ\r") == b"ATZ\r\rELM327 v2.1\r\r>"
+
+    def test_echo_linefeed_and_spaces(self, transport):
+        exchange(transport, b"AT E0\r")
+        exchange(transport, b"AT L1\r")
+        exchange(transport, b"AT S0\r")
+
+        assert exchange(transport, b"01 0D\r").startswith(b"410D")
+        assert exchange(transport, b"AT I\r") == b"ELM327 v2.1\r\n\r\n>"
+
+    def test_repeat_last_query(self, transport):
+        exchange(transport, b"AT E0\r")
+        exchange(transport, b"01 0D\r")
+
+        assert exchange(transport, b"\r").startswith(b"41 0D")
+
+    def test_unknown_command(self, transport):
+        assert exchange(transport, b"AT XYZ\r").endswith(b"?\r\r>")
+
+    def test_unsupported_command(self):
+        transport = TransportSimulated(unsupported={"CAF"})
+        transport.connect()
+
+        assert b"?" in exchange(transport, b"AT CAF0\r")
+
+    def test_stn_identification(self):
+        transport = TransportSimulated(stn="STN1110 v4.2.1")
+        transport.connect()
+
+        assert b"STN1110" in exchange(transport, b"STI\r")
+
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            (b"AT SP 0\r", b"A6"),
+            (b"AT SP A7\r", b"A6"),
+            (b"AT SP 6\r", b"6"),
+            (b"AT SP 3\r", b"3"),
+        ],
+        ids=["auto", "auto_fallback", "explicit", "explicit_other"],
+    )
+    def test_describe_protocol_number(self, transport, query, expected):
+        exchange(transport, b"AT E0\r")
+        exchange(transport, query)
+
+        assert exchange(transport, b"AT DPN\r") == expected + b"\r\r>"
+
+    def test_wrong_protocol_cannot_connect(self, transport):
+        exchange(transport, b"AT SP 3\r")
+
+        assert b"UNABLE TO CONNECT" in exchange(transport, b"01 0C\r")
+
+    def test_unsupported_pid_no_data(self, transport):
+        assert b"NO DATA" in exchange(transport, b"01 5C\r")
+
+    def test_can_multi_frame_formatting(self, transport):
+        exchange(transport, b"AT E0\r")
+
+        assert exchange(transport, b"09 02\r").splitlines()[:2] == [
+            b"014",
+            b"0: 49 02 01 31 4F 42",
+        ]
+
+    def test_header_targets_single_ecu(self):
+        transport = TransportSimulated(ecus=2)
+        transport.connect()
+        for query in (b"AT E0\r", b"AT H1\r", b"AT SH 7E1\r"):
+            exchange(transport, query)
+
+        lines = exchange(transport, b"01 0D\r").splitlines()
+
+        assert [line[:3] for line in lines if line.strip(b">")] == [b"7E9"]
+
+    def test_receive_filter(self):
+        transport = TransportSimulated(ecus=2)
+        transport.connect()
+        for query in (b"AT E0\r", b"AT H1\r", b"AT CRA 7E8\r"):
+            exchange(transport, query)
+
+        assert b"7E9" not in exchange(transport, b"01 0D\r")
+
+        exchange(transport, b"AT CRA\r")
+        assert b"7E9" in exchange(transport, b"01 0D\r")
+
+    def test_clear_dtcs(self):
+        transport = TransportSimulated(ecus=[SimulatedECU(dtcs=["P0158"])])
+        transport.connect()
+        exchange(transport, b"AT E0\r")
+
+        assert exchange(transport, b"03\r").startswith(b"43 01 01 58")
+        exchange(transport, b"04\r")
+        assert exchange(transport, b"03\r").startswith(b"43 00")
+
+
+class TestTiming:
+    """Test suite for simulated latencies."""
+
+    def test_early_return_skips_slow_ecu(self):
+        transport = TransportSimulated(
+            ecus=[SimulatedECU(index=0), SimulatedECU(index=1, latency=0.2)]
+        )
+        transport.connect()
+
+        start = perf_counter()
+        raw = exchange(transport, b"01 0D 1\r")
+
+        assert perf_counter() - start < 0.15
+        assert raw.count(b"41 0D") == 1
+
+    def test_latency_and_first_byte(self):
+        transport = TransportSimulated(ecus=[SimulatedECU(latency=0.05)])
+        transport.connect()
+
+        start = perf_counter()
+        exchange(transport, b"01 0C\r")
+
+        assert perf_counter() - start >= 0.05
+        assert transport.first_byte_ns is not None
+
+
+class TestConnection:
+    """Test suite for a full Connection over the simulated adapter."""
+
+    @pytest.mark.parametrize(
+        "protocol",
+        [
+            Protocol.ISO_15765_4_CAN,
+            Protocol.ISO_15765_4_CAN_B,
+            Protocol.ISO_9141_2,
+            Protocol.ISO_14230_4_KWP_FAST,
+            Protocol.SAE_J1850_PWM,
+            Protocol.SAE_J1850_VPW,
+        ],
+    )
+    def test_auto_protocol_and_queries(self, protocol):
+        transport = TransportSimulated(
+            protocol,
+            ecus=[SimulatedECU(signals={Mode01.ENGINE_SPEED: constant(0x1A, 0xF8)})],
+        )
+
+        with Connection(transport, log_handler=None) as conn:
+            assert conn.protocol is protocol
+            assert conn.query(commands.ENGINE_SPEED).value == 1726.0
+            assert conn.query(Mode01.SUPPORTED_PIDS_A).value == [0x0C]
+
+            vin = conn.query(commands.VIN).unparsed
+            assert bytes(vin).endswith(DEFAULT_VIN.encode())
+
+    def test_can_dtcs(self):
+        transport = TransportSimulated(
+            ecus=[SimulatedECU(dtcs=["P0158", "C0196", "B0001", "U0100"])]
+        )
+
+        with Connection(transport, log_handler=None) as conn:
+            dtcs = conn.query(commands.GET_DTC).value
+
+        assert [str(dtc) for dtc in dtcs] == ["P0158", "C0196", "B0001", "U0100"]
+
+    def test_at_commands(self):
+        with Connection(TransportSimulated(), log_handler=None) as conn:
+            assert conn.query(ModeAT.VERSION_ID).value == "ELM327 v2.1"
+            assert conn.query(ModeAT.READ_VOLTAGE).value == "12.6V"